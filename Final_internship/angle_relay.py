@@ -0,0 +1,426 @@
+import math
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+from telemetry_health import LATENCY_WINDOW, RecentSamples
+from telemetry_protocol import (
+    FRAME_HEADER,
+    FRAME_HEADER_SIZE,
+    FRAME_MAGIC,
+    FRAME_VERSION,
+    SignalSchema,
+    decode_json_frame,
+)
+from udp_ingest import DatagramRing, UdpReceiver, UdpSender
+
+try:
+    import msgspec
+except ImportError:  # optional: typed JSON decoding of legacy packets
+    msgspec = None
+
+try:
+    import pygame
+except ImportError:  # optional: only WheelRelay reads a joystick
+    pygame = None
+
+# ---------------------------------------------------------------------------
+# Real-Time Angle Relay
+# ---------------------------------------------------------------------------
+#
+# Forwards the commands that close a control loop as soon as they arrive,
+# independent of the GUI tick:
+#
+#   dSPACE telemetry -> angle -> Simulink   newest angle of each received batch,
+#                                           read straight from the datagram and
+#                                           sent before the batch is decoded
+#   Moza wheel       -> CONTROL_IP          axis read and sent every
+#                                           WHEEL_SEND_PERIOD_SECONDS by
+#                                           WheelRelay's own thread
+#
+# The angle relay runs in the receiving thread (UdpWorkerThread in
+# capt_util.py) or in ingest_daemon.py's process, which also keeps it clear of
+# the GUI's GIL. WheelRelay owns pygame: SDL wants the joystick opened and its
+# events pumped on one thread, so that thread initialises it and nothing else
+# touches pygame while it runs. Every wheel datagram is a fresh axis reading.
+# It records how long each forward took from socket wake-up to sendto(), and
+# from the sender timestamp to sendto() (absolute only when both ends share a
+# clock).
+
+ANGLE_SIGNAL_NAME = "Out1"
+WHEEL_SEND_PERIOD_SECONDS = 0.002  # 500 Hz wheel commands
+WHEEL_AXIS = 0
+
+# In-process relays share the GIL with the GUI; a shorter switch interval lets
+# the relay thread take it back sooner after a socket wake-up. It is process
+# wide (every thread switches 10x more often), so callers opt in and restore it.
+RELAY_SWITCH_INTERVAL_SECONDS = 0.0005
+
+RELAY_NICE = -10  # Linux niceness for the relay thread (needs CAP_SYS_NICE)
+THREAD_PRIORITY_TIME_CRITICAL = 15  # Windows SetThreadPriority level
+
+FLOAT64 = struct.Struct("<d")
+
+
+class AngleDecoder:
+    """Reads one signal and the sender timestamp from a datagram without decoding the rest."""
+
+    def __init__(self, schema: SignalSchema, signal_name: str = ANGLE_SIGNAL_NAME):
+        index = schema.index_of(signal_name)
+        if index is None:
+            raise ValueError(f"Signal {signal_name!r} is not in schema {schema.signal_names}")
+
+        self.schema = schema
+        self.signal_name = signal_name
+        self._binary_offset = FRAME_HEADER_SIZE + index * FLOAT64.size
+        self._json_decoder = None
+        if msgspec is not None and signal_name != "timestamp":
+            fields = [("value", Optional[float], None), ("timestamp", float, math.nan)]
+            record_type = msgspec.defstruct("AnglePacket", fields, rename={"value": signal_name}, gc=False)
+            self._json_decoder = msgspec.json.Decoder(record_type)
+
+    def decode(self, data) -> Optional[tuple[float, float]]:
+        """(value, sender timestamp), or None when the datagram carries no finite value."""
+        if len(data) >= FRAME_HEADER_SIZE and data[0] == FRAME_MAGIC[0]:
+            magic, version, schema_id, _count, _sequence, timestamp = FRAME_HEADER.unpack_from(data)
+            if (magic != FRAME_MAGIC or version != FRAME_VERSION or schema_id != self.schema.schema_id
+                    or len(data) < self.schema.frame_size):
+                return None
+            (value,) = FLOAT64.unpack_from(data, self._binary_offset)
+        elif self._json_decoder is not None:
+            try:
+                record = self._json_decoder.decode(data)
+            except msgspec.DecodeError:
+                return self._decode_generic(data)
+            value, timestamp = record.value, record.timestamp
+            if value is None:
+                return None
+        else:
+            return self._decode_generic(data)
+        return (value, timestamp) if math.isfinite(value) else None
+
+    def _decode_generic(self, data) -> Optional[tuple[float, float]]:
+        frame = decode_json_frame(data, self.schema)
+        if frame is None:
+            return None
+        value = frame.get(self.signal_name)
+        return None if value is None else (value, frame.timestamp)
+
+
+class AngleRelay:
+    """Forwards the newest angle of every received batch before anything else handles the batch.
+
+    poll() waits for telemetry, sends the angle, then passes the batch to
+    `on_batch` for the full decode. Binary frames in the batch view the receive
+    slots, so `on_batch` must copy anything it keeps.
+    """
+
+    def __init__(
+        self,
+        receiver: UdpReceiver,
+        sender: UdpSender,
+        signal_name: str = ANGLE_SIGNAL_NAME,
+        on_batch: Optional[Callable[[DatagramRing], None]] = None,
+    ):
+        self.receiver = receiver
+        self.sender = sender
+        self.decoder = AngleDecoder(receiver.json_schema, signal_name)
+        self.on_batch = on_batch
+        self.scheduling = "default scheduling"
+
+        self._lock = threading.Lock()
+        self.forwarded_count = 0
+        self._forward_us = RecentSamples(LATENCY_WINDOW)
+        self._end_to_end_ms = RecentSamples(LATENCY_WINDOW)
+
+    def poll(self, timeout: float) -> None:
+        """Wait up to `timeout` seconds for telemetry and forward it."""
+        if self.receiver.wait_readable(timeout):
+            woke = time.perf_counter()
+            ring = self.receiver.drain()
+            self._forward_newest(ring, woke)
+            if self.on_batch is not None and len(ring):
+                self.on_batch(ring)
+
+    def _forward_newest(self, ring: DatagramRing, woke: float) -> None:
+        # Only the newest angle matters to Simulink; older ones in the batch are stale.
+        for index in range(len(ring) - 1, -1, -1):
+            decoded = self.decoder.decode(ring.datagram(index))
+            if decoded is not None:
+                break
+        else:
+            return
+
+        angle, sent_time = decoded
+        self.sender.send_angle(angle)
+        done = time.perf_counter()
+        with self._lock:
+            self.forwarded_count += 1
+            self._forward_us.add((done - woke) * 1e6)
+            if math.isfinite(sent_time):
+                self._end_to_end_ms.add((time.time() - sent_time) * 1e3)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "forwarded": self.forwarded_count,
+                "forward_us": self._forward_us.summary(),
+                "end_to_end_ms": self._end_to_end_ms.summary(),
+                "scheduling": self.scheduling,
+            }
+
+
+class WheelRelay:
+    """Reads the first joystick on its own thread and sends its angle every `period` seconds.
+
+    `scale` converts the axis (-1..1) to the angle sent. The thread initialises
+    pygame itself and quits it when stopped.
+    """
+
+    def __init__(self, sender: UdpSender, scale: float, period: float = WHEEL_SEND_PERIOD_SECONDS,
+                 core: Optional[int] = None):
+        self.sender = sender
+        self.scale = scale
+        self.period = period
+        self.core = core
+        self.scheduling = "default scheduling"
+        self.latest_angle: Optional[float] = None
+        self.sent_count = 0
+
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._opened = threading.Event()
+        self._wheel_found = False
+
+    def start(self) -> bool:
+        """Open the wheel on the relay thread; False (and no thread left running) if there is none."""
+        if pygame is None:
+            return False
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="WheelRelay", daemon=True)
+        self._thread.start()
+        self._opened.wait()
+        if not self._wheel_found:
+            self._thread.join()
+            self._thread = None
+        return self._wheel_found
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        try:
+            wheel = self._open_wheel()
+            self._wheel_found = wheel is not None
+            self._opened.set()
+            if wheel is not None:
+                self.scheduling = elevate_current_thread(self.core)
+                self._relay(wheel)
+        finally:
+            self._opened.set()
+            pygame.quit()
+
+    @staticmethod
+    def _open_wheel():
+        try:
+            pygame.init()
+            pygame.joystick.init()
+            if pygame.joystick.get_count() > 0:
+                wheel = pygame.joystick.Joystick(0)
+                wheel.init()
+                return wheel
+        except Exception:
+            pass
+        return None
+
+    def _relay(self, wheel) -> None:
+        next_send = time.perf_counter()
+        while self._running:
+            try:
+                pygame.event.pump()
+                angle = wheel.get_axis(WHEEL_AXIS) * self.scale
+            except Exception:
+                angle = None
+            if angle is not None:
+                self.sender.send_angle(angle)
+                self.latest_angle = angle
+                self.sent_count += 1
+
+            next_send += self.period
+            remaining = next_send - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+            else:
+                # Missed sends are skipped, not replayed.
+                next_send = time.perf_counter()
+
+    def stats(self) -> dict:
+        return {"sent": self.sent_count, "scheduling": self.scheduling}
+
+
+def elevate_current_thread(core: Optional[int] = None) -> str:
+    """Best effort: raise the calling thread's priority and optionally pin it to one core.
+
+    Returns what was applied; missing privileges are not an error.
+    """
+    applied = []
+    if sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        thread = kernel32.GetCurrentThread()
+        if kernel32.SetThreadPriority(thread, THREAD_PRIORITY_TIME_CRITICAL):
+            applied.append("time-critical priority")
+        if core is not None and kernel32.SetThreadAffinityMask(thread, 1 << core):
+            applied.append(f"core {core}")
+    else:
+        thread_id = threading.get_native_id()
+        try:
+            os.setpriority(os.PRIO_PROCESS, thread_id, RELAY_NICE)
+            applied.append(f"nice {RELAY_NICE}")
+        except (AttributeError, OSError):
+            pass
+        if core is not None:
+            try:
+                os.sched_setaffinity(thread_id, {core})
+                applied.append(f"core {core}")
+            except (AttributeError, OSError):
+                pass
+    return ", ".join(applied) or "default scheduling"
+
+
+#-------BENCHMARK MAIN ---------- #
+#
+# Loopback: JSON packets at 1 kHz -> receiving thread -> angle forwarded to a
+# sink socket, while the main thread imitates GUI ticks (10 ms of Python work
+# every 20 ms). Compares the old UdpWorkerThread loop (decode the batch, then
+# send) with AngleRelay. Latency is measured from sendto() at the source to
+# recvfrom() at the sink.
+
+BENCH_SECONDS = 3.0
+BENCH_RATE_HZ = 1000
+BENCH_GUI_WORK_SECONDS = 0.010
+BENCH_GUI_PERIOD_SECONDS = 0.020
+
+
+def _percentiles(latencies_ms: list[float]) -> str:
+    import numpy as np
+
+    p50, p99 = np.percentile(latencies_ms, (50, 99))
+    return f"p50 {p50:.3f} ms | p99 {p99:.3f} ms | max {max(latencies_ms):.3f} ms"
+
+
+def _bench(label: str, use_relay: bool) -> None:
+    import json
+    import socket
+
+    from sample_ring import SampleRing
+    from telemetry_health import TelemetryHealth
+
+    receiver = UdpReceiver("127.0.0.1", 0)
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    sink.settimeout(0.2)
+    sender = UdpSender(*sink.getsockname())
+    source = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    target = receiver.socket.getsockname()
+
+    schema = receiver.json_schema
+    sample_ring = SampleRing(1 << 15, len(schema))
+    health = TelemetryHealth()
+    running = True
+
+    def store(frame, ring: DatagramRing) -> None:
+        sample_ring.push(ring.received_monotonic, frame.timestamp, frame.values)
+        health.record(frame.sequence, frame.timestamp, ring.received_time)
+        sample_ring.drain()
+
+    def legacy_loop() -> None:
+        while running:
+            newest_angle = None
+            for frame in receiver.read_frames(0.05):
+                store(frame, receiver.ring)
+                angle_val = frame.get(ANGLE_SIGNAL_NAME)
+                if angle_val is not None:
+                    newest_angle = angle_val
+            if newest_angle is not None:
+                sender.send_angle(newest_angle)
+
+    def relay_loop() -> None:
+        from telemetry_protocol import decode_datagram
+
+        def on_batch(ring: DatagramRing) -> None:
+            for datagram in ring.datagrams():
+                frame = decode_datagram(datagram, schema)
+                if frame is not None:
+                    store(frame, ring)
+
+        relay = AngleRelay(receiver, sender, on_batch=on_batch)
+        relay.scheduling = elevate_current_thread()
+        while running:
+            relay.poll(0.05)
+
+    sent_at: dict[int, float] = {}
+    latencies_ms: list[float] = []
+
+    def sink_loop() -> None:
+        while running:
+            try:
+                data, _ = sink.recvfrom(64)
+            except OSError:
+                continue
+            received = time.perf_counter()
+            (packet_id,) = FLOAT64.unpack(data)
+            latencies_ms.append((received - sent_at[int(packet_id)]) * 1e3)
+
+    def source_loop() -> None:
+        for packet_id in range(int(BENCH_SECONDS * BENCH_RATE_HZ)):
+            packet = {"packet": packet_id, "timestamp": time.time(), "elapsed_time": packet_id / BENCH_RATE_HZ}
+            packet.update(dict.fromkeys(schema.signal_names, 0.5))
+            packet[ANGLE_SIGNAL_NAME] = packet_id
+            sent_at[packet_id] = time.perf_counter()
+            source.sendto(json.dumps(packet).encode("utf-8"), target)
+            time.sleep(1.0 / BENCH_RATE_HZ)
+
+    threads = [threading.Thread(target=relay_loop if use_relay else legacy_loop, daemon=True),
+               threading.Thread(target=sink_loop, daemon=True), threading.Thread(target=source_loop, daemon=True)]
+    for thread in threads:
+        thread.start()
+
+    # Imitate the GUI thread holding the GIL for part of every tick.
+    while threads[2].is_alive():
+        end = time.perf_counter() + BENCH_GUI_WORK_SECONDS
+        while time.perf_counter() < end:
+            sum(range(200))
+        time.sleep(BENCH_GUI_PERIOD_SECONDS - BENCH_GUI_WORK_SECONDS)
+    time.sleep(0.3)
+    running = False
+    for thread in threads[:2]:
+        thread.join()
+
+    print(f"{label:<28} forwarded {len(latencies_ms)}/{len(sent_at)} | {_percentiles(latencies_ms)}")
+    receiver.close()
+    sender.close()
+    sink.close()
+    source.close()
+
+
+def main() -> None:
+    _bench("decode batch, then send", use_relay=False)
+    _bench("AngleRelay", use_relay=True)
+    default_interval = sys.getswitchinterval()
+    sys.setswitchinterval(RELAY_SWITCH_INTERVAL_SECONDS)
+    _bench("decode batch, then send*", use_relay=False)
+    _bench("AngleRelay*", use_relay=True)
+    sys.setswitchinterval(default_interval)
+    print(f"* with sys.setswitchinterval({RELAY_SWITCH_INTERVAL_SECONDS})")
+
+
+if __name__ == "__main__":
+    main()
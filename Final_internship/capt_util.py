@@ -1,19 +1,15 @@
-import json
 import math
-import socket
-import struct
 import sys
 import time
-from collections import deque
-from threading import Lock
 from typing import Optional
 import numpy as np
 import pyqtgraph as pg
-import pygame
 from PyQt6.QtCore import QPointF, Qt, QTimer, QThread
 from PyQt6.QtGui import QColor, QPainter, QPen, QPolygonF, QPixmap
 from PyQt6.QtWidgets import (
     QApplication,
+    QCheckBox,
+    QComboBox,
     QFileDialog,
     QDoubleSpinBox,
     QGridLayout,
@@ -28,6 +24,15 @@ from PyQt6.QtWidgets import (
     QFrame,
 )
 
+from sample_ring import FIRST_SIGNAL_COLUMN, RECEIVED_COLUMN, SampleRing
+from udp_ingest import UdpReceiver, UdpSender
+from shared_frame_ring import DEFAULT_FRAME_RING_NAME, SharedFrameRing
+from plot_buffers import ColumnRingBuffer
+from plot_decimation import EnvelopeHistory
+from recording_format import save_columns
+from angle_relay import AngleRelay, WheelRelay, elevate_current_thread
+from telemetry_health import DEFAULT_STATS_PORT, INTERARRIVAL_BIN_EDGES_MS, StatsServer, TelemetryHealth
+
 # ---------------------------------------------------------------------------
 # UDP Configuration
 # ---------------------------------------------------------------------------
@@ -38,6 +43,23 @@ UDP_PORT = 50000
 ANGLE_FORWARD_IP = "127.0.0.1"
 ANGLE_FORWARD_PORT = 5006
 
+# When True, ingest_daemon.py owns the sockets and this GUI only attaches to its
+# shared-memory frame ring (falls back to in-process reception if it is not running;
+# a ring that exists but cannot be attached is an error).
+USE_INGEST_DAEMON = False
+
+# JSON telemetry health at http://127.0.0.1:<port>/stats (served by ingest_daemon.py in daemon mode).
+STATS_HTTP_PORT = DEFAULT_STATS_PORT
+
+# Core the receive / relay thread is pinned to (None: let the OS choose).
+RELAY_CPU_CORE: Optional[int] = None
+
+# sys.setswitchinterval() while the in-process relay runs (None: keep Python's
+# 5 ms). Process wide: every thread, the GUI included, switches the GIL this
+# often. Opt in with e.g. 0.0005 (angle_relay.RELAY_SWITCH_INTERVAL_SECONDS);
+# restored when the window closes.
+RELAY_SWITCH_INTERVAL: Optional[float] = None
+
 CONTROL_IP = "134.105.60.99"
 CONTROL_PORT = 55001
 
@@ -55,8 +77,18 @@ TRANSPARENCY_SIGNAL = "Transparency"
 HAPTIC_FIDELITY_SIGNAL = "Haptic Fidelity"
 
 PLOT_WINDOW_SECONDS = 10.0
+PLOT_WINDOW_CHOICES_SECONDS = (10, 30, 60, 300, 900, 3600)
+MAX_PLOT_WINDOW_SECONDS = 3600  # Longest selectable window, served from the min/max pyramid
+RAW_HISTORY_SECONDS = 60  # Full-resolution history kept for zooming and CSV export
+SAVE_FILE_FILTER = "CSV Files (*.csv);;Column recording (*.capt)"
 GUI_UPDATE_PERIOD_MS = 20  # 50 Hz UI Refresh Rate
 MOZA_R5_MAX_TORQUE = 5.5  # Nm
+MOZA_R5_HALF_RANGE_DEG = 450.0  # Wheel angle at full axis deflection
+
+RECEIVE_WAIT_SECONDS = 0.05  # Idle select() timeout; bounds worker shutdown latency
+SAMPLE_RING_CAPACITY = 1 << 15  # ~32 s at 1 kHz if the GUI thread stalls
+MAX_INPUT_RATE_HZ = 1000  # Sizes the plot history so every sample fits the window
+TICK_REPORT_PERIOD_SECONDS = 1.0  # How often the fps / ms-per-tick readout refreshes
 
 # ---------------------------------------------------------------------------
 # Modern Professional Styling Sheet (Sleek Dark/Slate Theme)
@@ -138,101 +170,94 @@ QStatusBar {
 # Socket Communication Classes & Background Worker
 # ---------------------------------------------------------------------------
 
-class UdpReceiver:
-    """Non-blocking UDP receiver for dSPACE JSON packets."""
-
-    def __init__(self, ip: str, port: int):
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.socket.bind((ip, port))
-        self.socket.setblocking(False)
-
-    def read_latest_packet(self) -> Optional[dict]:
-        latest_packet = None
-        while True:
-            try:
-                raw_data, _sender = self.socket.recvfrom(65535)
-            except (BlockingIOError, OSError):
-                break
-
-            try:
-                packet = json.loads(raw_data.decode("utf-8"))
-                if isinstance(packet, dict):
-                    latest_packet = packet
-            except (UnicodeDecodeError, json.JSONDecodeError):
-                pass
-        return latest_packet
-
-    def close(self) -> None:
-        try:
-            self.socket.close()
-        except OSError:
-            pass
-
-
-class UdpSender:
-    """UDP sender for forwarding signals."""
-
-    def __init__(self, ip: str, port: int, send_as_binary: bool = True):
-        self.ip = ip
-        self.port = port
-        self.send_as_binary = send_as_binary
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-
-    def send_angle(self, angle: float) -> None:
-        data = struct.pack("<d", float(angle)) if self.send_as_binary else json.dumps({"angle": angle}).encode("utf-8")
-        try:
-            self.socket.sendto(data, (self.ip, self.port))
-        except OSError:
-            pass
-
-    def close(self) -> None:
-        try:
-            self.socket.close()
-        except OSError:
-            pass
-
-
 class UdpWorkerThread(QThread):
-    """Background thread handling high-frequency socket polling safely."""
+    """Background thread relaying the angle and draining the socket into a lossless sample ring."""
     
     def __init__(self, receiver: UdpReceiver, sender: UdpSender):
         super().__init__()
         self.receiver = receiver
         self.sender = sender
         self._is_running = True
-        self.buffer_lock = Lock()
-        self.latest_packet: Optional[dict] = None
+        self.schema = receiver.json_schema
+        self.sample_ring = SampleRing(SAMPLE_RING_CAPACITY, len(self.schema))
+        self.health = TelemetryHealth()
+        # Forwards the newest angle of each batch before the batch is decoded.
+        self.relay = AngleRelay(receiver, sender, ANGLE_SIGNAL_NAME, on_batch=self._store_batch)
 
     def run(self) -> None:
+        self.relay.scheduling = elevate_current_thread(RELAY_CPU_CORE)
         while self._is_running:
-            packet = self.receiver.read_latest_packet()
-            if packet is not None:
-                angle_val = packet.get(ANGLE_SIGNAL_NAME)
-                if angle_val is not None:
-                    try:
-                        numeric_angle = float(angle_val)
-                        if math.isfinite(numeric_angle):
-                            self.sender.send_angle(numeric_angle)
-                    except (TypeError, ValueError):
-                        pass
-
-                with self.buffer_lock:
-                    self.latest_packet = packet
-            else:
-                QThread.msleep(1)
-
-    def get_latest_packet(self) -> Optional[dict]:
-        with self.buffer_lock:
-            pkt = self.latest_packet
-            self.latest_packet = None  
-            return pkt
+            self.relay.poll(RECEIVE_WAIT_SECONDS)
+
+    def _store_batch(self, ring) -> None:
+        # Arrival is when the socket woke up, not when each frame got decoded.
+        received_monotonic, received_time = ring.received_monotonic, ring.received_time
+        for frame in self.receiver.decode_frames(ring):
+            self.sample_ring.push(received_monotonic, frame.timestamp, frame.values)
+            self.health.record(frame.sequence, frame.timestamp, received_time)
+
+    def take_samples(self) -> np.ndarray:
+        """Every sample received since the last call, rows as described in sample_ring.py."""
+        return self.sample_ring.drain()
 
     def stop(self) -> None:
         self._is_running = False
         self.wait()
 
 
+# ---------------------------------------------------------------------------
+# Render Scheduling
+# ---------------------------------------------------------------------------
+#
+# Every GUI tick buffers new samples into all live pages, but only the page on
+# the visible tab turns its buffers into curves and label text. Pages mark
+# themselves dirty in add_samples()/update_measurements() and do the widget
+# work in render_if_dirty().
+
+def set_label_text(label: QLabel, text: str) -> None:
+    """setText() only when the text changed, so unchanged labels never relayout."""
+    if label.text() != text:
+        label.setText(text)
+
+
+class GuiTickMonitor:
+    """Measures GUI tick rate and per-tick cost against the tick budget."""
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self.summary = "GUI: measuring..."
+        self.stats: dict = {}
+        self._window_start = time.perf_counter()
+        self._tick_start = self._window_start
+        self._durations_ms: list[float] = []
+
+    def begin_tick(self) -> None:
+        self._tick_start = time.perf_counter()
+
+    def end_tick(self) -> bool:
+        """Record the tick; returns True when a new summary is ready."""
+        now = time.perf_counter()
+        self._durations_ms.append((now - self._tick_start) * 1000.0)
+        elapsed = now - self._window_start
+        if elapsed < TICK_REPORT_PERIOD_SECONDS:
+            return False
+
+        durations = np.asarray(self._durations_ms)
+        over_budget = int(np.count_nonzero(durations > self.budget_ms))
+        self.stats = {
+            "fps": len(durations) / elapsed,
+            "tick_mean_ms": float(durations.mean()),
+            "tick_max_ms": float(durations.max()),
+            "budget_ms": self.budget_ms,
+            "over_budget": over_budget,
+        }
+        self.summary = (f"GUI {len(durations) / elapsed:.1f} fps | tick {durations.mean():.2f} ms avg, "
+                        f"{durations.max():.2f} ms max / {self.budget_ms:g} ms budget | over: {over_budget}")
+        self._durations_ms.clear()
+        self._window_start = now
+        return True
+
+
 # ---------------------------------------------------------------------------
 # UI Widgets & Visualization Pages
 # ---------------------------------------------------------------------------
@@ -369,11 +394,23 @@ class SpringPage(QWidget):
         self.kappa_input.valueChanged.connect(self.spring_view.set_kappa)
         reset_button.clicked.connect(lambda: self.spring_view.set_reference_angle(self.spring_view.angle_rad))
 
+        self.angle_rad = 0.0
+        self.torque = 0.0
+        self._dirty = False
+
     def update_measurements(self, angle_rad: float, torque: float) -> None:
-        self.spring_view.set_angle(angle_rad)
-        self.spring_view.set_measured_torque(torque)
-        self.angle_label.setText(f"Measured angle: {math.degrees(angle_rad):.3f}°")
-        self.torque_label.setText(f"Measured torque: {torque:.3f} Nm")
+        self.angle_rad = angle_rad
+        self.torque = torque
+        self._dirty = True
+
+    def render_if_dirty(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        self.spring_view.set_angle(self.angle_rad)
+        self.spring_view.set_measured_torque(self.torque)
+        set_label_text(self.angle_label, f"Measured angle: {math.degrees(self.angle_rad):.3f}°")
+        set_label_text(self.torque_label, f"Measured torque: {self.torque:.3f} Nm")
 
 
 class StabilityPage(QWidget):
@@ -471,12 +508,11 @@ class TransparencyPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.start_time = time.monotonic()
-        max_pts = int(PLOT_WINDOW_SECONDS * 1000 / GUI_UPDATE_PERIOD_MS) + 100
+        max_pts = int(PLOT_WINDOW_SECONDS * MAX_INPUT_RATE_HZ) + 100
 
-        self.time_values = deque(maxlen=max_pts)
-        self.back_drivability_values = deque(maxlen=max_pts)
-        self.transparency_values = deque(maxlen=max_pts)
-        self.haptic_fidelity_values = deque(maxlen=max_pts)
+        # Rows: time, back-drivability, transparency, haptic fidelity.
+        self.history = ColumnRingBuffer(max_pts, 4)
+        self._dirty = False
 
         # Plots setup
         self.back_driv_plot = self._create_plot("Back-Drivability Analysis", "Back-Drivability", "Nm")
@@ -513,28 +549,28 @@ class TransparencyPage(QWidget):
         plot.showGrid(x=True, y=True, alpha=0.15)
         return plot
 
-    def add_sample(self, torque_val: float, angle_val: float) -> None:
-        t = time.monotonic() - self.start_time
-        self.time_values.append(t)
-
-        syn_back_driv = torque_val * 0.85
-        syn_transparency = max(0.0, 1.0 - abs(angle_val) * 0.05)
-        syn_fidelity = min(100.0, max(0.0, 50.0 + torque_val * 10.0))
+    def add_samples(self, times: np.ndarray, torque_vals: np.ndarray, angle_vals: np.ndarray) -> None:
+        syn_back_driv = torque_vals * 0.85
+        syn_transparency = np.maximum(0.0, 1.0 - np.abs(angle_vals) * 0.05)
+        syn_fidelity = np.clip(50.0 + torque_vals * 10.0, 0.0, 100.0)
 
-        self.back_drivability_values.append(syn_back_driv)
-        self.transparency_values.append(syn_transparency)
-        self.haptic_fidelity_values.append(syn_fidelity)
+        self.history.extend((times - self.start_time, syn_back_driv, syn_transparency, syn_fidelity))
+        self._dirty = True
 
+    def render_if_dirty(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
         self._update_curves()
 
     def _update_curves(self) -> None:
-        if not self.time_values:
+        if not len(self.history):
             return
 
-        times = np.fromiter(self.time_values, dtype=float)
-        self.back_driv_curve.setData(times, np.fromiter(self.back_drivability_values, dtype=float))
-        self.transparency_curve.setData(times, np.fromiter(self.transparency_values, dtype=float))
-        self.fidelity_curve.setData(times, np.fromiter(self.haptic_fidelity_values, dtype=float))
+        times, back_driv, transparency, fidelity = self.history.view()
+        self.back_driv_curve.setData(times, back_driv)
+        self.transparency_curve.setData(times, transparency)
+        self.fidelity_curve.setData(times, fidelity)
 
         latest_time = times[-1]
         min_time = max(0.0, latest_time - PLOT_WINDOW_SECONDS)
@@ -544,13 +580,10 @@ class TransparencyPage(QWidget):
             pw.setXRange(min_time, max_time, padding=0)
 
     def save_plots_to_csv(self) -> None:
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save Transparency Data", "transparency_data.csv", "CSV Files (*.csv)")
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Transparency Data", "transparency_data.csv", SAVE_FILE_FILTER)
         if file_path:
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write("Time(s),BackDrivability,Transparency,HapticFidelity\n")
-                    for t, bd, tr, hf in zip(self.time_values, self.back_drivability_values, self.transparency_values, self.haptic_fidelity_values):
-                        f.write(f"{t:.4f},{bd:.4f},{tr:.4f},{hf:.4f}\n")
+                save_columns(file_path, ["Time(s)", "BackDrivability", "Transparency", "HapticFidelity"], self.history.view())
             except Exception as e:
                 print(f"Error saving file: {e}")
 
@@ -559,15 +592,16 @@ class SignalPlotPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.start_time = time.monotonic()
-        max_pts = int(PLOT_WINDOW_SECONDS * 1000 / GUI_UPDATE_PERIOD_MS) + 100
+        self.window_seconds = PLOT_WINDOW_SECONDS
 
-        self.time_values = deque(maxlen=max_pts)
-        self.torque_values = deque(maxlen=max_pts)
-        self.current_1_values = deque(maxlen=max_pts)
-        self.current_2_values = deque(maxlen=max_pts)
-        self.angle_values = deque(maxlen=max_pts)
-        self.moza_angle_values = deque(maxlen=max_pts)
-        self.moza_torque_values = deque(maxlen=max_pts)
+        # Signals: torque, current 1, current 2, angle, Moza angle, Moza torque (CSV column order).
+        self.history = EnvelopeHistory(
+            6,
+            int(RAW_HISTORY_SECONDS * MAX_INPUT_RATE_HZ) + 100,
+            int(MAX_PLOT_WINDOW_SECONDS * MAX_INPUT_RATE_HZ),
+        )
+        self._latest_values = None
+        self._dirty = False
 
         self.torque_value_label = QLabel("Torque: --")
         self.current_1_value_label = QLabel(f"{CURRENT_PHASE_1_NAME}: --")
@@ -602,8 +636,21 @@ class SignalPlotPage(QWidget):
         save_button.setObjectName("SaveButton")
         save_button.clicked.connect(self.save_plots_to_csv)
 
+        self.window_combo = QComboBox()
+        for seconds in PLOT_WINDOW_CHOICES_SECONDS:
+            self.window_combo.addItem(f"{seconds} s" if seconds < 60 else f"{seconds // 60} min", seconds)
+        self.window_combo.setCurrentIndex(self.window_combo.findData(int(PLOT_WINDOW_SECONDS)))
+        self.window_combo.currentIndexChanged.connect(self._set_window)
+
+        # Panning/zooming a plot detaches the view from the live edge to browse history.
+        self.follow_checkbox = QCheckBox("Follow live")
+        self.follow_checkbox.setChecked(True)
+
         top_layout = QHBoxLayout()
         top_layout.addLayout(value_layout)
+        top_layout.addWidget(QLabel("Window:"))
+        top_layout.addWidget(self.window_combo)
+        top_layout.addWidget(self.follow_checkbox)
         top_layout.addWidget(save_button)
         top_layout.addWidget(clear_button)
 
@@ -614,6 +661,11 @@ class SignalPlotPage(QWidget):
         plot_layout.addWidget(self.moza_torque_plot, 1, 1)
         plot_layout.addWidget(self.current_plot, 2, 0, 1, 2)
 
+        for plot in [self.current_plot, self.torque_plot, self.moza_angle_plot, self.moza_torque_plot]:
+            plot.setXLink(self.angle_plot)
+        for plot in [self.current_plot, self.torque_plot, self.angle_plot, self.moza_angle_plot, self.moza_torque_plot]:
+            plot.getViewBox().sigRangeChangedManually.connect(lambda _mask: self.follow_checkbox.setChecked(False))
+
         layout = QVBoxLayout(self)
         layout.addLayout(top_layout)
         layout.addLayout(plot_layout, 1)
@@ -627,61 +679,75 @@ class SignalPlotPage(QWidget):
         plot.showGrid(x=True, y=True, alpha=0.15)
         return plot
 
-    def add_sample(self, angle_rad: float, torque: float, current_1: float, current_2: float, moza_angle: float, moza_torque: float) -> None:
-        t = time.monotonic() - self.start_time
-        self.time_values.append(t)
-        self.torque_values.append(torque)
-        self.current_1_values.append(current_1)
-        self.current_2_values.append(current_2)
-        self.angle_values.append(angle_rad)
-        self.moza_angle_values.append(moza_angle)
-        self.moza_torque_values.append(moza_torque)
-
-        self.torque_value_label.setText(f"Torque: {torque:.3f} Nm")
-        self.current_1_value_label.setText(f"{CURRENT_PHASE_1_NAME}: {current_1:.3f} A")
-        self.current_2_value_label.setText(f"{CURRENT_PHASE_2_NAME}: {current_2:.3f} A")
-        self.angle_value_label.setText(f"Angle: {angle_rad:.3f} rad")
+    def _set_window(self, index: int) -> None:
+        self.window_seconds = float(self.window_combo.itemData(index))
+        self.follow_checkbox.setChecked(True)
+        self._dirty = True
+        self.render_if_dirty()
+
+    def add_samples(self, times: np.ndarray, angle_rad: np.ndarray, torque: np.ndarray, current_1: np.ndarray,
+                    current_2: np.ndarray, moza_angle: np.ndarray, moza_torque: np.ndarray) -> None:
+        """Append a block of samples (one array per signal, all the same length)."""
+        self.history.extend(times - self.start_time, (torque, current_1, current_2, angle_rad, moza_angle, moza_torque))
+        self._latest_values = (torque[-1], current_1[-1], current_2[-1], angle_rad[-1])
+        self._dirty = True
+
+    def render_if_dirty(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+
+        if self._latest_values is not None:
+            torque, current_1, current_2, angle_rad = self._latest_values
+            set_label_text(self.torque_value_label, f"Torque: {torque:.3f} Nm")
+            set_label_text(self.current_1_value_label, f"{CURRENT_PHASE_1_NAME}: {current_1:.3f} A")
+            set_label_text(self.current_2_value_label, f"{CURRENT_PHASE_2_NAME}: {current_2:.3f} A")
+            set_label_text(self.angle_value_label, f"Angle: {angle_rad:.3f} rad")
 
         self._update_curves()
 
     def _update_curves(self) -> None:
-        if not self.time_values:
+        if not len(self.history):
             return
 
-        times = np.fromiter(self.time_values, dtype=float)
-        
-        self.current_1_curve.setData(times, np.fromiter(self.current_1_values, dtype=float))
-        self.current_2_curve.setData(times, np.fromiter(self.current_2_values, dtype=float))
-        self.torque_curve.setData(times, np.fromiter(self.torque_values, dtype=float))
-        self.angle_curve.setData(times, np.fromiter(self.angle_values, dtype=float))
-        self.moza_angle_curve.setData(times, np.fromiter(self.moza_angle_values, dtype=float))
-        self.moza_torque_curve.setData(times, np.fromiter(self.moza_torque_values, dtype=float))
-
-        latest_time = times[-1]
-        min_time = max(0.0, latest_time - PLOT_WINDOW_SECONDS)
-        max_time = max(PLOT_WINDOW_SECONDS, latest_time)
-
-        for pw in [self.current_plot, self.torque_plot, self.angle_plot, self.moza_angle_plot, self.moza_torque_plot]:
-            pw.setXRange(min_time, max_time, padding=0)
+        following = self.follow_checkbox.isChecked()
+        if following:
+            latest_time = self.history.latest_time()
+            min_time = max(0.0, latest_time - self.window_seconds)
+            max_time = max(self.window_seconds, latest_time)
+        else:
+            min_time, max_time = self.angle_plot.getViewBox().viewRange()[0]
+
+        # Envelope-decimate to ~2 points per horizontal pixel of the widest plot.
+        times, (torque, current_1, current_2, angle, moza_angle, moza_torque) = self.history.window(
+            min_time, max_time, 2 * self.current_plot.width())
+
+        self.current_1_curve.setData(times, current_1)
+        self.current_2_curve.setData(times, current_2)
+        self.torque_curve.setData(times, torque)
+        self.angle_curve.setData(times, angle)
+        self.moza_angle_curve.setData(times, moza_angle)
+        self.moza_torque_curve.setData(times, moza_torque)
+
+        if following:
+            # X axes are linked to the angle plot.
+            self.angle_plot.setXRange(min_time, max_time, padding=0)
 
     def save_plots_to_csv(self) -> None:
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save Live Signals Data", "live_signals.csv", "CSV Files (*.csv)")
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Live Signals Data", "live_signals.csv", SAVE_FILE_FILTER)
         if file_path:
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write("Time(s),Torque,Current1,Current2,AngleRad,MozaAngle,MozaTorque\n")
-                    for t, tr, c1, c2, ang, mang, mtor in zip(
-                        self.time_values, self.torque_values, self.current_1_values, 
-                        self.current_2_values, self.angle_values, self.moza_angle_values, self.moza_torque_values
-                    ):
-                        f.write(f"{t:.4f},{tr:.4f},{c1:.4f},{c2:.4f},{ang:.4f},{mang:.4f},{mtor:.4f}\n")
+                # Full-resolution samples of the last RAW_HISTORY_SECONDS.
+                save_columns(file_path, ["Time(s)", "Torque", "Current1", "Current2", "AngleRad", "MozaAngle", "MozaTorque"],
+                             self.history.raw.view())
             except Exception as e:
                 print(f"Error saving data: {e}")
 
     def clear(self) -> None:
         self.start_time = time.monotonic()
-        for q in [self.time_values, self.torque_values, self.current_1_values, self.current_2_values, self.angle_values, self.moza_angle_values, self.moza_torque_values]:
-            q.clear()
+        self.history.clear()
+        self._latest_values = None
+        self.follow_checkbox.setChecked(True)
         for c in [self.current_1_curve, self.current_2_curve, self.torque_curve, self.angle_curve, self.moza_angle_curve, self.moza_torque_curve]:
             c.clear()
 
@@ -756,6 +822,114 @@ class HomePage(QWidget):
         return card
 
 
+class DiagnosticsPage(QWidget):
+    """Telemetry health tab: packet loss, arrival jitter, latency and GUI pickup delay."""
+
+    ROWS = (
+        ("sequence", "Sequence"),
+        ("interarrival", "Inter-arrival"),
+        ("latency", "One-way latency"),
+        ("pickup", "GUI pickup delay"),
+        ("gui", "GUI tick"),
+        ("receiver", "Receiver"),
+        ("relay", "Angle relay"),
+        ("wheel", "Wheel relay"),
+    )
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.stats: dict = {}
+        self._dirty = False
+
+        grid = QGridLayout()
+        self.value_labels = {}
+        for row, (key, title) in enumerate(self.ROWS):
+            title_label = QLabel(title)
+            title_label.setStyleSheet("font-weight: bold; color: #60a5fa;")
+            value_label = QLabel("-")
+            grid.addWidget(title_label, row, 0)
+            grid.addWidget(value_label, row, 1)
+            self.value_labels[key] = value_label
+        grid.setColumnStretch(1, 1)
+
+        bin_labels = [f"<{INTERARRIVAL_BIN_EDGES_MS[0]:g}"]
+        bin_labels += [f"{low:g}-{high:g}" for low, high in zip(INTERARRIVAL_BIN_EDGES_MS, INTERARRIVAL_BIN_EDGES_MS[1:])]
+        bin_labels.append(f">{INTERARRIVAL_BIN_EDGES_MS[-1]:g}")
+        self.histogram_plot = pg.PlotWidget(title="Inter-arrival time histogram")
+        self.histogram_plot.setBackground('#181b22')
+        self.histogram_plot.setLabel("bottom", "Inter-arrival time", units="ms")
+        self.histogram_plot.setLabel("left", "Packets")
+        self.histogram_plot.getAxis("bottom").setTicks([list(enumerate(bin_labels))])
+        self.histogram_bars = pg.BarGraphItem(x=np.arange(len(bin_labels)), height=np.zeros(len(bin_labels)),
+                                              width=0.8, brush="#2563eb")
+        self.histogram_plot.addItem(self.histogram_bars)
+
+        self.endpoint_label = QLabel("JSON stats endpoint unavailable")
+        self.endpoint_label.setStyleSheet("color: #8b949e;")
+        self.endpoint_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(grid)
+        layout.addWidget(self.histogram_plot, 1)
+        layout.addWidget(self.endpoint_label)
+
+    def update_stats(self, stats: dict) -> None:
+        self.stats = stats
+        self._dirty = True
+
+    def render_if_dirty(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+
+        stats = self.stats
+        texts = {key: "-" for key, _title in self.ROWS}
+        if "sequence" in stats:
+            seq = stats["sequence"]
+            texts["sequence"] = (f"received {seq['received']} | lost {seq['lost']} ({seq['loss_ratio']:.2%}) "
+                                 f"in {seq['gaps']} gaps | reordered {seq['reordered']} | "
+                                 f"duplicates {seq['duplicates']} | sender restarts {seq['sender_restarts']}")
+            arrival = stats["interarrival_ms"]
+            if arrival["mean"] is not None:
+                texts["interarrival"] = (f"mean {arrival['mean']:.3f} ms | max {arrival['max']:.1f} ms | "
+                                         f"jitter {arrival['jitter']:.3f} ms | batched {arrival['batched']}")
+            self.histogram_bars.setOpts(height=np.asarray(arrival["counts"]))
+            latency = stats["latency_ms"]
+            if latency["samples"]:
+                texts["latency"] = (self._format_percentiles(latency) +
+                                    f" | spread above min (p99) {latency['spread_p99']:.2f} ms")
+            if stats["gui_pickup_ms"]["samples"]:
+                texts["pickup"] = self._format_percentiles(stats["gui_pickup_ms"])
+        if stats.get("gui"):
+            gui = stats["gui"]
+            texts["gui"] = (f"{gui['fps']:.1f} fps | {gui['tick_mean_ms']:.2f} ms avg, {gui['tick_max_ms']:.2f} ms max "
+                            f"/ {gui['budget_ms']:g} ms budget | over: {gui['over_budget']}")
+        if "receiver" in stats:
+            receiver = stats["receiver"]
+            texts["receiver"] = (f"truncated datagrams {receiver['truncated']} | "
+                                 f"sample ring drops {receiver['ring_dropped']}")
+        if "relay" in stats:
+            relay = stats["relay"]
+            text = f"forwarded {relay['forwarded']} | {relay['scheduling']}"
+            if relay["forward_us"]["samples"]:
+                forward = relay["forward_us"]
+                text += f"\nwake-up to send: p50 {forward['p50']:.0f} us | p99 {forward['p99']:.0f} us | max {forward['max']:.0f} us"
+            if relay["end_to_end_ms"]["samples"]:
+                text += f"\nsender to forwarded: {self._format_percentiles(relay['end_to_end_ms'])}"
+            texts["relay"] = text
+        if "wheel" in stats:
+            wheel = stats["wheel"]
+            texts["wheel"] = f"commands sent {wheel['sent']} | {wheel['scheduling']}"
+
+        for key, text in texts.items():
+            set_label_text(self.value_labels[key], text)
+
+    @staticmethod
+    def _format_percentiles(summary: dict) -> str:
+        return (f"p50 {summary['p50']:.2f} ms | p95 {summary['p95']:.2f} ms | p99 {summary['p99']:.2f} ms | "
+                f"max {summary['max']:.2f} ms")
+
+
 # ---------------------------------------------------------------------------
 # Main Window & Update Loops
 # ---------------------------------------------------------------------------
@@ -766,14 +940,31 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("CAPT Motor Dashboard")
         self.resize(1150, 820)
 
-        self.moza_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.wheel = self._init_joystick()
-
-        self.udp_receiver = UdpReceiver(UDP_IP, UDP_PORT)
-        self.angle_sender = UdpSender(ANGLE_FORWARD_IP, ANGLE_FORWARD_PORT, send_as_binary=True)
-
-        self.udp_worker = UdpWorkerThread(self.udp_receiver, self.angle_sender)
-        self.udp_worker.start()
+        # The wheel is read and sent at WHEEL_SEND_PERIOD_SECONDS on its own thread, in both modes.
+        self.wheel_sender = UdpSender(CONTROL_IP, CONTROL_PORT, send_as_binary=True)
+        self.wheel_relay: Optional[WheelRelay] = WheelRelay(self.wheel_sender, MOZA_R5_HALF_RANGE_DEG)
+        if not self.wheel_relay.start():
+            self.wheel_relay = None
+
+        self.udp_receiver = None
+        self.angle_sender = None
+        self.udp_worker = None
+        self._default_switch_interval = None
+        self.sample_source = self._attach_ingest_daemon() if USE_INGEST_DAEMON else None
+        if self.sample_source is None:
+            self.udp_receiver = UdpReceiver(UDP_IP, UDP_PORT)
+            self.angle_sender = UdpSender(ANGLE_FORWARD_IP, ANGLE_FORWARD_PORT, send_as_binary=True)
+
+            self.udp_worker = UdpWorkerThread(self.udp_receiver, self.angle_sender)
+            if RELAY_SWITCH_INTERVAL is not None:
+                # The relay thread shares the GIL with the GUI; let it take the GIL back sooner.
+                self._default_switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(RELAY_SWITCH_INTERVAL)
+            self.udp_worker.start()
+            self.sample_source = self.udp_worker
+
+        # Network statistics are gathered where the socket is read.
+        self.health = self.udp_worker.health if self.udp_worker is not None else None
 
         self.latest_angle_rad = 0.0
         self.latest_torque = 0.0
@@ -785,10 +976,17 @@ class MainWindow(QMainWindow):
         self.packet_count = 0
         self.last_packet_time = None
 
+        schema = self.sample_source.schema
+        self.angle_column = FIRST_SIGNAL_COLUMN + schema.index_of(ANGLE_SIGNAL_NAME)
+        self.torque_column = FIRST_SIGNAL_COLUMN + schema.index_of(TORQUE_SIGNAL_NAME)
+        self.current_1_column = FIRST_SIGNAL_COLUMN + schema.index_of(CURRENT_PHASE_1_NAME)
+        self.current_2_column = FIRST_SIGNAL_COLUMN + schema.index_of(CURRENT_PHASE_2_NAME)
+
         self.signal_plot_page = SignalPlotPage()
         self.spring_page = SpringPage()
         self.stability_page = StabilityPage()
         self.transparency_page = TransparencyPage()
+        self.diagnostics_page = DiagnosticsPage()
         
         # New Transfer Function Pages
         self.capt_tf_page = TransferFunctionPage(
@@ -802,95 +1000,150 @@ class MainWindow(QMainWindow):
             "H_Moza(s) = \\frac{T_{max} \\cdot K_{R5}}{J_{eq}s^2 + B_{eq}s + K_{stiff}}"
         )
 
-        tabs = QTabWidget()
-        tabs.addTab(self.signal_plot_page, "Live Signals")
-        tabs.addTab(HomePage(), "Home")
-        tabs.addTab(self.moza_tf_page, "Moza R5 specs")
-        tabs.addTab(self.stability_page, "Stability Analysis")
-        tabs.addTab(self.transparency_page, "Transparency Analysis")
-        tabs.addTab(self.capt_tf_page, "CAPT Motor Characterisation")
-        tabs.addTab(self.spring_page, "Virtual Spring Visualization")
-        self.setCentralWidget(tabs)
+        # Pages fed every tick; only the visible one renders.
+        self.live_pages = (self.signal_plot_page, self.spring_page, self.transparency_page, self.diagnostics_page)
+
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.signal_plot_page, "Live Signals")
+        self.tabs.addTab(HomePage(), "Home")
+        self.tabs.addTab(self.moza_tf_page, "Moza R5 specs")
+        self.tabs.addTab(self.stability_page, "Stability Analysis")
+        self.tabs.addTab(self.transparency_page, "Transparency Analysis")
+        self.tabs.addTab(self.capt_tf_page, "CAPT Motor Characterisation")
+        self.tabs.addTab(self.spring_page, "Virtual Spring Visualization")
+        self.tabs.addTab(self.diagnostics_page, "Diagnostics")
+        self.tabs.currentChanged.connect(lambda _index: self._render_visible_page())
+        self.setCentralWidget(self.tabs)
 
         self.status_label = QLabel(f"Listening on UDP {UDP_IP}:{UDP_PORT}")
         self.statusBar().addPermanentWidget(self.status_label)
 
+        self.tick_monitor = GuiTickMonitor(GUI_UPDATE_PERIOD_MS)
+        self.tick_label = QLabel(self.tick_monitor.summary)
+        self.statusBar().addPermanentWidget(self.tick_label)
+
+        self.stats_server = None
+        if self.health is not None:
+            try:
+                self.stats_server = StatsServer(self._collect_stats, port=STATS_HTTP_PORT)
+                self.diagnostics_page.endpoint_label.setText(f"JSON stats: {self.stats_server.url}")
+            except OSError as e:
+                print(f"Telemetry stats endpoint not started ({e}).")
+        else:
+            self.diagnostics_page.endpoint_label.setText(
+                f"Network statistics are collected by ingest_daemon.py: http://127.0.0.1:{STATS_HTTP_PORT}/stats"
+            )
+
         self.gui_timer = QTimer(self)
         self.gui_timer.timeout.connect(self._process_gui_tick)
         self.gui_timer.start(GUI_UPDATE_PERIOD_MS)
 
     @staticmethod
-    def _init_joystick() -> Optional[pygame.joystick.Joystick]:
+    def _attach_ingest_daemon() -> Optional[SharedFrameRing]:
+        """Frame ring of a running ingest daemon, or None if no daemon is running."""
+        # Only a missing segment falls back. A malformed ring raises ValueError: its
+        # daemon may still own UDP_PORT, and binding it here too would split the
+        # datagrams between the two processes.
         try:
-            pygame.init()
-            pygame.joystick.init()
-            if pygame.joystick.get_count() > 0:
-                wheel = pygame.joystick.Joystick(0)
-                wheel.init()
-                return wheel
-        except Exception:
-            pass
-        return None
+            return SharedFrameRing.attach(DEFAULT_FRAME_RING_NAME)
+        except FileNotFoundError as e:
+            print(f"Ingest daemon not available ({e}); receiving in-process.")
+            return None
 
     def _process_gui_tick(self) -> None:
-        packet = self.udp_worker.get_latest_packet()
-        if packet is not None:
-            self.packet_count += 1
+        self.tick_monitor.begin_tick()
+        samples = self.sample_source.take_samples()
+        if len(samples):
+            self.packet_count += len(samples)
             self.last_packet_time = time.monotonic()
-
-            if (val := self._read_number(packet, ANGLE_SIGNAL_NAME)) is not None:
-                self.latest_angle_rad = val
-            if (val := self._read_number(packet, TORQUE_SIGNAL_NAME)) is not None:
-                self.latest_torque = val
-            if (val := self._read_number(packet, CURRENT_PHASE_1_NAME)) is not None:
-                self.latest_current_1 = val
-            if (val := self._read_number(packet, CURRENT_PHASE_2_NAME)) is not None:
-                self.latest_current_2 = val
-
-        if self.wheel is not None:
-            try:
-                pygame.event.pump()
-                raw_axis = self.wheel.get_axis(0)
-                self.latest_angle_moza = raw_axis * 450.0
-                self.latest_torque_moza = abs(raw_axis) * MOZA_R5_MAX_TORQUE
-                self.moza_sock.sendto(struct.pack("<d", self.latest_angle_moza), (CONTROL_IP, CONTROL_PORT))
-            except Exception:
-                pass
-
-        self.signal_plot_page.add_sample(
-            self.latest_angle_rad, self.latest_torque,
-            self.latest_current_1, self.latest_current_2,
-            self.latest_angle_moza, self.latest_torque_moza
-        )
+            if self.health is not None:
+                self.health.record_pickup(self.last_packet_time - samples[:, RECEIVED_COLUMN])
+            times = samples[:, RECEIVED_COLUMN]
+            angle = self._hold_last(samples[:, self.angle_column], self.latest_angle_rad)
+            torque = self._hold_last(samples[:, self.torque_column], self.latest_torque)
+            current_1 = self._hold_last(samples[:, self.current_1_column], self.latest_current_1)
+            current_2 = self._hold_last(samples[:, self.current_2_column], self.latest_current_2)
+            self.latest_angle_rad, self.latest_torque = float(angle[-1]), float(torque[-1])
+            self.latest_current_1, self.latest_current_2 = float(current_1[-1]), float(current_2[-1])
+        else:
+            # No new packets: keep the plots scrolling with the held values.
+            times = np.array([time.monotonic()])
+            angle, torque = np.array([self.latest_angle_rad]), np.array([self.latest_torque])
+            current_1, current_2 = np.array([self.latest_current_1]), np.array([self.latest_current_2])
+
+        if self.wheel_relay is not None:
+            wheel_angle = self.wheel_relay.latest_angle
+            if wheel_angle is not None:
+                self.latest_angle_moza = wheel_angle
+            self.latest_torque_moza = abs(self.latest_angle_moza) / MOZA_R5_HALF_RANGE_DEG * MOZA_R5_MAX_TORQUE
+
+        moza_angle = np.full(len(times), self.latest_angle_moza)
+        moza_torque = np.full(len(times), self.latest_torque_moza)
+
+        self.signal_plot_page.add_samples(times, angle, torque, current_1, current_2, moza_angle, moza_torque)
         self.spring_page.update_measurements(self.latest_angle_rad, self.latest_torque)
-        self.transparency_page.add_sample(self.latest_torque, self.latest_angle_rad)
+        self.transparency_page.add_samples(times, torque, angle)
+        self._render_visible_page()
         self._update_connection_status()
 
+        if self.tick_monitor.end_tick():
+            self.tick_label.setText(self.tick_monitor.summary)
+            self.diagnostics_page.update_stats(self._collect_stats())
+
+    def _render_visible_page(self) -> None:
+        page = self.tabs.currentWidget()
+        if page in self.live_pages:
+            page.render_if_dirty()
+
     @staticmethod
-    def _read_number(packet: dict, signal_name: str) -> Optional[float]:
-        try:
-            val = float(packet.get(signal_name))
-            return val if math.isfinite(val) else None
-        except (TypeError, ValueError):
-            return None
+    def _hold_last(values: np.ndarray, previous: float) -> np.ndarray:
+        """Replace missing (non-finite) samples with the last valid value before them."""
+        valid = np.isfinite(values)
+        if valid.all():
+            return values
+        last_valid = np.where(valid, np.arange(len(values)), -1)
+        np.maximum.accumulate(last_valid, out=last_valid)
+        return np.where(last_valid >= 0, values[last_valid], previous)
 
     def _update_connection_status(self) -> None:
         if self.last_packet_time is None:
-            self.status_label.setText(f"Waiting for dSPACE on {UDP_IP}:{UDP_PORT}")
+            set_label_text(self.status_label, f"Waiting for dSPACE on {UDP_IP}:{UDP_PORT}")
             return
         elapsed = time.monotonic() - self.last_packet_time
         status = "Receiving" if elapsed < 1.0 else ("No recent packets" if elapsed < 3.0 else "Connection inactive")
-        self.status_label.setText(f"{status} | Packets: {self.packet_count}")
+        text = f"{status} | Packets: {self.packet_count}"
+        if self.health is not None:
+            text += f" | Lost: {self.health.lost_count}"
+        set_label_text(self.status_label, text)
+
+    def _collect_stats(self) -> dict:
+        """Telemetry health plus GUI-side numbers; also called from the stats endpoint thread."""
+        stats = self.health.snapshot() if self.health is not None else {}
+        stats["gui"] = self.tick_monitor.stats
+        if self.udp_worker is not None:
+            stats["receiver"] = {
+                "truncated": self.udp_receiver.truncated_count,
+                "ring_dropped": self.udp_worker.sample_ring.dropped_count,
+            }
+            stats["relay"] = self.udp_worker.relay.stats()
+        if self.wheel_relay is not None:
+            stats["wheel"] = self.wheel_relay.stats()
+        return stats
 
     def closeEvent(self, event) -> None:
-        self.udp_worker.stop()
-        self.udp_receiver.close()
-        self.angle_sender.close()
-        try:
-            self.moza_sock.close()
-        except OSError:
-            pass
-        pygame.quit()
+        if self.stats_server is not None:
+            self.stats_server.close()
+        if self.udp_worker is not None:
+            self.udp_worker.stop()
+            self.udp_receiver.close()
+            self.angle_sender.close()
+            if self._default_switch_interval is not None:
+                sys.setswitchinterval(self._default_switch_interval)
+        else:
+            self.sample_source.close()
+        if self.wheel_relay is not None:
+            self.wheel_relay.stop()
+        self.wheel_sender.close()
         event.accept()
 
 
@@ -8,7 +8,6 @@ from collections import deque
 from threading import Lock
 from typing import Optional
 import numpy as np
-import pandas as pd
 import pyqtgraph as pg
 import pygame
 from PyQt6.QtCore import QPointF, Qt, QTimer, QThread
@@ -29,6 +28,10 @@ from PyQt6.QtWidgets import (
     QFrame,
 )
 
+from csv_tail import CsvTailer, find_column
+from plot_buffers import ColumnRingBuffer
+from telemetry_protocol import CAPT_SCHEMA, SignalSchema, TelemetryFrame, decode_datagram
+
 # ---------------------------------------------------------------------------
 # UDP Configuration
 # ---------------------------------------------------------------------------
@@ -53,6 +56,7 @@ R5_ANGLE_SIGNAL_NAME = "Moza R5 Angle"
 HAPTIC_FIDEL = "c:\\Users\\javot\\Desktop\\sofia_code\\sys_id_results\\res85.png"    
 SYS_ID = "c:\\Users\\javot\\Desktop\\sofia_code\\sys_id_capt.jpg"
 MOZA_FILE = "c:\\Users\\javot\\MozaIntegration\\MozaIntegration\\moza_data.csv"
+MOZA_HISTORY_ROWS = 60_000  # Rolling window of the Moza telemetry tab (60 s at 1 kHz)
 
 PLOT_WINDOW_SECONDS = 10.0
 GUI_UPDATE_PERIOD_MS = 20  # 50 Hz UI Refresh Rate
@@ -139,29 +143,27 @@ QStatusBar {
 # ---------------------------------------------------------------------------
 
 class UdpReceiver:
-    """Non-blocking UDP receiver for dSPACE JSON packets."""
+    """Non-blocking UDP receiver for dSPACE binary telemetry frames (legacy JSON accepted)."""
 
-    def __init__(self, ip: str, port: int):
+    def __init__(self, ip: str, port: int, json_schema: SignalSchema = CAPT_SCHEMA):
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.socket.bind((ip, port))
         self.socket.setblocking(False)
+        self.json_schema = json_schema
 
-    def read_latest_packet(self) -> Optional[dict]:
-        latest_packet = None
+    def read_latest_packet(self) -> Optional[TelemetryFrame]:
+        latest_frame = None
         while True:
             try:
                 raw_data, _sender = self.socket.recvfrom(65535)
             except (BlockingIOError, OSError):
                 break
 
-            try:
-                packet = json.loads(raw_data.decode("utf-8"))
-                if isinstance(packet, dict):
-                    latest_packet = packet
-            except (UnicodeDecodeError, json.JSONDecodeError):
-                pass
-        return latest_packet
+            frame = decode_datagram(raw_data, self.json_schema)
+            if frame is not None:
+                latest_frame = frame
+        return latest_frame
 
     def close(self) -> None:
         try:
@@ -202,7 +204,7 @@ class UdpWorkerThread(QThread):
         self.sender = sender
         self._is_running = True
         self.buffer_lock = Lock()
-        self.latest_packet: Optional[dict] = None
+        self.latest_packet: Optional[TelemetryFrame] = None
 
     def run(self) -> None:
         while self._is_running:
@@ -210,19 +212,14 @@ class UdpWorkerThread(QThread):
             if packet is not None:
                 angle_val = packet.get(ANGLE_SIGNAL_NAME)
                 if angle_val is not None:
-                    try:
-                        numeric_angle = float(angle_val)
-                        if math.isfinite(numeric_angle):
-                            self.sender.send_angle(numeric_angle)
-                    except (TypeError, ValueError):
-                        pass
+                    self.sender.send_angle(angle_val)
 
                 with self.buffer_lock:
                     self.latest_packet = packet
             else:
                 QThread.msleep(1)
 
-    def get_latest_packet(self) -> Optional[dict]:
+    def get_latest_packet(self) -> Optional[TelemetryFrame]:
         with self.buffer_lock:
             pkt = self.latest_packet
             self.latest_packet = None  
@@ -509,7 +506,10 @@ class MozaR5TelemetryPage(QWidget):
         layout.addLayout(grid, 1)
 
         self.current_file_path = MOZA_FILE
-        self.file_position = 0  # Tracks bytes read for incremental streaming
+        self.tailer = CsvTailer(MOZA_FILE)
+        # Columns: time, angle, velocity, acceleration, torque.
+        self.history = ColumnRingBuffer(MOZA_HISTORY_ROWS, 5)
+        self.column_map: Optional[list[Optional[int]]] = None
 
         # High-frequency real-time tick (updates every 30ms)
         self.stream_timer = QTimer(self)
@@ -523,79 +523,75 @@ class MozaR5TelemetryPage(QWidget):
         plot.showGrid(x=True, y=True, alpha=0.3)
         plot.setLabel("bottom", "Time (s)", color="#9ca3af")
         plot.setLabel("left", y_label, color="#9ca3af")
+        plot.setDownsampling(auto=True, mode="peak")
+        plot.setClipToView(True)
         return plot
 
+    @staticmethod
+    def _resolve_columns(column_names: list[str]) -> list[Optional[int]]:
+        """Map the CSV header to [time, angle, velocity, acceleration, torque] column indices once."""
+        time_index = find_column(column_names, "time", "timestamp")
+        return [
+            0 if time_index is None else time_index,
+            find_column(column_names, "angle", "position"),
+            find_column(column_names, "vel", "speed"),
+            find_column(column_names, "acc"),
+            find_column(column_names, "torque", "force"),
+        ]
+
+    def _reset_stream(self) -> None:
+        self.history.clear()
+        self.column_map = None
+        for curve in [self.curve_angle, self.curve_vel, self.curve_acc, self.curve_torque]:
+            curve.clear()
+
     def browse_csv_file(self):
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Open Moza Telemetry CSV", "", "CSV Files (*.csv)"
         )
         if file_path:
             self.current_file_path = file_path
-            self.file_position = 0
+            self.tailer = CsvTailer(file_path)
             # Clear existing curves on file switch
-            self.curve_angle.clear()
-            self.curve_vel.clear()
-            self.curve_acc.clear()
-            self.curve_torque.clear()
+            self._reset_stream()
 
     def stream_new_csv_rows(self):
         if not self.current_file_path:
             return
 
+        restart_count = self.tailer.restart_count
         try:
-            import os
-            if not os.path.exists(self.current_file_path):
-                self.status_indicator.setText("● File Not Found")
-                self.status_indicator.setStyleSheet("color: #ef4444; font-weight: bold;")
-                return
-
-            # Read incrementally starting from last byte position to avoid file locking & lag
-            with open(self.current_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                f.seek(self.file_position)
-                lines = f.readlines()
-                self.file_position = f.tell()
-
-            if not lines:
-                return
-
-            self.status_indicator.setText("● Real-Time Streaming Active")
-            self.status_indicator.setStyleSheet("color: #10b981; font-weight: bold;")
-
-            # Parse newly arrived lines using pandas StringIO
-            import io
-            chunk_text = "".join(lines)
-            
-            # If starting fresh from position 0, include header row if present
-            if self.file_position == len(chunk_text): 
-                pass
-            
-            # Read chunk data safely
-            df_chunk = pd.read_csv(io.StringIO(chunk_text), header=0 if self.file_position <= len(chunk_text) and not chunk_text.startswith(',') else None)
-            
-            if df_chunk.empty:
-                return
-
-            # Update plot data arrays instantly
-            time_col = next((c for c in df_chunk.columns if 'time' in str(c).lower() or 'timestamp' in str(c).lower()), df_chunk.columns[0])
-            angle_col = next((c for c in df_chunk.columns if 'angle' in str(c).lower() or 'position' in str(c).lower()), None)
-            vel_col = next((c for c in df_chunk.columns if 'vel' in str(c).lower() or 'speed' in str(c).lower()), None)
-            acc_col = next((c for c in df_chunk.columns if 'acc' in str(c).lower()), None)
-            torque_col = next((c for c in df_chunk.columns if 'torque' in str(c).lower() or 'force' in str(c).lower()), None)
-
-            if angle_col and angle_col in df_chunk.columns:
-                self.curve_angle.setData(df_chunk[time_col].values, df_chunk[angle_col].values)
-            if vel_col and vel_col in df_chunk.columns:
-                self.curve_vel.setData(df_chunk[time_col].values, df_chunk[vel_col].values)
-            if acc_col and acc_col in df_chunk.columns:
-                self.curve_acc.setData(df_chunk[time_col].values, df_chunk[acc_col].values)
-            if torque_col and torque_col in df_chunk.columns:
-                self.curve_torque.setData(df_chunk[time_col].values, df_chunk[torque_col].values)
-
-        except (PermissionError, OSError):
+            rows = self.tailer.poll()
+        except FileNotFoundError:
+            self.status_indicator.setText("● File Not Found")
+            self.status_indicator.setStyleSheet("color: #ef4444; font-weight: bold;")
+            return
+        except OSError:
             # Gracefully handle write conflicts when the external logger locks the file for milliseconds
-            pass
-        except Exception:
-            pass
+            return
+
+        if self.tailer.restart_count != restart_count:
+            # The logger started a new file under the same name.
+            self._reset_stream()
+
+        if rows is None:
+            return
+
+        self.status_indicator.setText("● Real-Time Streaming Active")
+        self.status_indicator.setStyleSheet("color: #10b981; font-weight: bold;")
+
+        if self.column_map is None:
+            self.column_map = self._resolve_columns(self.tailer.column_names)
+
+        missing = np.full(len(rows), np.nan)
+        self.history.extend([missing if index is None else rows[:, index] for index in self.column_map])
+
+        # The whole rolling window, not just the new chunk.
+        times, angle, vel, acc, torque = self.history.view()
+        curves = [self.curve_angle, self.curve_vel, self.curve_acc, self.curve_torque]
+        for curve, values, index in zip(curves, [angle, vel, acc, torque], self.column_map[1:]):
+            if index is not None:
+                curve.setData(times, values)
 
 class SignalPlotPage(QWidget):
     def __init__(self, parent=None):
@@ -875,13 +871,13 @@ class MainWindow(QMainWindow):
             self.packet_count += 1
             self.last_packet_time = time.monotonic()
 
-            if (val := self._read_number(packet, ANGLE_SIGNAL_NAME)) is not None:
+            if (val := packet.get(ANGLE_SIGNAL_NAME)) is not None:
                 self.latest_angle_rad = val
-            if (val := self._read_number(packet, TORQUE_SIGNAL_NAME)) is not None:
+            if (val := packet.get(TORQUE_SIGNAL_NAME)) is not None:
                 self.latest_torque = val
-            if (val := self._read_number(packet, CURRENT_PHASE_1_NAME)) is not None:
+            if (val := packet.get(CURRENT_PHASE_1_NAME)) is not None:
                 self.latest_current_1 = val
-            if (val := self._read_number(packet, CURRENT_PHASE_2_NAME)) is not None:
+            if (val := packet.get(CURRENT_PHASE_2_NAME)) is not None:
                 self.latest_current_2 = val
 
         if self.wheel is not None:
@@ -904,17 +900,6 @@ class MainWindow(QMainWindow):
 
         self.spring_page.update_measurements(self.latest_angle_rad, self.latest_torque)
 
-    @staticmethod
-    def _read_number(packet: dict, key: str) -> Optional[float]:
-        if key in packet:
-            try:
-                val = float(packet[key])
-                if math.isfinite(val):
-                    return val
-            except (TypeError, ValueError):
-                pass
-        return None
-
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
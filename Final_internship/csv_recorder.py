@@ -0,0 +1,226 @@
+import csv
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+from recording_format import RECORDING_SUFFIX, RecordingWriter
+
+# ---------------------------------------------------------------------------
+# Background CSV Recorder
+# ---------------------------------------------------------------------------
+#
+# The GUI thread only does a non-blocking put() per row. A writer thread
+# drains the queue in batches, flushes when enough rows or time have
+# accumulated, and rolls over to a new numbered file by size or age. If the
+# disk cannot keep up the queue fills and rows are dropped and counted
+# instead of stalling the event loop.
+#
+# A path ending in .capt records in the columnar format of recording_format.py
+# instead; batching, flushing and rotation work the same way.
+
+DEFAULT_QUEUE_SIZE = 100_000     # ~16 min of 100 Hz data, ~100 s at 1 kHz
+DEFAULT_BATCH_SIZE = 250         # Small enough that one writerows() call holds the GIL < 1 ms
+DEFAULT_FLUSH_ROWS = 5000
+DEFAULT_FLUSH_SECONDS = 1.0
+
+_STOP = object()
+
+
+class CsvRecorder(threading.Thread):
+    """Writes queued rows to CSV (or .capt) on a background thread with batching, flushing and rotation."""
+
+    def __init__(
+        self,
+        path: Path,
+        header: Sequence[str],
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_rows: int = DEFAULT_FLUSH_ROWS,
+        flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+        rotate_bytes: Optional[int] = None,
+        rotate_seconds: Optional[float] = None,
+    ):
+        super().__init__(name="CsvRecorder", daemon=True)
+        self.base_path = Path(path)
+        self.header = list(header)
+        self.batch_size = batch_size
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+
+        self.rows = queue.Queue(maxsize=queue_size)
+        self.dropped_count = 0      # written by the producer only
+        self.written_count = 0      # written by the recorder thread only
+        self.file_count = 0
+        self.error: Optional[Exception] = None  # OSError, or ValueError for a malformed .capt row
+
+        # Open the first file here so the caller sees permission/path errors immediately.
+        self.current_path = self.base_path
+        self._handle = None
+        self._writer = None
+        self._opened_at = 0.0
+        self._open(self.base_path)
+
+    # --- producer side -----------------------------------------------------
+
+    def record(self, row: Sequence[float]) -> bool:
+        """Queue one row without blocking; returns False (and counts a drop) if the queue is full."""
+        try:
+            self.rows.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped_count += 1
+            return False
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write everything still queued, then close the file."""
+        while True:
+            try:
+                self.rows.put(_STOP, timeout=timeout)
+                break
+            except queue.Full:
+                if not self.is_alive():
+                    break
+        self.join(timeout)
+
+    # --- recorder thread ---------------------------------------------------
+
+    def run(self) -> None:
+        unflushed = 0
+        last_flush = time.monotonic()
+        stopping = False
+
+        while not stopping:
+            try:
+                first = self.rows.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                first = None
+
+            batch = []
+            if first is _STOP:
+                stopping = True
+            elif first is not None:
+                batch.append(first)
+                while len(batch) < self.batch_size:
+                    try:
+                        row = self.rows.get_nowait()
+                    except queue.Empty:
+                        break
+                    if row is _STOP:
+                        stopping = True
+                        break
+                    batch.append(row)
+
+            if self.error is not None:
+                continue
+
+            try:
+                if batch:
+                    self._writer.writerows(batch)
+                    self.written_count += len(batch)
+                    unflushed += len(batch)
+
+                now = time.monotonic()
+                if unflushed and (unflushed >= self.flush_rows or now - last_flush >= self.flush_seconds or stopping):
+                    self._handle.flush()
+                    unflushed = 0
+                    last_flush = now
+
+                if not stopping and self._rotation_due(now):
+                    self._open(self._next_path())
+            except (OSError, ValueError) as error:
+                self.error = error
+
+        self._close()
+
+    def _rotation_due(self, now: float) -> bool:
+        if self.rotate_bytes is not None and self._handle.tell() >= self.rotate_bytes:
+            return True
+        return self.rotate_seconds is not None and now - self._opened_at >= self.rotate_seconds
+
+    def _next_path(self) -> Path:
+        index = self.file_count
+        while True:
+            candidate = self.base_path.with_name(f"{self.base_path.stem}_{index:03d}{self.base_path.suffix}")
+            if not candidate.exists():
+                return candidate
+            index += 1
+
+    def _open(self, path: Path) -> None:
+        self._close()
+
+        if path.suffix == RECORDING_SUFFIX:
+            # RecordingWriter has writerows/flush/tell/close itself.
+            self._handle = self._writer = RecordingWriter(path, self.header)
+        else:
+            new_file = not path.exists() or path.stat().st_size == 0
+            self._handle = path.open(mode="a", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._handle)
+            if new_file:
+                self._writer.writerow(self.header)
+                self._handle.flush()
+
+        self.current_path = path
+        self.file_count += 1
+        self._opened_at = time.monotonic()
+
+    def _close(self) -> None:
+        if self._handle is None:
+            return
+        try:
+            self._handle.flush()
+            self._handle.close()
+        except OSError:
+            pass
+        self._handle = None
+        self._writer = None
+
+
+#-------BENCHMARK MAIN ---------- #
+
+BENCH_PATH = Path("csv_recorder_bench.csv")
+BENCH_ROWS = 20000
+BENCH_COLUMNS = 7
+
+
+def _time_calls(call, rows: int):
+    worst = 0.0
+    start = time.perf_counter()
+    for _ in range(rows):
+        before = time.perf_counter()
+        call()
+        worst = max(worst, time.perf_counter() - before)
+    return (time.perf_counter() - start) / rows * 1e6, worst * 1e6
+
+
+def main() -> None:
+    row = tuple(float(i) for i in range(BENCH_COLUMNS))
+
+    with BENCH_PATH.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+
+        def write_and_flush():
+            writer.writerow(row)
+            handle.flush()
+
+        direct_mean, direct_max = _time_calls(write_and_flush, BENCH_ROWS)
+    BENCH_PATH.unlink()
+
+    recorder = CsvRecorder(BENCH_PATH, [f"c{i}" for i in range(BENCH_COLUMNS)], rotate_bytes=256_000)
+    recorder.start()
+    queued_mean, queued_max = _time_calls(lambda: recorder.record(row), BENCH_ROWS)
+    recorder.stop()
+
+    print(f"GUI-thread cost per row (mean / max): writerow+flush {direct_mean:.2f} / {direct_max:.0f} us | "
+          f"CsvRecorder.record {queued_mean:.2f} / {queued_max:.0f} us")
+    print(f"written {recorder.written_count}, dropped {recorder.dropped_count}, files {recorder.file_count}")
+
+    for path in [BENCH_PATH, *BENCH_PATH.parent.glob(f"{BENCH_PATH.stem}_*{BENCH_PATH.suffix}")]:
+        path.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -280,20 +280,17 @@
 #     window.resize(1000, 800)
 #     window.show()
 #     sys.exit(app.exec())
-import csv
 import socket
-import struct
 import sys
 import time
-from collections import deque
 from pathlib import Path
 
-import numpy as np
 import pyqtgraph as pg
 from PyQt6.QtCore import QThread, QTimer, pyqtSignal
 from PyQt6.QtWidgets import (
     QApplication,
     QCheckBox,
+    QComboBox,
     QLabel,
     QMainWindow,
     QPushButton,
@@ -301,6 +298,10 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from plot_decimation import EnvelopeHistory
+from csv_recorder import CsvRecorder
+from packet_codec import GUI_SIGNALS_F32, PacketCodec
+
 
 # ============================================================
 # CONFIGURATION
@@ -330,24 +331,35 @@ SIGNAL_UNITS = [
 
 NUM_SIGNALS = len(SIGNAL_NAMES)
 
-# dSPACE sends six little-endian float32 values.
-PACKET_FORMAT = f"<{NUM_SIGNALS}f"
-EXPECTED_PACKET_SIZE = struct.calcsize(PACKET_FORMAT)
+# dSPACE sends six little-endian float32 values ("<6f"), optionally tagged
+# with the packet_codec layout id.
+PACKET_LAYOUT = GUI_SIGNALS_F32
+EXPECTED_PACKET_SIZE = PACKET_LAYOUT.size
 
-# Number of seconds shown in the plots.
+# Number of seconds shown in the plots by default.
 HISTORY_SECONDS = 10
 
+# Selectable plot windows. Anything older than RAW_HISTORY_SECONDS is
+# drawn from the min/max pyramid instead of the raw samples.
+WINDOW_CHOICES_SECONDS = [10, 30, 60, 300, 900, 3600]
+MAX_HISTORY_SECONDS = 3600
+RAW_HISTORY_SECONDS = 60
+
 # Expected UDP transmission frequency.
 RECEIVE_FREQUENCY = 100
 
-# Maximum number of stored samples.
-HISTORY_SIZE = HISTORY_SECONDS * RECEIVE_FREQUENCY
+# Maximum number of stored full-resolution samples.
+HISTORY_SIZE = RAW_HISTORY_SECONDS * RECEIVE_FREQUENCY
 
 # GUI redraw interval. 20 ms corresponds to approximately 50 FPS.
 GUI_UPDATE_MS = 20
 
+# A ".capt" suffix records in the columnar format of recording_format.py.
 CSV_FILE = Path("dspace_live_recording.csv")
 
+# Start a new numbered CSV file after this many bytes (None = never).
+CSV_ROTATE_BYTES = 200 * 1024 * 1024
+
 
 # ============================================================
 # UDP RECEIVER THREAD
@@ -366,6 +378,7 @@ class UDPReceiver(QThread):
 
         self.running = False
         self.sock = None
+        self.codec = PacketCodec((PACKET_LAYOUT,))
 
     def run(self):
         try:
@@ -395,7 +408,9 @@ class UDPReceiver(QThread):
                 except OSError:
                     break
 
-                if len(packet) != EXPECTED_PACKET_SIZE:
+                layout, values = self.codec.decode(packet)
+
+                if layout is not PACKET_LAYOUT:
                     self.status_changed.emit(
                         f"Rejected packet from {sender[0]}: "
                         f"received {len(packet)} bytes, "
@@ -403,15 +418,6 @@ class UDPReceiver(QThread):
                     )
                     continue
 
-                try:
-                    values = struct.unpack(PACKET_FORMAT, packet)
-
-                except struct.error as error:
-                    self.status_changed.emit(
-                        f"Packet decoding error: {error}"
-                    )
-                    continue
-
                 timestamp = time.perf_counter()
 
                 # Send timestamp and values to the GUI thread.
@@ -453,21 +459,21 @@ class LivePlotWindow(QMainWindow):
         # Relative time reference.
         self.start_time = None
 
-        # Buffers for timestamps and all six signals.
-        self.time_buffer = deque(maxlen=HISTORY_SIZE)
+        # Preallocated full-resolution history plus min/max pyramid.
+        self.history = EnvelopeHistory(
+            NUM_SIGNALS,
+            HISTORY_SIZE,
+            MAX_HISTORY_SECONDS * RECEIVE_FREQUENCY,
+        )
 
-        self.signal_buffers = [
-            deque(maxlen=HISTORY_SIZE)
-            for _ in range(NUM_SIGNALS)
-        ]
+        self.window_seconds = HISTORY_SECONDS
 
         # Latest values received from the UDP thread.
         self.latest_timestamp = None
         self.latest_values = None
 
-        # CSV state.
-        self.csv_handle = None
-        self.csv_writer = None
+        # CSV state. Rows go to a background recorder thread.
+        self.csv_recorder = None
 
         self.received_packet_count = 0
         self.last_packet_display_count = 0
@@ -498,6 +504,28 @@ class LivePlotWindow(QMainWindow):
         self.clear_button.clicked.connect(self.clear_plots)
         main_layout.addWidget(self.clear_button)
 
+        self.window_combo = QComboBox()
+
+        for seconds in WINDOW_CHOICES_SECONDS:
+            self.window_combo.addItem(
+                f"Show last {seconds} s",
+                seconds,
+            )
+
+        self.window_combo.setCurrentIndex(
+            self.window_combo.findData(HISTORY_SECONDS)
+        )
+        self.window_combo.currentIndexChanged.connect(
+            self.set_window
+        )
+        main_layout.addWidget(self.window_combo)
+
+        # Unchecked automatically when the user pans or zooms,
+        # so older history can be inspected.
+        self.follow_checkbox = QCheckBox("Follow live data")
+        self.follow_checkbox.setChecked(True)
+        main_layout.addWidget(self.follow_checkbox)
+
         self.plot_widget = pg.GraphicsLayoutWidget()
         main_layout.addWidget(self.plot_widget)
 
@@ -526,6 +554,11 @@ class LivePlotWindow(QMainWindow):
         for plot in self.plots[1:]:
             plot.setXLink(self.plots[0])
 
+        for plot in self.plots:
+            plot.getViewBox().sigRangeChangedManually.connect(
+                self.stop_following
+            )
+
         self.setCentralWidget(central_widget)
 
     def setup_receiver(self):
@@ -564,47 +597,55 @@ class LivePlotWindow(QMainWindow):
 
         relative_time = timestamp - self.start_time
 
-        self.time_buffer.append(relative_time)
-
-        for index, value in enumerate(values):
-            self.signal_buffers[index].append(value)
+        self.history.append(
+            relative_time,
+            values,
+        )
 
         self.latest_timestamp = relative_time
         self.latest_values = values
         self.received_packet_count += 1
 
-        if self.csv_writer is not None:
-            self.csv_writer.writerow(
-                [relative_time, *values]
+        if self.csv_recorder is not None:
+            # Non-blocking; the recorder thread writes and flushes.
+            self.csv_recorder.record(
+                (relative_time, *values)
             )
 
-            # Flush so that the CSV is updated while acquisition runs.
-            self.csv_handle.flush()
-
     def update_plots(self):
         """
         Updates all six plots using the most recent buffer contents.
         """
 
-        if not self.time_buffer:
+        if not len(self.history):
             return
 
-        times = np.asarray(self.time_buffer, dtype=np.float64)
+        following = self.follow_checkbox.isChecked()
+        latest_time = self.history.latest_time()
+
+        if following:
+            minimum_time = max(0.0, latest_time - self.window_seconds)
+            maximum_time = latest_time
+        else:
+            minimum_time, maximum_time = (
+                self.plots[0].getViewBox().viewRange()[0]
+            )
 
-        for curve, buffer in zip(
+        # Min/max envelope with about two points per horizontal pixel.
+        times, signals = self.history.window(
+            minimum_time,
+            maximum_time,
+            2 * self.plot_widget.width(),
+        )
+
+        for curve, values in zip(
             self.curves,
-            self.signal_buffers,
+            signals,
         ):
-            values = np.asarray(buffer, dtype=np.float32)
             curve.setData(times, values)
 
         # Show a moving time window.
-        latest_time = times[-1]
-
-        if latest_time > HISTORY_SECONDS:
-            minimum_time = latest_time - HISTORY_SECONDS
-            maximum_time = latest_time
-
+        if following and latest_time > self.window_seconds:
             self.plots[0].setXRange(
                 minimum_time,
                 maximum_time,
@@ -623,6 +664,19 @@ class LivePlotWindow(QMainWindow):
 
             self.value_label.setText(value_text)
 
+    def set_window(self, index):
+        self.window_seconds = self.window_combo.itemData(index)
+        self.follow_checkbox.setChecked(True)
+
+        # Shrinking the window must also shrink an auto-ranged view.
+        for plot in self.plots:
+            plot.enableAutoRange(axis="x")
+
+        self.update_plots()
+
+    def stop_following(self, _mask):
+        self.follow_checkbox.setChecked(False)
+
     def update_statistics(self):
         packets_per_second = (
             self.received_packet_count
@@ -633,11 +687,18 @@ class LivePlotWindow(QMainWindow):
             self.received_packet_count
         )
 
-        recording_text = (
-            f"Recording to {CSV_FILE}"
-            if self.csv_writer is not None
-            else "CSV recording disabled"
-        )
+        recorder = self.csv_recorder
+
+        if recorder is None:
+            recording_text = "CSV recording disabled"
+        elif recorder.error is not None:
+            recording_text = f"CSV write error: {recorder.error}"
+        else:
+            recording_text = (
+                f"Recording to {recorder.current_path.name} | "
+                f"{recorder.written_count} rows written, "
+                f"{recorder.dropped_count} dropped"
+            )
 
         self.status_label.setText(
             f"Receiving on port {UDP_PORT} | "
@@ -654,27 +715,18 @@ class LivePlotWindow(QMainWindow):
 
         if recording_enabled:
             try:
-                new_file = not CSV_FILE.exists()
-
-                self.csv_handle = CSV_FILE.open(
-                    mode="a",
-                    newline="",
-                    encoding="utf-8",
+                self.csv_recorder = CsvRecorder(
+                    CSV_FILE,
+                    ["Time_s", *SIGNAL_NAMES],
+                    rotate_bytes=CSV_ROTATE_BYTES,
                 )
-
-                self.csv_writer = csv.writer(self.csv_handle)
-
-                if new_file or CSV_FILE.stat().st_size == 0:
-                    self.csv_writer.writerow(
-                        ["Time_s", *SIGNAL_NAMES]
-                    )
-                    self.csv_handle.flush()
+                self.csv_recorder.start()
 
                 self.status_label.setText(
                     f"Recording data to {CSV_FILE.resolve()}"
                 )
 
-            except OSError as error:
+            except (OSError, ValueError) as error:
                 self.status_label.setText(
                     f"Could not open CSV file: {error}"
                 )
@@ -683,28 +735,21 @@ class LivePlotWindow(QMainWindow):
                 self.record_checkbox.setChecked(False)
                 self.record_checkbox.blockSignals(False)
 
-                self.csv_handle = None
-                self.csv_writer = None
+                self.csv_recorder = None
 
         else:
             self.close_csv_file()
 
     def close_csv_file(self):
-        if self.csv_handle is not None:
-            try:
-                self.csv_handle.flush()
-                self.csv_handle.close()
-            except OSError:
-                pass
+        if self.csv_recorder is not None:
+            # Writes out whatever is still queued before closing.
+            self.csv_recorder.stop()
 
-        self.csv_handle = None
-        self.csv_writer = None
+        self.csv_recorder = None
 
     def clear_plots(self):
-        self.time_buffer.clear()
-
-        for buffer in self.signal_buffers:
-            buffer.clear()
+        self.history.clear()
+        self.follow_checkbox.setChecked(True)
 
         for curve in self.curves:
             curve.clear()
@@ -0,0 +1,107 @@
+import signal
+import sys
+import time
+
+from angle_relay import AngleRelay, elevate_current_thread
+from shared_frame_ring import DEFAULT_FRAME_RING_NAME, DEFAULT_FRAME_RING_SLOTS, SharedFrameRing
+from telemetry_health import DEFAULT_STATS_PORT, StatsServer, TelemetryHealth
+from telemetry_protocol import CAPT_SCHEMA
+from udp_ingest import UdpReceiver, UdpSender
+
+# ---------------------------------------------------------------------------
+# Telemetry Ingestion Daemon
+# ---------------------------------------------------------------------------
+#
+# Owns the dSPACE sockets outside of any GUI process: drains the telemetry
+# socket, forwards the newest angle to Simulink and publishes every frame into
+# a SharedFrameRing. Dashboards and loggers attach to the ring read-only (see
+# USE_INGEST_DAEMON in capt_util.py), so GIL contention and repaints in those
+# processes no longer delay reception or the forwarded angle. Packet loss,
+# jitter and latency are served as JSON on http://127.0.0.1:STATS_PORT/stats.
+#
+# Start it before the dashboards:  python ingest_daemon.py
+
+UDP_IP = "127.0.0.1"
+UDP_PORT = 50000
+
+ANGLE_FORWARD_IP = "127.0.0.1"
+ANGLE_FORWARD_PORT = 5006
+ANGLE_SIGNAL_NAME = "Out1"
+
+RECEIVE_WAIT_SECONDS = 0.05
+STATUS_PERIOD_SECONDS = 5.0
+STATS_PORT = DEFAULT_STATS_PORT
+RELAY_CPU_CORE = None  # Pin the receive / relay thread to this core (None: let the OS choose)
+
+
+def run(relay: AngleRelay, ring: SharedFrameRing, health: TelemetryHealth) -> None:
+    next_status = time.monotonic() + STATUS_PERIOD_SECONDS
+    last_count = 0
+
+    while True:
+        # Forwards the newest angle of the batch, then publishes every frame via on_batch.
+        relay.poll(RECEIVE_WAIT_SECONDS)
+
+        now = time.monotonic()
+        if now >= next_status:
+            count = ring.write_count
+            forward_us = relay.stats()["forward_us"]
+            forward_text = f"{forward_us['p99']:.0f} us" if forward_us["samples"] else "-"
+            print(f"{(count - last_count) / STATUS_PERIOD_SECONDS:.0f} frames/s | "
+                  f"total {count} | lost {health.lost_count} | truncated {relay.receiver.truncated_count} | "
+                  f"forward p99 {forward_text}")
+            last_count = count
+            next_status = now + STATUS_PERIOD_SECONDS
+
+
+def main() -> None:
+    receiver = UdpReceiver(UDP_IP, UDP_PORT, CAPT_SCHEMA)
+    sender = UdpSender(ANGLE_FORWARD_IP, ANGLE_FORWARD_PORT, send_as_binary=True)
+    try:
+        ring = SharedFrameRing.create(CAPT_SCHEMA, DEFAULT_FRAME_RING_NAME, DEFAULT_FRAME_RING_SLOTS)
+    except FileExistsError:
+        receiver.close()
+        sender.close()
+        sys.exit(f"Shared memory '{DEFAULT_FRAME_RING_NAME}' already exists; is another daemon running?")
+
+    health = TelemetryHealth()
+
+    def publish_batch(batch) -> None:
+        for frame in receiver.decode_frames(batch):
+            ring.push(batch.received_monotonic, frame.timestamp, frame.values)
+            health.record(frame.sequence, frame.timestamp, batch.received_time)
+
+    relay = AngleRelay(receiver, sender, ANGLE_SIGNAL_NAME, on_batch=publish_batch)
+    relay.scheduling = elevate_current_thread(RELAY_CPU_CORE)
+
+    def collect_stats() -> dict:
+        stats = health.snapshot()
+        stats["receiver"] = {"truncated": receiver.truncated_count, "frames_published": ring.write_count}
+        stats["relay"] = relay.stats()
+        return stats
+
+    stats_server = None
+    try:
+        stats_server = StatsServer(collect_stats, port=STATS_PORT)
+    except OSError as e:
+        print(f"Telemetry stats endpoint not started ({e}).")
+
+    # Let `kill` run the cleanup below so the segment is unlinked.
+    signal.signal(signal.SIGTERM, lambda _signum, _frame: sys.exit(0))
+
+    print(f"Receiving on {UDP_IP}:{UDP_PORT}, publishing to shared memory '{DEFAULT_FRAME_RING_NAME}'. "
+          f"Press Ctrl+C to exit. Relay thread: {relay.scheduling}.")
+    try:
+        run(relay, ring, health)
+    except KeyboardInterrupt:
+        print("Exiting...")
+    finally:
+        if stats_server is not None:
+            stats_server.close()
+        receiver.close()
+        sender.close()
+        ring.close()
+
+
+if __name__ == "__main__":
+    main()
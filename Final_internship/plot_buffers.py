@@ -0,0 +1,145 @@
+import time
+import tracemalloc
+from collections import deque
+from typing import Sequence
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Columnar Circular Plot Buffer
+# ---------------------------------------------------------------------------
+#
+# Storage is one (columns, 2 * capacity) float64 array. Every sample is written
+# twice, at `index` and `index + capacity`, so the newest `size` samples of a
+# column are always one contiguous slice ending at `write_index + capacity`.
+# view() therefore never copies, and each column of the view is C-contiguous,
+# which is what pyqtgraph's setData wants.
+
+
+class ColumnRingBuffer:
+    """Fixed-capacity columnar history with zero-copy views of the newest samples."""
+
+    def __init__(self, capacity: int, columns: int):
+        self.capacity = capacity
+        self.columns = columns
+        self._data = np.zeros((columns, 2 * capacity), dtype=np.float64)
+        self._write_index = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, row: Sequence[float]) -> None:
+        """Append one sample (one value per column)."""
+        index = self._write_index
+        self._data[:, index] = row
+        self._data[:, index + self.capacity] = row
+        self._write_index = (index + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, column_blocks: Sequence[np.ndarray]) -> None:
+        """Append a block of samples given as one equally long array per column."""
+        count = len(column_blocks[0])
+        if count == 0:
+            return
+
+        capacity = self.capacity
+        skip = max(0, count - capacity)
+        count -= skip
+        index = self._write_index
+        first = min(count, capacity - index)
+        rest = count - first
+
+        for row, block in zip(self._data, column_blocks):
+            head = block[skip:skip + first]
+            row[index:index + first] = head
+            row[index + capacity:index + capacity + first] = head
+            if rest:
+                tail = block[skip + first:]
+                row[:rest] = tail
+                row[capacity:capacity + rest] = tail
+
+        self._write_index = (index + count) % capacity
+        self._size = min(self._size + count, capacity)
+
+    def view(self) -> np.ndarray:
+        """(columns, len(self)) view of the history, oldest sample first. Do not keep across appends."""
+        end = self._write_index + self.capacity
+        return self._data[:, end - self._size:end]
+
+    def column(self, index: int) -> np.ndarray:
+        return self.view()[index]
+
+    def latest(self, index: int) -> float:
+        return float(self._data[index, self._write_index + self.capacity - 1])
+
+    def clear(self) -> None:
+        self._write_index = 0
+        self._size = 0
+
+
+#-------BENCHMARK MAIN ---------- #
+
+BENCH_INPUT_RATE_HZ = 1000
+BENCH_WINDOW_SECONDS = 60
+BENCH_FRAME_RATE_HZ = 50
+BENCH_COLUMNS = 7
+BENCH_FRAMES = 250
+
+
+def _bench(label: str, append_block, arrays_for_plot) -> None:
+    samples_per_frame = BENCH_INPUT_RATE_HZ // BENCH_FRAME_RATE_HZ
+    block = [np.random.standard_normal(samples_per_frame) for _ in range(BENCH_COLUMNS)]
+
+    # Fill the window first so every measured frame works on a full history.
+    for _ in range(BENCH_WINDOW_SECONDS * BENCH_FRAME_RATE_HZ):
+        append_block(block)
+
+    frame_times = []
+    for _ in range(BENCH_FRAMES):
+        start = time.perf_counter()
+        append_block(block)
+        arrays_for_plot()
+        frame_times.append(time.perf_counter() - start)
+
+    # Second pass under tracemalloc: bytes allocated on top of the steady state per frame.
+    tracemalloc.start()
+    frame_bytes = []
+    for _ in range(BENCH_FRAMES):
+        baseline, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        append_block(block)
+        arrays_for_plot()
+        _current, peak = tracemalloc.get_traced_memory()
+        frame_bytes.append(peak - baseline)
+    tracemalloc.stop()
+
+    frame_ms = np.asarray(frame_times) * 1000.0
+    print(
+        f"{label:<22} frame mean {frame_ms.mean():7.3f} ms | p99 {np.percentile(frame_ms, 99):7.3f} ms | "
+        f"allocated per frame {np.mean(frame_bytes) / 1e3:9.1f} kB"
+    )
+
+
+def main() -> None:
+    capacity = BENCH_INPUT_RATE_HZ * BENCH_WINDOW_SECONDS
+    print(f"{BENCH_COLUMNS} columns, {BENCH_INPUT_RATE_HZ} Hz input, {BENCH_WINDOW_SECONDS} s window, "
+          f"{BENCH_FRAME_RATE_HZ} Hz redraw")
+
+    queues = [deque(maxlen=capacity) for _ in range(BENCH_COLUMNS)]
+
+    def deque_append(block):
+        for queue, values in zip(queues, block):
+            queue.extend(values.tolist())
+
+    def deque_arrays():
+        return [np.fromiter(queue, dtype=float) for queue in queues]
+
+    _bench("deque + np.fromiter", deque_append, deque_arrays)
+
+    ring = ColumnRingBuffer(capacity, BENCH_COLUMNS)
+    _bench("ColumnRingBuffer view", ring.extend, ring.view)
+
+
+if __name__ == "__main__":
+    main()
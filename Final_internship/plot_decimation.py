@@ -0,0 +1,212 @@
+import time
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from plot_buffers import ColumnRingBuffer
+
+# ---------------------------------------------------------------------------
+# Min/Max Envelope Decimation
+# ---------------------------------------------------------------------------
+#
+# A screen cannot show more than one vertical line per pixel column, so each
+# channel is cut into ~one bucket per pixel and each bucket is replaced by its
+# minimum and maximum. Spikes survive (unlike plain striding) and setData()
+# receives about two points per pixel no matter how long the window is. The
+# output has the same shape as pyqtgraph's own "peak" downsampling: every
+# bucket start time repeated twice, y alternating min, max.
+
+DEFAULT_LOD_FACTOR = 64     # samples (or blocks) merged into one block per level
+DEFAULT_LOD_LEVELS = 2      # 64 and 4096 raw samples per block
+LOD_OVERSAMPLE = 32         # a level is used if it has at most this many inputs per output point
+MIN_PLOT_POINTS = 200
+
+
+def envelope(times: np.ndarray, lows: np.ndarray, highs: np.ndarray, max_points: int
+             ) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce (signals, n) low/high rows to at most `max_points` interleaved min/max points per signal."""
+    count = len(times)
+    if count == 0:
+        return times, np.empty((lows.shape[0], 0), dtype=np.float64)
+    buckets = max(1, max_points // 2)
+    per_bucket = -(-count // buckets)
+    starts = np.arange(0, count, per_bucket)
+
+    x = np.repeat(times[starts], 2)
+    y = np.empty((lows.shape[0], 2 * len(starts)), dtype=np.float64)
+    # fmin/fmax skip NaN gaps unless the whole bucket is NaN.
+    y[:, 0::2] = np.fmin.reduceat(lows, starts, axis=1)
+    y[:, 1::2] = np.fmax.reduceat(highs, starts, axis=1)
+    return x, y
+
+
+# ---------------------------------------------------------------------------
+# Level-Of-Detail History
+# ---------------------------------------------------------------------------
+#
+# Level 0 is the full-resolution ring for the recent past. Level k keeps one
+# block per `factor**k` raw samples: [block start time, min per signal, max per
+# signal]. Blocks are built incrementally as samples arrive, so a query over an
+# hour of 1 kHz data touches a few thousand pre-reduced blocks instead of
+# millions of samples. window() picks the finest level that still covers the
+# requested range within the point budget, then envelopes that slice.
+
+
+class _EnvelopeLevel:
+    """One pyramid level plus the inputs still waiting to fill its next block."""
+
+    def __init__(self, capacity: int, signal_count: int, factor: int):
+        self.signal_count = signal_count
+        self.factor = factor
+        self.blocks = ColumnRingBuffer(capacity, 1 + 2 * signal_count)
+        self.pending = np.empty((1 + 2 * signal_count, factor), dtype=np.float64)
+        self.pending_count = 0
+
+    def feed(self, rows: np.ndarray) -> np.ndarray:
+        """Consume (1 + 2n, m) rows and return the blocks completed by them."""
+        if self.pending_count:
+            rows = np.concatenate((self.pending[:, :self.pending_count], rows), axis=1)
+
+        n = self.signal_count
+        full = rows.shape[1] // self.factor
+        used = full * self.factor
+        completed = np.empty((rows.shape[0], full), dtype=np.float64)
+        if full:
+            grouped = rows[:, :used].reshape(rows.shape[0], full, self.factor)
+            completed[0] = grouped[0, :, 0]
+            completed[1:1 + n] = np.fmin.reduce(grouped[1:1 + n], axis=2)
+            completed[1 + n:] = np.fmax.reduce(grouped[1 + n:], axis=2)
+            self.blocks.extend(completed)
+
+        remainder = rows.shape[1] - used
+        self.pending[:, :remainder] = rows[:, used:]
+        self.pending_count = remainder
+        return completed
+
+    def clear(self) -> None:
+        self.blocks.clear()
+        self.pending_count = 0
+
+
+class EnvelopeHistory:
+    """Full-resolution recent history plus min/max pyramid levels for long windows."""
+
+    def __init__(
+        self,
+        signal_count: int,
+        raw_capacity: int,
+        span_samples: int,
+        factor: int = DEFAULT_LOD_FACTOR,
+        levels: int = DEFAULT_LOD_LEVELS,
+    ):
+        """`span_samples` is the longest history (in raw samples) the pyramid must cover."""
+        self.signal_count = signal_count
+        self.raw = ColumnRingBuffer(raw_capacity, 1 + signal_count)
+        self.levels = [
+            _EnvelopeLevel(max(1, -(-span_samples // factor ** level)), signal_count, factor)
+            for level in range(1, levels + 1)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def extend(self, times: np.ndarray, signal_blocks: Sequence[np.ndarray]) -> None:
+        """Append a block of samples: `times` plus one equally long array per signal."""
+        if len(times) == 0:
+            return
+        self.raw.extend((times, *signal_blocks))
+
+        # Raw samples enter level 1 as blocks whose min and max are the sample.
+        rows = np.vstack((times, *signal_blocks, *signal_blocks))
+        for level in self.levels:
+            rows = level.feed(rows)
+            if rows.shape[1] == 0:
+                break
+
+    def append(self, timestamp: float, values: Sequence[float]) -> None:
+        self.extend(np.array((timestamp,)), [np.array((value,)) for value in values])
+
+    def latest_time(self) -> float:
+        return self.raw.latest(0)
+
+    def clear(self) -> None:
+        self.raw.clear()
+        for level in self.levels:
+            level.clear()
+
+    def window(self, start_time: float, end_time: float, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (x, y[signals]) for [start_time, end_time] with about `max_points` points per signal."""
+        max_points = max(max_points, MIN_PLOT_POINTS)
+        budget = max_points * LOD_OVERSAMPLE
+
+        raw = self.raw.view()
+        first, last = self._slice(raw[0], start_time, end_time)
+        if last - first <= budget and self._covers(self.raw, raw[0], start_time):
+            times = raw[0, first:last]
+            signals = raw[1:, first:last]
+            if last - first <= max_points:
+                return times, signals
+            return envelope(times, signals, signals, max_points)
+
+        n = self.signal_count
+        for index, level in enumerate(self.levels):
+            blocks = level.blocks.view()
+            first, last = self._slice(blocks[0], start_time, end_time)
+            coarsest = index == len(self.levels) - 1
+            if coarsest or (last - first <= budget and self._covers(level.blocks, blocks[0], start_time)):
+                return envelope(blocks[0, first:last], blocks[1:1 + n, first:last],
+                                blocks[1 + n:, first:last], max_points)
+
+    @staticmethod
+    def _slice(times: np.ndarray, start_time: float, end_time: float) -> Tuple[int, int]:
+        # Keep one sample either side so the curve reaches both plot edges.
+        first = max(int(np.searchsorted(times, start_time, side="left")) - 1, 0)
+        last = min(int(np.searchsorted(times, end_time, side="right")) + 1, len(times))
+        return first, last
+
+    @staticmethod
+    def _covers(buffer: ColumnRingBuffer, times: np.ndarray, start_time: float) -> bool:
+        # A ring that never wrapped still holds everything since the last clear().
+        return len(buffer) < buffer.capacity or times[0] <= start_time
+
+
+#-------BENCHMARK MAIN ---------- #
+
+BENCH_INPUT_RATE_HZ = 1000
+BENCH_SPAN_SECONDS = 3600
+BENCH_RAW_SECONDS = 60
+BENCH_SIGNALS = 6
+BENCH_PIXELS = 1600
+BENCH_QUERIES = 50
+
+
+def main() -> None:
+    span = BENCH_INPUT_RATE_HZ * BENCH_SPAN_SECONDS
+    history = EnvelopeHistory(BENCH_SIGNALS, BENCH_INPUT_RATE_HZ * BENCH_RAW_SECONDS, span)
+
+    chunk = BENCH_INPUT_RATE_HZ // 50
+    start = time.perf_counter()
+    for offset in range(0, span, 50 * chunk):
+        times = np.arange(offset, offset + 50 * chunk) / BENCH_INPUT_RATE_HZ
+        signals = [np.sin(times * (k + 1)) for k in range(BENCH_SIGNALS)]
+        history.extend(times, signals)
+    print(f"Ingested {span} samples x {BENCH_SIGNALS} signals in {time.perf_counter() - start:.2f} s")
+
+    tail_chunk = np.arange(chunk) / BENCH_INPUT_RATE_HZ + BENCH_SPAN_SECONDS
+    start = time.perf_counter()
+    for _ in range(BENCH_QUERIES):
+        history.extend(tail_chunk, [tail_chunk] * BENCH_SIGNALS)
+    print(f"extend() of one 50 Hz tick ({chunk} samples): "
+          f"{(time.perf_counter() - start) / BENCH_QUERIES * 1e3:.3f} ms")
+
+    latest = history.latest_time()
+    for window_seconds in (10, 60, 600, 3600):
+        start = time.perf_counter()
+        for _ in range(BENCH_QUERIES):
+            x, y = history.window(latest - window_seconds, latest, 2 * BENCH_PIXELS)
+        elapsed = (time.perf_counter() - start) / BENCH_QUERIES * 1e3
+        print(f"window {window_seconds:5d} s -> {len(x):5d} points/signal in {elapsed:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
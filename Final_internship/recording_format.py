@@ -0,0 +1,431 @@
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Iterable, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # ControlDesk's interpreter: only RecordingWriter is usable there
+    np = None
+
+# ---------------------------------------------------------------------------
+# Columnar Recording Layout (.capt)
+# ---------------------------------------------------------------------------
+#
+# An append-only file of float64 column chunks behind a JSON header:
+#
+#   offset  size  field
+#   0       8     magic          b"CAPTCOL1"
+#   8       4     header_size    uint32, bytes of JSON that follow
+#   12      4     reserved       0
+#   16      n     header         UTF-8 JSON, space-padded to a multiple of 8:
+#                                signals, units, sample_rate_hz, created, metadata
+#
+# followed by any number of chunks:
+#
+#   0       4     magic          b"CHNK"
+#   4       4     row_count      uint32
+#   8       8*c*r data           little-endian float64, column-major: all rows
+#                                of signal 0, then all rows of signal 1, ...
+#
+# Everything stays 8-byte aligned, so RecordingReader maps the file once and
+# hands out every chunk as a (columns, rows) NumPy view without parsing or
+# copying anything. The writer is unbuffered and writes each chunk with a
+# single write() call, so a chunk is visible to readers as soon as it is
+# complete; one cut short by a crash is ignored by the reader and dropped
+# when appending.
+
+RECORDING_SUFFIX = ".capt"
+RECORDING_MAGIC = b"CAPTCOL1"
+RECORDING_VERSION = 1
+FILE_HEADER = struct.Struct("<8sII")
+CHUNK_MAGIC = b"CHNK"
+CHUNK_HEADER = struct.Struct("<4sI")
+
+DEFAULT_CHUNK_ROWS = 4096   # ~4 s at 1 kHz, 32 KiB per signal
+NAN = float("nan")
+
+
+def _pad8(data: bytes) -> bytes:
+    return data + b" " * (-len(data) % 8)
+
+
+def _float64_bytes(values) -> bytes:
+    if np is not None:
+        return np.ascontiguousarray(values, dtype="<f8").tobytes()
+    buffer = array("d", values)
+    if sys.byteorder != "little":
+        buffer.byteswap()
+    return buffer.tobytes()
+
+
+def _read_header(file) -> tuple[dict, int]:
+    """Return (header dict, offset of the first chunk) of an open recording."""
+    prefix = file.read(FILE_HEADER.size)
+    if len(prefix) < FILE_HEADER.size:
+        raise ValueError(f"{file.name} is too short to be a recording")
+    magic, header_size, _reserved = FILE_HEADER.unpack(prefix)
+    if magic != RECORDING_MAGIC:
+        raise ValueError(f"{file.name} is not a {RECORDING_SUFFIX} recording")
+
+    header = json.loads(file.read(header_size).decode("utf-8"))
+    if header.get("format_version") != RECORDING_VERSION:
+        raise ValueError(f"Unsupported recording version {header.get('format_version')}")
+    return header, FILE_HEADER.size + header_size
+
+
+def _scan_chunks(file, first_chunk: int, column_count: int, file_size: int) -> tuple[list[tuple[int, int]], int]:
+    """Return ([(data offset, rows)], end of the last complete chunk)."""
+    chunks = []
+    offset = first_chunk
+    while offset + CHUNK_HEADER.size <= file_size:
+        file.seek(offset)
+        magic, rows = CHUNK_HEADER.unpack(file.read(CHUNK_HEADER.size))
+        end = offset + CHUNK_HEADER.size + 8 * column_count * rows
+        if magic != CHUNK_MAGIC or end > file_size:
+            break
+        chunks.append((offset + CHUNK_HEADER.size, rows))
+        offset = end
+    return chunks, offset
+
+
+class RecordingWriter:
+    """Appends rows to a .capt file in fixed-size column chunks.
+
+    Needs only the standard library, so it also runs inside ControlDesk.
+    Opening an existing recording with the same signals appends to it.
+    """
+
+    def __init__(
+        self,
+        path,
+        signal_names: Sequence[str],
+        units: Optional[Sequence[str]] = None,
+        sample_rate_hz: Optional[float] = None,
+        metadata: Optional[dict] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ):
+        self.path = os.fspath(path)
+        self.signal_names = list(signal_names)
+        self.chunk_rows = chunk_rows
+        self.row_count = 0
+        self._columns = [array("d") for _ in self.signal_names]
+
+        if units is not None and len(units) != len(self.signal_names):
+            raise ValueError("units must have one entry per signal")
+
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            self._file = open(self.path, "r+b", buffering=0)
+            self._resume()
+        else:
+            self._file = open(self.path, "wb", buffering=0)
+            header = {
+                "format_version": RECORDING_VERSION,
+                "signals": self.signal_names,
+                "units": list(units) if units is not None else [""] * len(self.signal_names),
+                "sample_rate_hz": sample_rate_hz,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "metadata": metadata or {},
+            }
+            header_bytes = _pad8(json.dumps(header).encode("utf-8"))
+            self._file.write(FILE_HEADER.pack(RECORDING_MAGIC, len(header_bytes), 0))
+            self._file.write(header_bytes)
+
+    def _resume(self) -> None:
+        header, first_chunk = _read_header(self._file)
+        if header["signals"] != self.signal_names:
+            raise ValueError(f"{self.path} records {header['signals']}, not {self.signal_names}")
+
+        chunks, end = _scan_chunks(self._file, first_chunk, len(self.signal_names), os.path.getsize(self.path))
+        self.row_count = sum(rows for _offset, rows in chunks)
+        # Drop a chunk cut short by a crash so the new ones line up.
+        self._file.truncate(end)
+        self._file.seek(end)
+
+    def __enter__(self) -> "RecordingWriter":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def append(self, row: Sequence[float]) -> None:
+        # A short or long row would leave the columns at different lengths
+        # and corrupt the next chunk.
+        if len(row) != len(self._columns):
+            raise ValueError(f"Expected {len(self._columns)} values, got {len(row)}")
+        for column, value in zip(self._columns, row):
+            column.append(value)
+        if len(self._columns[0]) >= self.chunk_rows:
+            self._write_pending()
+
+    def writerows(self, rows: Iterable[Sequence[float]]) -> None:
+        """Same call as csv.writer.writerows, so CsvRecorder can drive either writer."""
+        for row in rows:
+            self.append(row)
+
+    def write_block(self, columns) -> None:
+        """Write a (signals, rows) block, e.g. a NumPy array, as one chunk."""
+        self._write_pending()
+        if len(columns) != len(self.signal_names):
+            raise ValueError(f"Expected {len(self.signal_names)} columns, got {len(columns)}")
+
+        rows = len(columns[0])
+        if rows:
+            data = b"".join(_float64_bytes(column) for column in columns)
+            self._file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, rows) + data)
+            self.row_count += rows
+
+    def _write_pending(self) -> None:
+        rows = len(self._columns[0])
+        if not rows:
+            return
+        data = b"".join(_float64_bytes(column) for column in self._columns)
+        self._file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, rows) + data)
+        self.row_count += rows
+        for column in self._columns:
+            del column[:]
+
+    def flush(self) -> None:
+        """Write buffered rows now as a (possibly short) chunk."""
+        self._write_pending()
+
+    def tell(self) -> int:
+        return self._file.tell() + 8 * len(self._columns) * len(self._columns[0])
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+
+class RecordingReader:
+    """Memory-mapped view of a .capt recording; opening is O(number of chunks)."""
+
+    def __init__(self, path):
+        if np is None:
+            raise ImportError("RecordingReader needs NumPy")
+
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as file:
+            header, first_chunk = _read_header(file)
+            file_size = os.path.getsize(self.path)
+            self.signal_names: list[str] = header["signals"]
+            chunk_table, end = _scan_chunks(file, first_chunk, len(self.signal_names), file_size)
+
+        self.units: list[str] = header["units"]
+        self.sample_rate_hz: Optional[float] = header["sample_rate_hz"]
+        self.created: str = header["created"]
+        self.metadata: dict = header["metadata"]
+        self.truncated_bytes = file_size - end
+        self._index = {name: index for index, name in enumerate(self.signal_names)}
+
+        self._map = np.memmap(self.path, dtype=np.uint8, mode="r") if end > first_chunk else None
+        columns = len(self.signal_names)
+        self.chunks: list[np.ndarray] = [
+            self._map[offset:offset + 8 * columns * rows].view("<f8").reshape(columns, rows)
+            for offset, rows in chunk_table
+        ]
+        self._starts = np.cumsum([0] + [rows for _offset, rows in chunk_table])
+
+    def __len__(self) -> int:
+        return int(self._starts[-1])
+
+    def __enter__(self) -> "RecordingReader":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def index_of(self, signal: "str | int") -> int:
+        return signal if isinstance(signal, int) else self._index[signal]
+
+    def column(self, signal: "str | int", start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """One signal over rows [start, stop); only the pages of that signal are read."""
+        index = self.index_of(signal)
+        return self._gather(start, stop, lambda chunk, lo, hi: chunk[index, lo:hi], ())
+
+    def block(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """All signals over rows [start, stop) as a (signals, rows) array."""
+        return self._gather(start, stop, lambda chunk, lo, hi: chunk[:, lo:hi], (len(self.signal_names),))
+
+    def _gather(self, start: int, stop: Optional[int], take, shape: tuple) -> np.ndarray:
+        total = len(self)
+        stop = total if stop is None else min(stop, total)
+        start = max(0, start)
+        if start >= stop:
+            return np.empty(shape + (0,))
+
+        first = int(np.searchsorted(self._starts, start, side="right")) - 1
+        last = int(np.searchsorted(self._starts, stop, side="left")) - 1
+        pieces = []
+        for chunk_index in range(first, last + 1):
+            chunk_start = int(self._starts[chunk_index])
+            lo = max(start - chunk_start, 0)
+            hi = min(stop - chunk_start, self.chunks[chunk_index].shape[1])
+            pieces.append(take(self.chunks[chunk_index], lo, hi))
+
+        # A range inside one chunk is returned as a read-only view of the file.
+        return pieces[0] if len(pieces) == 1 else np.concatenate(pieces, axis=-1)
+
+    def close(self) -> None:
+        self.chunks = []
+        self._map = None
+
+
+# ---------------------------------------------------------------------------
+# CSV Conversion
+# ---------------------------------------------------------------------------
+#
+# The CSV layouts in use (write_from_dSpace.py, LivePlotWindow, the "Save
+# Live Data" buttons) are all one header row of signal names followed by
+# numeric rows, so one converter pair covers them.
+
+def csv_to_recording(
+    csv_path,
+    recording_path,
+    sample_rate_hz: Optional[float] = None,
+    units: Optional[Sequence[str]] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> int:
+    """Convert a header-plus-rows CSV to a .capt recording; returns the row count.
+
+    Empty or non-numeric cells become NaN.
+    """
+    def to_float(cell: str) -> float:
+        try:
+            return float(cell)
+        except ValueError:
+            return NAN
+
+    with open(csv_path, newline="", encoding="utf-8") as csv_file:
+        reader = csv.reader(csv_file)
+        header = [name.strip() for name in next(reader)]
+        width = len(header)
+
+        with RecordingWriter(recording_path, header, units, sample_rate_hz,
+                             {"source": os.path.basename(os.fspath(csv_path))}, chunk_rows) as writer:
+            for row in reader:
+                if not row:
+                    continue
+                values = [to_float(cell) for cell in row[:width]]
+                values.extend([NAN] * (width - len(values)))
+                writer.append(values)
+    return writer.row_count
+
+
+def recording_to_csv(recording_path, csv_path, fmt: str = "%.17g") -> int:
+    """Write a .capt recording back out in the CSV layout; returns the row count.
+
+    The default format round-trips every float64 exactly.
+    """
+    with RecordingReader(recording_path) as reader, open(csv_path, "w", newline="", encoding="utf-8") as csv_file:
+        csv_file.write(",".join(reader.signal_names) + "\n")
+        for chunk in reader.chunks:
+            np.savetxt(csv_file, chunk.T, fmt=fmt, delimiter=",")
+        return len(reader)
+
+
+def save_columns(path, signal_names: Sequence[str], columns, fmt: str = "%.4f") -> None:
+    """Save a (signals, rows) block as CSV or .capt depending on the file suffix."""
+    if os.fspath(path).endswith(RECORDING_SUFFIX):
+        # RecordingWriter appends to an existing file; a save replaces it.
+        if os.path.exists(path):
+            os.remove(path)
+        with RecordingWriter(path, signal_names) as writer:
+            writer.write_block(columns)
+    else:
+        with open(path, "w", encoding="utf-8") as csv_file:
+            csv_file.write(",".join(signal_names) + "\n")
+            np.savetxt(csv_file, np.asarray(columns).T, fmt=fmt, delimiter=",")
+
+
+#-------CONVERTER MAIN ---------- #
+#
+#   python recording_format.py info run.capt
+#   python recording_format.py to-capt capt_live.csv run.capt --rate 50
+#   python recording_format.py to-csv run.capt run.csv
+#   python recording_format.py benchmark
+
+BENCH_SIGNALS = ["pc_time", "angle_rad", "torque_nm", "current_a", "current_b", "current_c", "moza_angle"]
+BENCH_RATE_HZ = 1000
+BENCH_SECONDS = 600
+
+
+def _benchmark() -> None:
+    rows = BENCH_RATE_HZ * BENCH_SECONDS
+    times = np.arange(rows) / BENCH_RATE_HZ
+    block = np.vstack([times] + [np.sin(times * (k + 1)) for k in range(len(BENCH_SIGNALS) - 1)])
+
+    start = time.perf_counter()
+    with RecordingWriter("bench.capt", BENCH_SIGNALS, sample_rate_hz=BENCH_RATE_HZ) as writer:
+        for lo in range(0, rows, DEFAULT_CHUNK_ROWS):
+            writer.write_block(block[:, lo:lo + DEFAULT_CHUNK_ROWS])
+    capt_write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    recording_to_csv("bench.capt", "bench.csv", fmt="%.6f")
+    csv_write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with RecordingReader("bench.capt") as reader:
+        angle = reader.column("angle_rad")
+    capt_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    csv_block = np.loadtxt("bench.csv", delimiter=",", skiprows=1)
+    csv_load = time.perf_counter() - start
+
+    assert np.array_equal(angle, block[1]) and np.allclose(csv_block[:, 1], block[1], atol=1e-6)
+    print(f"{rows} rows x {len(BENCH_SIGNALS)} signals ({BENCH_SECONDS // 60} min at {BENCH_RATE_HZ} Hz)")
+    print(f"  size:          .capt {os.path.getsize('bench.capt') / 1e6:.1f} MB | csv {os.path.getsize('bench.csv') / 1e6:.1f} MB")
+    print(f"  write:         .capt {capt_write * 1e3:.0f} ms | csv {csv_write * 1e3:.0f} ms")
+    print(f"  load 1 signal: .capt {capt_load * 1e3:.1f} ms | np.loadtxt csv {csv_load * 1e3:.0f} ms")
+
+    os.remove("bench.capt")
+    os.remove("bench.csv")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and convert .capt recordings.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    info = commands.add_parser("info", help="print the header and row count")
+    info.add_argument("recording")
+
+    to_capt = commands.add_parser("to-capt", help="convert a CSV recording to .capt")
+    to_capt.add_argument("csv_file")
+    to_capt.add_argument("recording")
+    to_capt.add_argument("--rate", type=float, default=None, help="sample rate [Hz] to store in the header")
+
+    to_csv = commands.add_parser("to-csv", help="convert a .capt recording to CSV")
+    to_csv.add_argument("recording")
+    to_csv.add_argument("csv_file")
+    to_csv.add_argument("--fmt", default="%.17g")
+
+    commands.add_parser("benchmark", help="compare .capt and CSV on a synthetic 10 min, 1 kHz run")
+
+    args = parser.parse_args()
+    if args.command == "info":
+        with RecordingReader(args.recording) as reader:
+            print(f"{len(reader)} rows in {len(reader.chunks)} chunks, sample rate {reader.sample_rate_hz} Hz, "
+                  f"created {reader.created}")
+            for name, unit in zip(reader.signal_names, reader.units):
+                print(f"  {name} [{unit}]" if unit else f"  {name}")
+            if reader.truncated_bytes:
+                print(f"  ({reader.truncated_bytes} bytes of an incomplete chunk ignored)")
+    elif args.command == "to-capt":
+        print(f"{csv_to_recording(args.csv_file, args.recording, args.rate)} rows written to {args.recording}")
+    elif args.command == "to-csv":
+        print(f"{recording_to_csv(args.recording, args.csv_file, args.fmt)} rows written to {args.csv_file}")
+    else:
+        _benchmark()
+
+
+if __name__ == "__main__":
+    main()
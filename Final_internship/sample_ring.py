@@ -0,0 +1,62 @@
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Single-Producer / Single-Consumer Sample Ring
+# ---------------------------------------------------------------------------
+#
+# Rows are [received_time, sender_time, signal_0, signal_1, ...] float64.
+# The producer (UDP worker) only advances `_write_count` and the consumer
+# (GUI tick) only advances `_read_count`. Each counter is published with a
+# single attribute store after the row data is written, which the GIL makes
+# atomic and ordered, so no lock is needed for one producer and one consumer.
+
+RECEIVED_COLUMN = 0
+SENT_COLUMN = 1
+FIRST_SIGNAL_COLUMN = 2
+
+
+class SampleRing:
+    """Bounded lock-free queue of timestamped float64 frames for one producer and one consumer."""
+
+    def __init__(self, capacity: int, signal_count: int):
+        self.capacity = capacity
+        self.signal_count = signal_count
+        self.data = np.full((capacity, FIRST_SIGNAL_COLUMN + signal_count), np.nan, dtype=np.float64)
+        self._write_count = 0
+        self._read_count = 0
+        self.dropped_count = 0
+
+    def __len__(self) -> int:
+        return self._write_count - self._read_count
+
+    def push(self, received_time: float, sender_time: float, values: np.ndarray) -> bool:
+        """Producer side: copy one frame in. Returns False (and counts a drop) when full."""
+        write_count = self._write_count
+        if write_count - self._read_count >= self.capacity:
+            self.dropped_count += 1
+            return False
+
+        row = self.data[write_count % self.capacity]
+        row[RECEIVED_COLUMN] = received_time
+        row[SENT_COLUMN] = sender_time
+        row[FIRST_SIGNAL_COLUMN:] = values
+        self._write_count = write_count + 1
+        return True
+
+    def drain(self) -> np.ndarray:
+        """Consumer side: return every unread row, oldest first, as one (n, columns) array."""
+        read_count = self._read_count
+        write_count = self._write_count
+        pending = write_count - read_count
+        if pending == 0:
+            return self.data[:0].copy()
+
+        start = read_count % self.capacity
+        stop = start + pending
+        if stop <= self.capacity:
+            block = self.data[start:stop].copy()
+        else:
+            block = np.concatenate((self.data[start:], self.data[:stop - self.capacity]))
+
+        self._read_count = write_count
+        return block
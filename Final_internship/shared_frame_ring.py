@@ -0,0 +1,144 @@
+import numpy as np
+
+from sample_ring import FIRST_SIGNAL_COLUMN, RECEIVED_COLUMN, SENT_COLUMN
+from shared_mem_manager import SManager
+from telemetry_protocol import SCHEMA_REGISTRY, SignalSchema
+
+# ---------------------------------------------------------------------------
+# Shared-Memory Frame Ring
+# ---------------------------------------------------------------------------
+#
+# One SManager segment of 8-byte words, written by exactly one process (the
+# ingestion daemon) and read by any number of attached processes:
+#
+#   words                       field
+#   0 .. HEADER_WORDS-1         header: magic, version, capacity, columns,
+#                               schema_id, write_count
+#   HEADER_WORDS .. +capacity   per-slot sequence numbers (uint64)
+#   ... + capacity * columns    rows, same layout as sample_ring.py (float64)
+#
+# Every slot is a seqlock. Frame number k goes to slot k % capacity and, while
+# it is being written, that slot's sequence is 2 * lap + 1 (odd), where
+# lap = k // capacity; afterwards it is 2 * lap + 2. Only then is write_count
+# advanced to k + 1. A reader that expects frame k copies the row and accepts
+# it only if the slot sequence equals 2 * lap + 2 both before and after the
+# copy: any other value means the writer was mid-update or has already lapped
+# the reader, and the frame is counted as dropped. Readers never store into the
+# segment, so they cannot disturb the writer or each other.
+#
+# x86 keeps stores in program order; on weakly ordered CPUs the sequence
+# check still rejects torn rows but may drop a few extra frames.
+
+RING_MAGIC = 0x43415054524E4731  # "CAPTRNG1"
+RING_VERSION = 1
+HEADER_WORDS = 8
+MAGIC_WORD, VERSION_WORD, CAPACITY_WORD, COLUMNS_WORD, SCHEMA_WORD, WRITE_COUNT_WORD = range(6)
+
+DEFAULT_FRAME_RING_NAME = "capt_frame_ring"
+DEFAULT_FRAME_RING_SLOTS = 1 << 14  # ~16 s at 1 kHz before a stalled reader starts dropping
+
+
+class SharedFrameRing:
+    """Single-writer, multi-reader ring of timestamped telemetry frames in shared memory."""
+
+    def __init__(self, manager: SManager, owner: bool):
+        self.manager = manager
+        self.owner = owner
+        words = manager.data
+
+        self.header = words[:HEADER_WORDS].view(np.uint64)
+        if int(self.header[MAGIC_WORD]) != RING_MAGIC or int(self.header[VERSION_WORD]) != RING_VERSION:
+            raise ValueError(f"Shared memory '{manager.sm.name}' is not a frame ring")
+
+        self.capacity = int(self.header[CAPACITY_WORD])
+        self.columns = int(self.header[COLUMNS_WORD])
+        self.schema: SignalSchema = SCHEMA_REGISTRY[int(self.header[SCHEMA_WORD])]
+
+        # Size every view from the header: Windows and macOS round the segment up
+        # to a whole page, so the mapping can be longer than the ring.
+        rows_start = HEADER_WORDS + self.capacity
+        rows_end = rows_start + self.capacity * self.columns
+        if rows_end > len(words):
+            raise ValueError(f"Shared memory '{manager.sm.name}' is too small for its "
+                             f"{self.capacity}x{self.columns} frame ring")
+        self.sequences = words[HEADER_WORDS:rows_start].view(np.uint64)
+        self.rows = words[rows_start:rows_end].reshape(self.capacity, self.columns)
+        if not owner:
+            for view in (self.header, self.sequences, self.rows):
+                view.flags.writeable = False
+
+        # Reader state is private to each process.
+        self._read_count = int(self.header[WRITE_COUNT_WORD])
+        self.dropped_count = 0
+
+    @classmethod
+    def create(cls, schema: SignalSchema, name: str = DEFAULT_FRAME_RING_NAME,
+               capacity: int = DEFAULT_FRAME_RING_SLOTS) -> "SharedFrameRing":
+        """Create the segment; the calling process becomes the only writer."""
+        columns = FIRST_SIGNAL_COLUMN + len(schema)
+        manager = SManager()
+        _sm, words = manager.create_mem(mem_name=name, size=HEADER_WORDS + capacity * (1 + columns),
+                                        dtype=np.float64)
+
+        header = words[:HEADER_WORDS].view(np.uint64)
+        header[:] = (RING_MAGIC, RING_VERSION, capacity, columns, schema.schema_id, 0, 0, 0)
+        return cls(manager, owner=True)
+
+    @classmethod
+    def attach(cls, name: str = DEFAULT_FRAME_RING_NAME) -> "SharedFrameRing":
+        """Attach read-only to a ring created by another process. Raises FileNotFoundError if absent."""
+        manager = SManager()
+        manager.attach_mem(mem_name=name, dtype=np.float64)
+        return cls(manager, owner=False)
+
+    @property
+    def write_count(self) -> int:
+        return int(self.header[WRITE_COUNT_WORD])
+
+    def push(self, received_time: float, sender_time: float, values: np.ndarray) -> None:
+        """Writer side: publish one frame, overwriting the oldest slot."""
+        frame_number = int(self.header[WRITE_COUNT_WORD])
+        slot = frame_number % self.capacity
+        lap = frame_number // self.capacity
+
+        self.sequences[slot] = 2 * lap + 1
+        row = self.rows[slot]
+        row[RECEIVED_COLUMN] = received_time
+        row[SENT_COLUMN] = sender_time
+        row[FIRST_SIGNAL_COLUMN:] = values
+        self.sequences[slot] = 2 * lap + 2
+        self.header[WRITE_COUNT_WORD] = frame_number + 1
+
+    def take_samples(self) -> np.ndarray:
+        """Reader side: every intact frame published since the last call, oldest first."""
+        write_count = int(self.header[WRITE_COUNT_WORD])
+        first = self._read_count
+        if write_count - first > self.capacity:
+            # Lapped while not reading: the oldest frames are already gone.
+            self.dropped_count += write_count - self.capacity - first
+            first = write_count - self.capacity
+        self._read_count = write_count
+        if first == write_count:
+            return self.rows[:0].copy()
+
+        frame_numbers = np.arange(first, write_count, dtype=np.uint64)
+        slots = frame_numbers % np.uint64(self.capacity)
+        expected = 2 * (frame_numbers // np.uint64(self.capacity)) + 2
+
+        before = self.sequences[slots]
+        block = self.rows[slots]
+        after = self.sequences[slots]
+
+        intact = (before == expected) & (after == expected)
+        if not intact.all():
+            self.dropped_count += int(np.count_nonzero(~intact))
+            block = block[intact]
+        return block
+
+    def close(self) -> None:
+        # SharedMemory refuses to close while NumPy views of it are alive.
+        self.header = self.sequences = self.rows = None
+        self.manager.data = None
+        self.manager.close()
+        if self.owner:
+            self.manager.deallocate()
@@ -5,30 +5,182 @@ from multiprocessing import shared_memory
 
 BUFFER_SIZE = 16
 # sine_array=np.sin(np.linspace(0, 2 * np.pi, BUFFER_SIZE)).astype(np.float32)
+
+# ---------------------------------------------------------------------------
+# Seqlock Slot Segment
+# ---------------------------------------------------------------------------
+#
+# create_slots() lays out a float64 segment of 8-byte words:
+#
+#   word 0              sequence      uint64, odd while a frame is being written
+#   word 1              frame_count   uint64, frames written so far
+#   word 2              slot_count    uint64
+#   word 3              history       uint64, frames kept in the history ring
+#   4 .. 4+S            current frame, one float64 per named slot
+#   4+S .. 4+S+N*S      history ring, frame k in row k % N
+#
+# The single writer brackets every update with begin_write()/end_write(). A
+# reader copies the frame and keeps it only if the sequence was even and
+# unchanged across the copy, otherwise it retries.
+
+HEADER_WORDS = 4
+SEQUENCE_WORD, FRAME_COUNT_WORD, SLOT_COUNT_WORD, HISTORY_WORD = range(HEADER_WORDS)
+READ_RETRY_LIMIT = 10000
+
+# Slot names used by the CAPT dashboards (see the commented reader in gui_arch.py).
+CAPT_SLOTS = ("angle", "torque", "phase1", "phase2", "impedance", "admittance")
+
+
 class SManager:
 
     def __init__ (self):
         self.sm = None
         self.data = None
+        self.slot_names = None
+        self.slot_index = {}
+        self.header = None
+        self.frame = None
+        self.history = None
+        self.read_retries = 0
 
-    def create_mem (self, mem_name="shared_mem", size=BUFFER_SIZE):
-        nbytes = BUFFER_SIZE * np.dtype(np.float32).itemsize
+    def create_mem (self, mem_name="shared_mem", size=BUFFER_SIZE, dtype=np.float32):
+        nbytes = size * np.dtype(dtype).itemsize
 
         self.sm = shared_memory.SharedMemory(name=mem_name, create=True, size=nbytes)
-        self.data = np.ndarray((BUFFER_SIZE,), dtype=np.float32, buffer=self.sm.buf)
+        self.data = np.ndarray((size,), dtype=dtype, buffer=self.sm.buf)
 
-        self.data[:] = 0.0
+        self.data[:] = 0
 
         return self.sm, self.data
 
+    def attach_mem (self, mem_name="shared_mem", dtype=np.float32):
+        """Attach to a segment created by another process; it stays owned by its creator."""
+        try:
+            self.sm = shared_memory.SharedMemory(name=mem_name, create=False, track=False)
+        except TypeError:
+            # Python < 3.13 registers every attach with the resource tracker, which then unlinks
+            # the creator's segment when this process exits. Skip that registration.
+            from multiprocessing import resource_tracker
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None if rtype == "shared_memory" else register(name, rtype)
+            try:
+                self.sm = shared_memory.SharedMemory(name=mem_name, create=False)
+            finally:
+                resource_tracker.register = register
+
+        size = self.sm.size // np.dtype(dtype).itemsize
+        self.data = np.ndarray((size,), dtype=dtype, buffer=self.sm.buf)
+
+        return self.sm, self.data
+
+    def create_slots (self, mem_name="shared_mem", slot_names=CAPT_SLOTS, history=0):
+        """Create a seqlock-protected float64 segment with named slots and an optional history ring."""
+        slot_count = len(slot_names)
+        self.create_mem(mem_name, HEADER_WORDS + slot_count * (1 + history), dtype=np.float64)
+        self.data.view(np.uint64)[:HEADER_WORDS] = (0, 0, slot_count, history)
+        self._map_slots(slot_names)
+        return self.sm, self.frame
+
+    def attach_slots (self, mem_name="shared_mem", slot_names=CAPT_SLOTS):
+        """Attach to a segment made by create_slots(); `slot_names` must match the writer's."""
+        self.attach_mem(mem_name, dtype=np.float64)
+        slot_count = int(self.data[:HEADER_WORDS].view(np.uint64)[SLOT_COUNT_WORD])
+        if slot_count != len(slot_names):
+            raise ValueError(f"'{mem_name}' has {slot_count} slots, expected {len(slot_names)}")
+        self._map_slots(slot_names)
+        return self.sm, self.frame
+
+    def _map_slots(self, slot_names):
+        self.slot_names = tuple(slot_names)
+        self.slot_index = {name: index for index, name in enumerate(self.slot_names)}
+        slot_count = len(self.slot_names)
+
+        self.header = self.data[:HEADER_WORDS].view(np.uint64)
+        history = int(self.header[HISTORY_WORD])
+        # Bound every view by the header: Windows and macOS round the segment up to
+        # a whole page, so the mapping can be longer than the slots it holds.
+        history_start = HEADER_WORDS + slot_count
+        history_end = history_start + history * slot_count
+        if history_end > len(self.data):
+            raise ValueError(f"'{self.sm.name}' is too small for {slot_count} slots and {history} history rows")
+        self.frame = self.data[HEADER_WORDS:history_start]
+        self.history = self.data[history_start:history_end].reshape(history, slot_count)
+
+    # --- writer side -------------------------------------------------------
+
+    def begin_write(self):
+        self.header[SEQUENCE_WORD] += 1
+
+    def end_write(self):
+        """Append the current frame to the history ring and publish it."""
+        frame_count = int(self.header[FRAME_COUNT_WORD])
+        if len(self.history):
+            self.history[frame_count % len(self.history)] = self.frame
+        self.header[FRAME_COUNT_WORD] = frame_count + 1
+        self.header[SEQUENCE_WORD] += 1
+
+    def set(self, slot_name, value):
+        """Set one slot; call between begin_write() and end_write()."""
+        self.frame[self.slot_index[slot_name]] = value
+
+    def write_slots(self, **values):
+        self.begin_write()
+        for slot_name, value in values.items():
+            self.frame[self.slot_index[slot_name]] = value
+        self.end_write()
+
     def deallocate(self):
         self.sm.unlink()
 
     def write(self, data):
-        new_data = np.array(data, dtype=np.float32)
-        self.data[:len(new_data)] = new_data
+        new_data = np.array(data, dtype=self.data.dtype)
+        if self.frame is None:
+            self.data[:len(new_data)] = new_data
+            return
+        self.begin_write()
+        self.frame[:len(new_data)] = new_data
+        self.end_write()
+
+    # --- reader side -------------------------------------------------------
+
+    def read(self):
+        """Consistent copy of the current frame, or None if the writer never let go."""
+        snapshot = self._consistent(lambda: self.frame.copy())
+        return None if snapshot is None else snapshot[0]
+
+    def read_dict(self):
+        frame = self.read()
+        return None if frame is None else dict(zip(self.slot_names, frame.tolist()))
+
+    def read_history(self, count=None):
+        """Consistent copy of the last `count` frames (default: all kept), oldest first."""
+        snapshot = self._consistent(lambda: (self.history.copy(), int(self.header[FRAME_COUNT_WORD])))
+        if snapshot is None:
+            return None
+        (rows, frame_count), _sequence = snapshot
+        kept = min(frame_count, len(rows))
+        count = kept if count is None else min(count, kept)
+        order = np.arange(frame_count - count, frame_count) % max(len(rows), 1)
+        return rows[order]
+
+    def _consistent(self, copy):
+        header = self.header
+        for _ in range(READ_RETRY_LIMIT):
+            before = int(header[SEQUENCE_WORD])
+            if before & 1:
+                # Writer is mid-frame; yield in case it was preempted on this core.
+                self.read_retries += 1
+                time.sleep(0)
+                continue
+            value = copy()
+            if int(header[SEQUENCE_WORD]) == before:
+                return value, before
+            self.read_retries += 1
+        return None
 
     def close(self):
+        # SharedMemory refuses to close while NumPy views of it are alive.
+        self.data = self.header = self.frame = self.history = None
         self.sm.close()
 
 #-------TEST MAIN ---------- #
@@ -54,4 +206,123 @@ class SManager:
 #     #     print("Shared memory deallocated.") 
 
 # if __name__ == "__main__":
-#     main()
\ No newline at end of file
+#     main()
+
+#-------STRESS TEST MAIN ---------- #
+#
+# One writer process publishes a frame at 10 kHz in which every slot holds
+# the frame number; reader processes check that every frame they read has
+# identical slots and that history rows are consecutive. Plain unlocked
+# copies of the same segment are counted alongside to show the tears the
+# seqlock is hiding.
+
+STRESS_MEM_NAME = "shared_mem_stress"
+STRESS_RATE_HZ = 10000
+STRESS_SECONDS = 5.0
+STRESS_READERS = 3
+STRESS_SLOTS = tuple(f"slot{i}" for i in range(16))
+STRESS_HISTORY = 64
+
+
+def _stress_writer(ready, stop, result):
+    manager = SManager()
+    manager.attach_slots(STRESS_MEM_NAME, STRESS_SLOTS)
+    ready.wait()
+
+    period = 1.0 / STRESS_RATE_HZ
+    next_time = time.perf_counter()
+    frame_number = 0
+    late = 0
+    while not stop.is_set():
+        frame_number += 1
+        manager.begin_write()
+        for index in range(len(STRESS_SLOTS)):
+            # Slot by slot, like a writer filling in separate signals.
+            manager.frame[index] = frame_number
+        manager.end_write()
+
+        next_time += period
+        remaining = next_time - time.perf_counter()
+        if remaining < 0:
+            late += 1
+        elif remaining > 0.002:
+            time.sleep(remaining - 0.001)
+        while time.perf_counter() < next_time:
+            pass
+    result.put(("writer", frame_number, late))
+    manager.close()
+
+
+def _stress_reader(ready, stop, result):
+    manager = SManager()
+    manager.attach_slots(STRESS_MEM_NAME, STRESS_SLOTS)
+    ready.wait()
+
+    reads = torn = unlocked_torn = history_torn = failed = 0
+    while not stop.is_set():
+        frame = manager.read()
+        if frame is None:
+            failed += 1
+            continue
+        reads += 1
+        if frame.min() != frame.max():
+            torn += 1
+
+        raw = manager.frame.copy()
+        if raw.min() != raw.max():
+            unlocked_torn += 1
+
+        if reads % 100 == 0:
+            rows = manager.read_history()
+            if rows is None:
+                failed += 1
+                continue
+            firsts = rows[:, 0]
+            if len(rows) and ((rows.min(axis=1) != rows.max(axis=1)).any() or (np.diff(firsts) != 1).any()):
+                history_torn += 1
+    result.put(("reader", reads, torn, unlocked_torn, history_torn, failed, manager.read_retries))
+    manager.close()
+
+
+def stress_test():
+    import multiprocessing
+
+    manager = SManager()
+    manager.create_slots(STRESS_MEM_NAME, STRESS_SLOTS, history=STRESS_HISTORY)
+
+    ready = multiprocessing.Barrier(STRESS_READERS + 2)
+    stop = multiprocessing.Event()
+    result = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_stress_writer, args=(ready, stop, result))]
+    processes += [multiprocessing.Process(target=_stress_reader, args=(ready, stop, result))
+                  for _ in range(STRESS_READERS)]
+    for process in processes:
+        process.start()
+
+    print(f"{STRESS_READERS} readers vs one {STRESS_RATE_HZ} Hz writer for {STRESS_SECONDS:.0f} s...")
+    ready.wait()
+    time.sleep(STRESS_SECONDS)
+    stop.set()
+
+    torn_total = 0
+    for _ in processes:
+        report = result.get()
+        if report[0] == "writer":
+            _, frames, late = report
+            print(f"writer: {frames} frames ({frames / STRESS_SECONDS:.0f} Hz), {late} late cycles")
+        else:
+            _, reads, torn, unlocked_torn, history_torn, failed, retries = report
+            torn_total += torn + history_torn
+            print(f"reader: {reads} reads, {torn} torn, {history_torn} torn history reads, "
+                  f"{failed} gave up, {retries} retries | unlocked copies torn: {unlocked_torn}")
+    for process in processes:
+        process.join()
+
+    manager.close()
+    manager.deallocate()
+    print("PASS: no torn reads" if torn_total == 0 else f"FAIL: {torn_total} torn reads")
+    sys.exit(0 if torn_total == 0 else 1)
+
+
+if __name__ == "__main__":
+    stress_test()
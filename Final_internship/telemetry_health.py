@@ -0,0 +1,300 @@
+import json
+import math
+import threading
+import time
+from bisect import bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Telemetry Health Statistics
+# ---------------------------------------------------------------------------
+#
+# Tracks the dSPACE stream as the receiver sees it, frame by frame:
+#
+#   sequence     gaps (lost packets), late packets that fill an earlier gap
+#                (reordered), repeats (duplicates) and sender restarts
+#   arrival      inter-arrival histogram and the RFC 3550 jitter estimate, over
+#                receiver wake-ups: frames drained in one batch share a receive
+#                stamp, so the intervals between them are only counted (batched)
+#   latency      receive wall clock minus the sender timestamp; only absolute
+#                when both ends share a clock, but its spread above the
+#                window minimum is queueing delay either way
+#   GUI pickup   how long received samples waited for the GUI tick
+#
+# Network trouble shows up as loss, jitter and latency spread; a slow GUI shows
+# up as pickup delay while the network numbers stay clean.
+
+# Late packets further behind the highest sequence than this count as a sender
+# restart (udp_send.py starts again from 0), not as reordering or duplicates.
+SEQUENCE_WINDOW = 64
+LATENCY_WINDOW = 4096  # Recent samples kept for the latency / pickup percentiles
+INTERARRIVAL_BIN_EDGES_MS = (0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0)
+
+DEFAULT_STATS_HOST = "127.0.0.1"
+DEFAULT_STATS_PORT = 8765
+
+
+class RecentSamples:
+    """Fixed window of the newest float samples, summarised on demand."""
+
+    def __init__(self, capacity: int):
+        self.values = np.full(capacity, np.nan)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+
+    def extend(self, values: np.ndarray) -> None:
+        values = values[-len(self.values):]
+        indices = (self.count + np.arange(len(values))) % len(self.values)
+        self.values[indices] = values
+        self.count += len(values)
+
+    def summary(self) -> dict:
+        filled = self.values[:min(self.count, len(self.values))]
+        filled = filled[np.isfinite(filled)]
+        if not len(filled):
+            return {"samples": 0}
+        p50, p95, p99 = np.percentile(filled, (50, 95, 99))
+        return {
+            "samples": len(filled),
+            "min": float(filled.min()),
+            "mean": float(filled.mean()),
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "max": float(filled.max()),
+        }
+
+
+class TelemetryHealth:
+    """Sequence, arrival, latency and GUI pickup statistics of one telemetry stream.
+
+    record() is called by the receiving thread for every frame; snapshot() may be
+    called from any thread and returns plain JSON-serialisable data.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.received_count = 0
+            self.lost_count = 0
+            self.gap_count = 0
+            self.reordered_count = 0
+            self.duplicate_count = 0
+            self.restart_count = 0
+            self._expected_before_restart = 0
+            self.first_sequence: Optional[int] = None
+            self.highest_sequence: Optional[int] = None
+            self._highest_sender_time = math.nan
+            self._seen = bytearray(SEQUENCE_WINDOW)
+
+            self.last_received_time: Optional[float] = None
+            self._last_transit: Optional[float] = None
+            self.jitter_ms = 0.0
+            self.max_interarrival_ms = 0.0
+            self.batched_count = 0
+            self._interarrival_sum_ms = 0.0
+            self.interarrival_counts = [0] * (len(INTERARRIVAL_BIN_EDGES_MS) + 1)
+
+            self._latency_ms = RecentSamples(LATENCY_WINDOW)
+            self._pickup_ms = RecentSamples(LATENCY_WINDOW)
+
+    def record(self, sequence: Optional[int], sender_time: float, received_time: float) -> None:
+        """Account for one frame. `received_time` is time.time() when it was read.
+
+        Frames without a sender counter (sequence None) skip the sequence statistics.
+        A frame with the same `received_time` as the previous one came in the same
+        batch: the zero interval says nothing about the network and is only counted.
+        """
+        with self._lock:
+            self.received_count += 1
+            if sequence is not None:
+                self._record_sequence(sequence, sender_time)
+
+            transit = received_time - sender_time
+            if received_time == self.last_received_time:
+                self.batched_count += 1
+            elif self.last_received_time is not None:
+                interarrival_ms = (received_time - self.last_received_time) * 1000.0
+                self._interarrival_sum_ms += interarrival_ms
+                self.max_interarrival_ms = max(self.max_interarrival_ms, interarrival_ms)
+                self.interarrival_counts[bisect_right(INTERARRIVAL_BIN_EDGES_MS, interarrival_ms)] += 1
+                if self._last_transit is not None and math.isfinite(transit):
+                    # RFC 3550: smoothed change in transit time between the first
+                    # packets of consecutive wake-ups.
+                    deviation_ms = abs(transit - self._last_transit) * 1000.0
+                    self.jitter_ms += (deviation_ms - self.jitter_ms) / 16.0
+            if received_time != self.last_received_time and math.isfinite(transit):
+                self._last_transit = transit
+            self.last_received_time = received_time
+
+            if math.isfinite(transit):
+                self._latency_ms.add(transit * 1000.0)
+
+    def _record_sequence(self, sequence: int, sender_time: float) -> None:
+        highest = self.highest_sequence
+        seen = self._seen
+        # A repeat of a sequence already seen but stamped later than the newest
+        # packet is no duplicate: the sender restarted within the window.
+        restarted = highest is not None and (
+            sequence <= highest - SEQUENCE_WINDOW
+            or (sequence <= highest and seen[sequence % SEQUENCE_WINDOW] and sender_time > self._highest_sender_time)
+        )
+        if highest is None or restarted:
+            if restarted:
+                self.restart_count += 1
+                self._expected_before_restart += highest - self.first_sequence + 1
+            self.first_sequence = self.highest_sequence = sequence
+            seen[:] = bytes(SEQUENCE_WINDOW)
+            seen[sequence % SEQUENCE_WINDOW] = 1
+            self._highest_sender_time = sender_time
+            return
+
+        if sequence > highest:
+            gap = sequence - highest - 1
+            if gap:
+                self.gap_count += 1
+                self.lost_count += gap
+            # Forget the slots the window slides over.
+            for skipped in range(highest + 1, highest + 1 + min(gap, SEQUENCE_WINDOW)):
+                seen[skipped % SEQUENCE_WINDOW] = 0
+            seen[sequence % SEQUENCE_WINDOW] = 1
+            self.highest_sequence = sequence
+            self._highest_sender_time = sender_time
+        elif seen[sequence % SEQUENCE_WINDOW]:
+            self.duplicate_count += 1
+        else:
+            seen[sequence % SEQUENCE_WINDOW] = 1
+            self.reordered_count += 1
+            # Arrived after a newer packet. It was counted lost only if a gap skipped
+            # it, not if it predates the first packet seen (e.g. after a restart).
+            if sequence >= self.first_sequence:
+                self.lost_count -= 1
+
+    def record_pickup(self, delays_seconds: np.ndarray) -> None:
+        """Account for how long samples waited between reception and the GUI tick."""
+        with self._lock:
+            self._pickup_ms.extend(np.asarray(delays_seconds, dtype=np.float64) * 1000.0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            expected = self._expected_before_restart
+            if self.highest_sequence is not None:
+                expected += self.highest_sequence - self.first_sequence + 1
+            intervals = sum(self.interarrival_counts)
+            last_age = None
+            if self.last_received_time is not None:
+                last_age = time.time() - self.last_received_time
+
+            latency = self._latency_ms.summary()
+            if latency["samples"]:
+                latency["spread_p99"] = latency["p99"] - latency["min"]
+
+            return {
+                "sequence": {
+                    "received": self.received_count,
+                    "expected": expected,
+                    "lost": self.lost_count,
+                    "loss_ratio": self.lost_count / expected if expected else 0.0,
+                    "gaps": self.gap_count,
+                    "reordered": self.reordered_count,
+                    "duplicates": self.duplicate_count,
+                    "sender_restarts": self.restart_count,
+                    "highest": self.highest_sequence,
+                },
+                "interarrival_ms": {
+                    "mean": self._interarrival_sum_ms / intervals if intervals else None,
+                    "max": self.max_interarrival_ms,
+                    "jitter": self.jitter_ms,
+                    "batched": self.batched_count,
+                    "bin_edges": list(INTERARRIVAL_BIN_EDGES_MS),
+                    "counts": list(self.interarrival_counts),
+                },
+                "latency_ms": latency,
+                "gui_pickup_ms": self._pickup_ms.summary(),
+                "last_packet_age_s": last_age,
+            }
+
+
+# ---------------------------------------------------------------------------
+# JSON Stats Endpoint
+# ---------------------------------------------------------------------------
+
+class StatsServer:
+    """Serves `stats_provider()` as JSON on GET /stats from a daemon thread."""
+
+    def __init__(self, stats_provider: Callable[[], dict], host: str = DEFAULT_STATS_HOST,
+                 port: int = DEFAULT_STATS_PORT):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.rstrip("/") not in ("", "/stats"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(stats_provider(), allow_nan=False, default=str).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args) -> None:
+                pass
+
+        # Raises OSError when the port is taken (e.g. by ingest_daemon.py).
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}/stats"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+#-------BENCHMARK MAIN ---------- #
+#
+# Replays one second of 1 kHz frames with 1% loss, some swapped and repeated
+# packets and a late burst, then prints the per-frame record() cost and the
+# snapshot as the endpoint would serve it.
+
+BENCH_FRAMES = 10_000
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    frames = []
+    now = time.time() - BENCH_FRAMES * 1e-3
+    for sequence in range(BENCH_FRAMES):
+        if rng.random() < 0.01:
+            continue
+        sent = now + sequence * 1e-3
+        delay = 0.0005 + rng.exponential(0.0002) + (0.02 if 5000 <= sequence < 5020 else 0.0)
+        frames.append((sequence, sent, sent + delay))
+    for index in range(100, len(frames) - 1, 997):
+        (first, first_sent, first_received), (second, second_sent, second_received) = frames[index:index + 2]
+        frames[index:index + 2] = [(second, second_sent, first_received), (first, first_sent, second_received)]
+    last_received = frames[-1][2]
+    for offset, (sequence, sent, _received) in enumerate(frames[-10:-5], start=1):
+        frames.append((sequence, sent, last_received + offset * 1e-3))
+
+    health = TelemetryHealth()
+    start = time.perf_counter()
+    for sequence, sent, received in frames:
+        health.record(sequence, sent, received)
+    seconds = time.perf_counter() - start
+
+    print(f"record(): {seconds / len(frames) * 1e6:.2f} us/frame over {len(frames)} frames")
+    print(json.dumps(health.snapshot(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
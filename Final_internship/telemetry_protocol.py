@@ -0,0 +1,305 @@
+import json
+import math
+import struct
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+
+try:
+    import msgspec
+except ImportError:  # optional: typed JSON decoding of legacy packets
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # optional: faster generic JSON parsing
+    orjson = None
+
+# ---------------------------------------------------------------------------
+# Binary Frame Layout
+# ---------------------------------------------------------------------------
+#
+# A telemetry frame is a fixed 24-byte little-endian header followed by
+# `signal_count` float64 values in schema order:
+#
+#   offset  size  field
+#   0       4     magic          b"CAPT"
+#   4       1     version        FRAME_VERSION
+#   5       1     schema_id      key into SCHEMA_REGISTRY
+#   6       2     signal_count   number of float64 values in the payload
+#   8       8     sequence       uint64 sender packet counter
+#   16      8     timestamp      float64 sender clock [s]
+#   24      8*n   payload        float64 signal values
+#
+# The header is 24 bytes so the payload stays 8-byte aligned for np.frombuffer.
+
+FRAME_MAGIC = b"CAPT"
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("<4sBBHQd")
+FRAME_HEADER_SIZE = FRAME_HEADER.size
+PAYLOAD_DTYPE = np.dtype("<f8")
+
+
+class SignalSchema:
+    """Ordered signal names and their float64 offsets inside a frame payload."""
+
+    def __init__(self, schema_id: int, signal_names: Iterable[str]):
+        self.schema_id = schema_id
+        self.signal_names = tuple(signal_names)
+        self.offsets = {name: index for index, name in enumerate(self.signal_names)}
+        self.payload_struct = struct.Struct(f"<{len(self.signal_names)}d")
+        self.frame_size = FRAME_HEADER_SIZE + self.payload_struct.size
+        self.json_decoder: Optional["JsonFrameDecoder"] = None  # built on the first JSON packet
+
+    def __len__(self) -> int:
+        return len(self.signal_names)
+
+    def index_of(self, signal_name: str) -> Optional[int]:
+        return self.offsets.get(signal_name)
+
+
+SCHEMA_REGISTRY: dict[int, SignalSchema] = {}
+
+
+def register_schema(schema_id: int, signal_names: Iterable[str]) -> SignalSchema:
+    """Register a payload layout so receivers can resolve frames by schema id."""
+    if not 0 <= schema_id <= 0xFF:
+        raise ValueError(f"Schema id must fit in one byte, got {schema_id}")
+
+    schema = SignalSchema(schema_id, signal_names)
+    existing = SCHEMA_REGISTRY.get(schema_id)
+    if existing is not None and existing.signal_names != schema.signal_names:
+        raise ValueError(f"Schema id {schema_id} is already registered as {existing.signal_names}")
+
+    SCHEMA_REGISTRY[schema_id] = schema
+    return schema
+
+
+# Default dSPACE layout used by the CAPT dashboards.
+CAPT_SCHEMA = register_schema(1, ("Out1", "Torque", "AO_ch8", "AO_ch16"))
+
+
+# ---------------------------------------------------------------------------
+# Decoded Frame
+# ---------------------------------------------------------------------------
+
+class TelemetryFrame:
+    """One decoded sample: header fields plus a float64 view of the payload.
+
+    `sequence` is None for JSON packets without a `packet` counter.
+    """
+
+    __slots__ = ("sequence", "timestamp", "values", "schema")
+
+    def __init__(self, sequence: Optional[int], timestamp: float, values: np.ndarray, schema: SignalSchema):
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.values = values
+        self.schema = schema
+
+    def get(self, signal_name: str, default: Optional[float] = None) -> Optional[float]:
+        """Return a finite signal value, or `default` when it is missing/NaN/inf."""
+        index = self.schema.offsets.get(signal_name)
+        if index is None:
+            return default
+        value = float(self.values[index])
+        return value if math.isfinite(value) else default
+
+    def copy(self) -> "TelemetryFrame":
+        """Return a frame that owns its payload (binary frames view the receive buffer)."""
+        return TelemetryFrame(self.sequence, self.timestamp, self.values.copy(), self.schema)
+
+
+# ---------------------------------------------------------------------------
+# Encoding / Decoding
+# ---------------------------------------------------------------------------
+
+def encode_frame(schema: SignalSchema, sequence: int, timestamp: float, values: Iterable[float]) -> bytes:
+    """Pack one sample into the binary frame format."""
+    header = FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, schema.schema_id, len(schema), sequence, timestamp)
+    return header + schema.payload_struct.pack(*values)
+
+
+def decode_binary_frame(data) -> Optional[TelemetryFrame]:
+    """Decode a binary frame without creating per-signal Python objects."""
+    if len(data) < FRAME_HEADER_SIZE:
+        return None
+
+    magic, version, schema_id, signal_count, sequence, timestamp = FRAME_HEADER.unpack_from(data)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        return None
+
+    schema = SCHEMA_REGISTRY.get(schema_id)
+    if schema is None or len(schema) != signal_count or len(data) < schema.frame_size:
+        return None
+
+    values = np.frombuffer(data, dtype=PAYLOAD_DTYPE, count=signal_count, offset=FRAME_HEADER_SIZE)
+    return TelemetryFrame(sequence, timestamp, values, schema)
+
+
+JSON_BACKENDS = ("msgspec", "orjson", "json")
+
+
+class JsonFrameDecoder:
+    """Decodes legacy dSPACE JSON packets straight into a schema's payload layout.
+
+    With msgspec installed, packets are parsed into a fixed record built from the
+    schema: unknown keys (e.g. `elapsed_time`) are skipped by the parser and no dict
+    is created. Packets the typed record rejects (numbers sent as strings, NaN
+    literals, a non-integer `packet`) fall back to the generic path through orjson
+    or json. Either way, non-finite signal values are stored as NaN.
+    """
+
+    def __init__(self, schema: SignalSchema, backend: Optional[str] = None):
+        """`backend` is one of JSON_BACKENDS; None picks the fastest one installed."""
+        if backend is None:
+            backend = "msgspec" if msgspec is not None else "orjson" if orjson is not None else "json"
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"Unknown JSON backend {backend!r}; use one of {JSON_BACKENDS}")
+        if backend == "msgspec" and msgspec is None or backend == "orjson" and orjson is None:
+            raise ValueError(f"JSON backend {backend!r} is not installed")
+
+        self.schema = schema
+        self.backend = backend
+        self._use_orjson = backend != "json" and orjson is not None
+        self._typed_decoder = None
+
+        reserved = {"packet", "timestamp"}
+        if backend == "msgspec" and not reserved.intersection(schema.signal_names):
+            fields = [("packet", Optional[int], None), ("timestamp", float, math.nan)]
+            fields += [(f"signal_{index}", Optional[float], None) for index in range(len(schema))]
+            rename = {f"signal_{index}": name for index, name in enumerate(schema.signal_names)}
+            record_type = msgspec.defstruct("JsonPacket", fields, rename=rename, gc=False)
+            self._typed_decoder = msgspec.json.Decoder(record_type)
+
+    def decode(self, data) -> Optional[TelemetryFrame]:
+        if self._typed_decoder is not None:
+            try:
+                record = self._typed_decoder.decode(data)
+            except msgspec.DecodeError:
+                pass
+            else:
+                fields = msgspec.structs.astuple(record)
+                signals = fields[2:]
+                # None (JSON null) becomes NaN in the float64 conversion.
+                values = np.array(signals, dtype=PAYLOAD_DTYPE)
+                if math.inf in signals or -math.inf in signals:
+                    values[np.isinf(values)] = np.nan
+                return TelemetryFrame(fields[0], fields[1], values, self.schema)
+
+        packet = _loads_json(data, self._use_orjson)
+        if not isinstance(packet, dict):
+            return None
+
+        try:
+            values = np.array([packet.get(name) for name in self.schema.signal_names], dtype=PAYLOAD_DTYPE)
+            values[np.isinf(values)] = np.nan
+        except (TypeError, ValueError):
+            values = np.full(len(self.schema), np.nan, dtype=PAYLOAD_DTYPE)
+            for name, index in self.schema.offsets.items():
+                try:
+                    value = float(packet.get(name))
+                except (TypeError, ValueError):
+                    continue
+                if math.isfinite(value):
+                    values[index] = value
+
+        try:
+            sequence = int(packet["packet"])
+        except (KeyError, TypeError, ValueError):
+            sequence = None
+        try:
+            timestamp = float(packet.get("timestamp", math.nan))
+        except (TypeError, ValueError):
+            timestamp = math.nan
+
+        return TelemetryFrame(sequence, timestamp, values, self.schema)
+
+
+def _loads_json(data, use_orjson: bool = True):
+    if use_orjson and orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # orjson rejects the NaN/Infinity literals json.dumps writes
+    try:
+        return json.loads(bytes(data).decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+
+
+def decode_json_frame(data, schema: SignalSchema) -> Optional[TelemetryFrame]:
+    """Decode a legacy dSPACE JSON packet into the same frame representation."""
+    decoder = schema.json_decoder
+    if decoder is None:
+        decoder = schema.json_decoder = JsonFrameDecoder(schema)
+    return decoder.decode(data)
+
+
+def decode_datagram(data, json_schema: SignalSchema = CAPT_SCHEMA) -> Optional[TelemetryFrame]:
+    """Decode either frame format; `json_schema` maps legacy JSON keys to offsets."""
+    if len(data) >= FRAME_HEADER_SIZE and data[0] == FRAME_MAGIC[0]:
+        return decode_binary_frame(data)
+    return decode_json_frame(data, json_schema)
+
+
+#-------BENCHMARK MAIN ---------- #
+#
+# One second of udp_send.py traffic at 10 kHz: decode_json_frame against the
+# old json.loads + isinstance + per-key float()/math.isfinite chain.
+
+BENCH_PACKET_RATE_HZ = 10_000
+
+
+def _legacy_decode(data: bytes) -> Optional[list[Optional[float]]]:
+    try:
+        packet = json.loads(data.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    if not isinstance(packet, dict):
+        return None
+
+    values = []
+    for name in CAPT_SCHEMA.signal_names:
+        try:
+            value = float(packet.get(name))
+            values.append(value if math.isfinite(value) else None)
+        except (TypeError, ValueError):
+            values.append(None)
+    return values
+
+
+def _bench(label: str, decode, packets: list[bytes]) -> None:
+    start = time.perf_counter()
+    for data in packets:
+        decode(data)
+    seconds = time.perf_counter() - start
+    print(f"{label:<32} {seconds / len(packets) * 1e6:6.2f} us/packet | "
+          f"{seconds * 100:5.1f}% of one core at {BENCH_PACKET_RATE_HZ} packets/s")
+
+
+def main() -> None:
+    packets = []
+    for index in range(BENCH_PACKET_RATE_HZ):
+        t = index / BENCH_PACKET_RATE_HZ
+        packet = {"packet": index, "timestamp": 1.7e9 + t, "elapsed_time": t}
+        packet.update(zip(CAPT_SCHEMA.signal_names, (math.sin(t), 0.5 * math.cos(t), 0.1 * t, None)))
+        packets.append(json.dumps(packet).encode("utf-8"))
+
+    for data in packets[:100]:
+        expected = _legacy_decode(data)
+        frame = decode_json_frame(data, CAPT_SCHEMA)
+        assert [frame.get(name) for name in CAPT_SCHEMA.signal_names] == expected
+
+    _bench("json.loads + _read_number", _legacy_decode, packets)
+    for backend in JSON_BACKENDS:
+        try:
+            decoder = JsonFrameDecoder(CAPT_SCHEMA, backend)
+        except ValueError:
+            continue  # not installed
+        _bench(f"JsonFrameDecoder ({backend})", decoder.decode, packets)
+
+
+if __name__ == "__main__":
+    main()
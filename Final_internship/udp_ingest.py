@@ -0,0 +1,173 @@
+import json
+import select
+import socket
+import struct
+import time
+from typing import Iterator
+
+from telemetry_protocol import CAPT_SCHEMA, SignalSchema, TelemetryFrame, decode_datagram
+
+# ---------------------------------------------------------------------------
+# Batched UDP Reception
+# ---------------------------------------------------------------------------
+#
+# CPython does not expose recvmmsg(), so a batch is drained with repeated
+# recvfrom_into() calls into preallocated slots. This still avoids allocating
+# a new bytes object per datagram, and select() lets the caller sleep in the
+# kernel until data arrives instead of polling on a fixed interval.
+
+DEFAULT_RING_SLOTS = 512
+DEFAULT_SLOT_SIZE = 2048          # dSPACE JSON packets are well below this
+DEFAULT_RECEIVE_BUFFER = 4 << 20  # 4 MiB kernel buffer absorbs GUI stalls
+
+
+class DatagramRing:
+    """Fixed pool of reusable receive buffers filled by one drain() call.
+
+    received_time (time.time()) and received_monotonic are taken once per
+    drain, when the socket woke up, so decoding a batch doesn't skew them.
+    TelemetryHealth counts frames sharing a stamp as batched rather than as
+    zero inter-arrival intervals.
+    """
+
+    def __init__(self, slots: int = DEFAULT_RING_SLOTS, slot_size: int = DEFAULT_SLOT_SIZE):
+        self.buffers = [bytearray(slot_size) for _ in range(slots)]
+        self.views = [memoryview(buffer) for buffer in self.buffers]
+        self.lengths = [0] * slots
+        self.count = 0
+        self.received_time = 0.0
+        self.received_monotonic = 0.0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def capacity(self) -> int:
+        return len(self.buffers)
+
+    def datagram(self, index: int) -> memoryview:
+        return self.views[index][:self.lengths[index]]
+
+    def datagrams(self) -> Iterator[memoryview]:
+        """Yield views of the datagrams from the last drain; valid until the next one."""
+        for index in range(self.count):
+            yield self.views[index][:self.lengths[index]]
+
+
+class BatchUdpReceiver:
+    """Non-blocking UDP socket drained in batches into a DatagramRing."""
+
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        slots: int = DEFAULT_RING_SLOTS,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+        receive_buffer: int = DEFAULT_RECEIVE_BUFFER,
+    ):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+        except OSError:
+            pass
+        self.socket.bind((ip, port))
+        self.socket.setblocking(False)
+
+        self.ring = DatagramRing(slots, slot_size)
+        self.truncated_count = 0
+
+    def wait_readable(self, timeout: float) -> bool:
+        """Block in the kernel until a datagram is waiting or `timeout` seconds pass."""
+        try:
+            readable, _, _ = select.select([self.socket], [], [], timeout)
+        except (OSError, ValueError):
+            return False
+        return bool(readable)
+
+    def drain(self) -> DatagramRing:
+        """Copy every waiting datagram (up to the ring capacity) into the ring."""
+        ring = self.ring
+        views, lengths = ring.views, ring.lengths
+        receive_into = self.socket.recvfrom_into
+        slot_size = len(views[0])
+        ring.received_time = time.time()
+        ring.received_monotonic = time.monotonic()
+
+        count = 0
+        while count < ring.capacity:
+            try:
+                nbytes, _sender = receive_into(views[count])
+            except (BlockingIOError, OSError):
+                break
+            if nbytes >= slot_size:
+                # Datagram filled the slot and was probably cut off; drop it.
+                self.truncated_count += 1
+                continue
+            lengths[count] = nbytes
+            count += 1
+
+        ring.count = count
+        return ring
+
+    def receive_batch(self, timeout: float) -> DatagramRing:
+        """Wait up to `timeout` seconds for data, then drain everything available."""
+        if not self.wait_readable(timeout):
+            self.ring.count = 0
+            return self.ring
+        return self.drain()
+
+    def close(self) -> None:
+        try:
+            self.socket.close()
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Telemetry Sockets
+# ---------------------------------------------------------------------------
+
+class UdpReceiver(BatchUdpReceiver):
+    """Batched UDP receiver for dSPACE binary telemetry frames (legacy JSON accepted)."""
+
+    def __init__(self, ip: str, port: int, json_schema: SignalSchema = CAPT_SCHEMA):
+        super().__init__(ip, port)
+        self.json_schema = json_schema
+
+    def read_frames(self, timeout: float) -> Iterator[TelemetryFrame]:
+        """Wait up to `timeout` seconds, then yield every waiting frame, oldest first.
+
+        Binary frames view the receive slots, so copy out anything kept past the next call.
+        """
+        return self.decode_frames(self.receive_batch(timeout))
+
+    def decode_frames(self, ring: DatagramRing) -> Iterator[TelemetryFrame]:
+        """Yield the frames of an already drained batch that match this receiver's schema."""
+        for datagram in ring.datagrams():
+            frame = decode_datagram(datagram, self.json_schema)
+            if frame is not None and frame.schema is self.json_schema:
+                yield frame
+
+
+class UdpSender:
+    """UDP sender for forwarding signals."""
+
+    def __init__(self, ip: str, port: int, send_as_binary: bool = True):
+        self.ip = ip
+        self.port = port
+        self.send_as_binary = send_as_binary
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send_angle(self, angle: float) -> None:
+        data = struct.pack("<d", float(angle)) if self.send_as_binary else json.dumps({"angle": angle}).encode("utf-8")
+        try:
+            self.socket.sendto(data, (self.ip, self.port))
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        try:
+            self.socket.close()
+        except OSError:
+            pass
@@ -258,10 +258,9 @@
 # if __name__ == "__main__":
 #     main()
 # Keep the most recent valid angle
-import socket
-import struct
-import time
+from packet_codec import SIGNALS_F32, SIGNALS_F64, PacketCodec
 from shared_mem_manager import SManager
+from udp_bridge import UdpBridge
 
 # -------------------------------------------------
 # Configuration
@@ -271,21 +270,12 @@ LISTEN_PORT = 5005
 
 FORWARD_IP = "127.0.0.1"
 FORWARD_PORT = 5006
+FORWARD_RATE_HZ = 1000          # Simulink gets the held angle at this rate, input or not
 
 MEM_NAME = "shared_mem"
 
-# -------------------------------------------------
-# Receiver Socket (dSPACE -> Python)
-# -------------------------------------------------
-recv_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-recv_sock.bind((LISTEN_IP, LISTEN_PORT))
-recv_sock.settimeout(0.05)      # Wait up to 50 ms
-
-# -------------------------------------------------
-# Forward Socket (Python -> Simulink)
-# -------------------------------------------------
-send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+# dSPACE sends angle, torque and both phase currents as 4 floats or 4 doubles.
+codec = PacketCodec((SIGNALS_F32, SIGNALS_F64))
 
 # -------------------------------------------------
 # Shared Memory
@@ -293,78 +283,37 @@ send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 manager = SManager()
 sm, mem_data = manager.create_mem(mem_name=MEM_NAME, size=32)
 
-print("=" * 60)
-print(f"Listening for dSPACE packets on {LISTEN_IP}:{LISTEN_PORT}")
-print(f"Forwarding angle to Simulink on {FORWARD_IP}:{FORWARD_PORT}")
-print("=" * 60)
-
-
-def main():
-
-    packet_count = 0
-    last_angle = 0.0
-
-    try:
-
-        while True:
-
-            data_received = False
-            angle = last_angle
-
-            try:
-                packet, addr = recv_sock.recvfrom(1024)
-
-                if len(packet) == 16:
-                    angle, torque, phase1, phase2 = struct.unpack("<4f", packet)
 
-                elif len(packet) == 32:
-                    angle, torque, phase1, phase2 = struct.unpack("<4d", packet)
+def update_shared_memory(layout, values):
+    # angle, torque, phase1, phase2
+    mem_data[:4] = values
 
-                else:
-                    print(f"Unexpected packet size: {len(packet)} bytes")
-                    continue
 
-                # Update shared memory
-                mem_data[0] = angle
-                mem_data[1] = torque
-                mem_data[2] = phase1
-                mem_data[3] = phase2
-
-                last_angle = float(angle)
-                angle = last_angle
-                data_received = True
-
-            except socket.timeout:
-                # No new packet -> continue sending last angle
-                angle = last_angle
-
-            except struct.error as e:
-                print(f"Packet error: {e}")
-                continue
+def main():
 
-            # Forward ONLY the angle to Simulink
-            try:
-                send_sock.sendto(
-                    struct.pack("<d", angle),
-                    (FORWARD_IP, FORWARD_PORT),
-                )
-            except OSError as e:
-                print(f"Send error: {e}")
+    # Sockets (dSPACE -> Python -> Simulink) are owned by the bridge.
+    bridge = UdpBridge(
+        (LISTEN_IP, LISTEN_PORT),
+        (FORWARD_IP, FORWARD_PORT),
+        codec=codec,
+        forward_rate_hz=FORWARD_RATE_HZ,
+        on_sample=update_shared_memory,
+    )
 
-            packet_count += 1
+    print("=" * 60)
+    print(f"Listening for dSPACE packets on {LISTEN_IP}:{LISTEN_PORT}")
+    print(f"Forwarding angle to Simulink on {FORWARD_IP}:{FORWARD_PORT} at {FORWARD_RATE_HZ} Hz")
+    print("=" * 60)
 
-            print(
-                f"[{packet_count:06d}] "
-                f"{'REAL' if data_received else 'HOLD'} "
-                f"Angle = {angle:.3f}°"
-            )
+    try:
+        bridge.run()
 
     except KeyboardInterrupt:
         print("\nStopping bridge...")
 
     finally:
-        recv_sock.close()
-        send_sock.close()
+        bridge.close()
+        print(bridge.stats.summary())
         print("Sockets closed.")
 
 
@@ -0,0 +1,226 @@
+import mmap
+import multiprocessing
+import os
+import struct
+import time
+from typing import Optional
+
+# ---------------------------------------------------------------------------
+# Persistent Hold-Value Store (Python <-> MATLAB)
+# ---------------------------------------------------------------------------
+#
+# The last valid angle lives in a small memory-mapped file instead of a text
+# file that is rewritten (udp_final.py) or created and renamed (udp_mat.py)
+# for every packet. Writers and readers map the same pages, so an update is a
+# 24-byte memory write: no open/close, no rename, no directory metadata.
+# Because it is a file, the value also survives restarts and is the hold
+# value of the next run.
+#
+# Layout (little-endian, 24 bytes), readable with MATLAB's memmapfile
+# (send_angle.m):
+#
+#   offset  type     field
+#   0       uint32   sequence   odd while a write is in progress (seqlock)
+#   4       uint32   version    STORE_VERSION once the file is initialised
+#   8       double   angle
+#   16      double   time       time.time() of the update
+#
+# Seqlock: the writer bumps sequence to odd, writes the value, then bumps it
+# to even. A reader copies the value between two reads of sequence and
+# retries when they differ or are odd, so it never sees a half-written angle
+# and the writer never waits. There must be only one writer per file.
+#
+# An optional text checkpoint (the old latest_angle.txt format) is written
+# atomically at most once per checkpoint interval, for readers that still
+# poll the text file.
+
+STORE_VERSION = 1
+STORE_SIZE = 24
+DEFAULT_CHECKPOINT_INTERVAL_SECONDS = 1.0
+MAX_READ_ATTEMPTS = 100
+
+_SEQUENCE = struct.Struct("<I")
+_HEADER = struct.Struct("<II")
+_VALUE = struct.Struct("<dd")
+_VALUE_OFFSET = _HEADER.size
+
+
+class HoldValueStore:
+    """Last valid angle in a memory-mapped file, shared with MATLAB.
+
+    The writer creates the file (holding `initial_value`) if it doesn't exist
+    yet and keeps it otherwise, so read() returns the previous run's value.
+    Readers open it with readonly=True and never modify it.
+    """
+
+    def __init__(self, path: str, initial_value: float = 0.0, checkpoint_path: Optional[str] = None,
+                 checkpoint_interval_seconds: float = DEFAULT_CHECKPOINT_INTERVAL_SECONDS,
+                 readonly: bool = False):
+        self.path = path
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval_seconds = checkpoint_interval_seconds
+        self.write_count = 0
+        self.checkpoint_count = 0
+        self.retry_count = 0
+        self._last_checkpoint = 0.0
+
+        if readonly:
+            self._file = open(path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), STORE_SIZE, access=mmap.ACCESS_READ)
+            self._sequence = None
+            return
+
+        # "a+b" creates a missing file without truncating an existing one.
+        self._file = open(path, "a+b")
+        if os.fstat(self._file.fileno()).st_size < STORE_SIZE:
+            self._file.truncate(STORE_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), STORE_SIZE)
+
+        sequence, version = _HEADER.unpack_from(self._map, 0)
+        if version != STORE_VERSION:
+            _VALUE.pack_into(self._map, _VALUE_OFFSET, float(initial_value), time.time())
+            _HEADER.pack_into(self._map, 0, 0, STORE_VERSION)
+        elif sequence & 1:
+            # A writer died mid-update: the value may be torn, so fall back.
+            _VALUE.pack_into(self._map, _VALUE_OFFSET, float(initial_value), time.time())
+            _SEQUENCE.pack_into(self._map, 0, (sequence + 1) & 0xFFFFFFFF)
+        self._sequence = _SEQUENCE.unpack_from(self._map, 0)[0]
+
+    def write(self, value: float, timestamp: Optional[float] = None) -> None:
+        """Publish a new hold value. Only one process may write to a store."""
+        if timestamp is None:
+            timestamp = time.time()
+        sequence = self._sequence
+        _SEQUENCE.pack_into(self._map, 0, (sequence + 1) & 0xFFFFFFFF)
+        _VALUE.pack_into(self._map, _VALUE_OFFSET, value, timestamp)
+        sequence = (sequence + 2) & 0xFFFFFFFF
+        _SEQUENCE.pack_into(self._map, 0, sequence)
+        self._sequence = sequence
+        self.write_count += 1
+
+        if self.checkpoint_path is not None and timestamp - self._last_checkpoint >= self.checkpoint_interval_seconds:
+            self.checkpoint(value, timestamp)
+
+    def read(self) -> Optional[tuple[float, float]]:
+        """Consistent (value, update time), or None if the writer kept interrupting."""
+        view = self._map
+        for _attempt in range(MAX_READ_ATTEMPTS):
+            before = _SEQUENCE.unpack_from(view, 0)[0]
+            if not before & 1:
+                value, timestamp = _VALUE.unpack_from(view, _VALUE_OFFSET)
+                if _SEQUENCE.unpack_from(view, 0)[0] == before:
+                    return value, timestamp
+            self.retry_count += 1
+        return None
+
+    def read_value(self, default: float = 0.0) -> float:
+        held = self.read()
+        return default if held is None else held[0]
+
+    def checkpoint(self, value: Optional[float] = None, timestamp: Optional[float] = None) -> None:
+        """Write the text checkpoint atomically and flush the mapped file to disk."""
+        if value is None:
+            value, timestamp = self.read() or (None, None)
+            if value is None:
+                return
+        self._last_checkpoint = time.time() if timestamp is None else timestamp
+        self.checkpoint_count += 1
+        self._map.flush()
+        if self.checkpoint_path is None:
+            return
+
+        temp_path = self.checkpoint_path + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                f.write(f"{value:.4f}")
+            # Atomic replace prevents MATLAB from reading a half-written file
+            os.replace(temp_path, self.checkpoint_path)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        if self._map.closed:
+            return
+        if self.write_count:
+            self.checkpoint()
+        self._map.close()
+        self._file.close()
+
+
+#-------BENCHMARK MAIN ---------- #
+#
+# Times one hand-off per packet: udp_mat.py's temp file + os.replace,
+# udp_final.py's open/write of the text file, and HoldValueStore.write().
+# Then a reader process hammers read() while this one writes, checking that
+# every value it sees is one that was written (never torn).
+
+BENCH_PATH = "angle_store_bench.bin"
+BENCH_TEXT_PATH = "angle_store_bench.txt"
+BENCH_WRITES = 5000
+BENCH_READER_SECONDS = 1.0
+
+
+def _file_replace(angle: float) -> None:
+    temp_path = BENCH_TEXT_PATH + ".tmp"
+    with open(temp_path, "w") as f:
+        f.write(f"{angle:.4f}")
+    os.replace(temp_path, BENCH_TEXT_PATH)
+
+
+def _file_rewrite(angle: float) -> None:
+    with open(BENCH_TEXT_PATH, "w") as f:
+        f.write(str(angle))
+
+
+def _bench_reader(results) -> None:
+    store = HoldValueStore(BENCH_PATH, readonly=True)
+    reads = torn = 0
+    end = time.perf_counter() + BENCH_READER_SECONDS
+    while time.perf_counter() < end:
+        held = store.read()
+        if held is None:
+            continue
+        value, timestamp = held
+        # The writer always stores angle == -timestamp.
+        torn += value != -timestamp
+        reads += 1
+    store.close()
+    results.send((reads, torn, store.retry_count))
+
+
+def main() -> None:
+    for label, hand_off in (("temp file + os.replace", _file_replace), ("open(w) + write", _file_rewrite)):
+        start = time.perf_counter()
+        for index in range(BENCH_WRITES):
+            hand_off(index * 0.01)
+        seconds = time.perf_counter() - start
+        print(f"{label:<28} {seconds / BENCH_WRITES * 1e6:8.2f} us/packet")
+
+    store = HoldValueStore(BENCH_PATH, checkpoint_path=BENCH_TEXT_PATH)
+    start = time.perf_counter()
+    for index in range(BENCH_WRITES):
+        store.write(index * 0.01)
+    seconds = time.perf_counter() - start
+    print(f"{'HoldValueStore.write':<28} {seconds / BENCH_WRITES * 1e6:8.2f} us/packet "
+          f"({store.checkpoint_count} checkpoints)")
+
+    results, reader_results = multiprocessing.Pipe()
+    reader = multiprocessing.Process(target=_bench_reader, args=(reader_results,))
+    reader.start()
+    writes = 0
+    end = time.perf_counter() + BENCH_READER_SECONDS + 0.5
+    while time.perf_counter() < end:
+        timestamp = time.time()
+        store.write(-timestamp, timestamp)
+        writes += 1
+    reads, torn, retries = results.recv()
+    reader.join()
+    store.close()
+    print(f"concurrent: {writes} writes, {reads} reads, {retries} seqlock retries, {torn} torn reads")
+
+    for path in (BENCH_PATH, BENCH_TEXT_PATH):
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
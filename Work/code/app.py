@@ -1,27 +1,35 @@
 import csv
 import sys
+import time
 from pathlib import Path
-from typing import Union
 
-import pandas as pd
+import numpy as np
 
-from PyQt6.QtCore import Qt, QTimer, QSize
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer, QSize
 from PyQt6.QtGui import QAction, QIcon
 from PyQt6.QtWidgets import (
     QApplication,
     QLabel,
     QMainWindow,
+    QHeaderView,
     QStatusBar,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QTabWidget,
     QToolBar,
     QVBoxLayout,
     QWidget,
 )
 
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
+import pyqtgraph as pg
+
+from dspace_csv import DspaceCsvTail
+from plot_decimation import (
+    DEFAULT_LOD_FACTOR,
+    DEFAULT_LOD_LEVELS,
+    LOD_OVERSAMPLE,
+    EnvelopeHistory,
+    envelope,
+)
 
 
 # =========================================================
@@ -34,221 +42,130 @@ CSV_FILE = Path("exp1_002.csv")
 UPDATE_INTERVAL_MS = 500
 
 # Maximum number of recent samples displayed in each plot.
-MAX_PLOT_SAMPLES = 1000
+# Each update reduces only the appended rows into min/max
+# blocks, and the plots get about two points per pixel of the
+# visible range, so millions of samples stay interactive.
+MAX_PLOT_SAMPLES = 1_000_000
+
+# Grid lines are the most expensive part of a repaint without
+# OpenGL (about 35 ms for the eight plots).
+SHOW_PLOT_GRID = False
 
 # Number of dSPACE signals to plot.
 NUMBER_OF_SIGNALS_TO_PLOT = 8
 
+# Rows measured when fitting the table columns to their contents.
+TABLE_SIZE_SAMPLE_ROWS = 200
+
 
 # =========================================================
-# dSPACE CSV loading
+# Table model
 # =========================================================
 
-def make_unique_names(names: list[str]) -> list[str]:
+class SignalTableModel(QAbstractTableModel):
     """
-    Make every signal name unique.
-
-    For example:
-        Torque, Torque, Angle
-
-    becomes:
-        Torque, Torque_2, Angle
-    """
-
-    counts: dict[str, int] = {}
-    unique_names: list[str] = []
-
-    for index, raw_name in enumerate(names):
-        name = str(raw_name).strip()
-
-        if not name:
-            name = f"Signal_{index + 1}"
-
-        count = counts.get(name, 0)
-
-        if count == 0:
-            unique_name = name
-        else:
-            unique_name = f"{name}_{count + 1}"
-
-        counts[name] = count + 1
-        unique_names.append(unique_name)
-
-    return unique_names
-
+    Read-only table over a (rows, signals) float64 array.
 
-def load_dspace_csv(
-    file_path: Union[str, Path],
-) -> pd.DataFrame:
+    The view asks only for the cells it shows, so no per-cell
+    objects exist and the cost of a refresh does not depend on
+    the number of rows.
     """
-    Load a dSPACE CSV export.
-
-    This parser:
-    - detects comma, semicolon or tab delimiters
-    - handles metadata rows with different lengths
-    - finds the row containing 'path'
-    - finds the row containing 'trace_values'
-    - extracts all logged signal names
-    - converts all logged values to numbers
-    """
-
-    file_path = Path(file_path).expanduser()
-
-    # Automatically add ".csv" when omitted.
-    if not file_path.exists() and file_path.suffix == "":
-        possible_csv_path = file_path.with_suffix(".csv")
-
-        if possible_csv_path.exists():
-            file_path = possible_csv_path
-
-    if not file_path.exists():
-        raise FileNotFoundError(
-            f"CSV file not found: {file_path.resolve()}"
-        )
-
-    # Read the CSV and detect its delimiter.
-    with file_path.open(
-        "r",
-        encoding="utf-8-sig",
-        errors="replace",
-        newline="",
-    ) as csv_file:
-
-        sample = csv_file.read(4096)
-        csv_file.seek(0)
 
-        try:
-            dialect = csv.Sniffer().sniff(
-                sample,
-                delimiters=",;\t",
-            )
-            delimiter = dialect.delimiter
-
-        except csv.Error:
-            delimiter = ","
-
-        reader = csv.reader(
-            csv_file,
-            delimiter=delimiter,
-        )
-
-        rows = list(reader)
+    def __init__(
+        self,
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
 
-    if not rows:
-        raise ValueError("The CSV file is empty.")
+        self.values = np.empty((0, 0))
+        self.signal_names: list[str] = []
 
-    # Strip whitespace from every cell.
-    rows = [
-        [cell.strip() for cell in row]
-        for row in rows
-    ]
+    def set_values(
+        self,
+        values: np.ndarray,
+        signal_names: list[str],
+    ) -> None:
+        """
+        Replace everything, e.g. after the file was reloaded.
+        """
 
-    # dSPACE metadata rows can have different column counts.
-    maximum_columns = max(
-        len(row)
-        for row in rows
-    )
+        self.beginResetModel()
 
-    padded_rows = [
-        row + [""] * (maximum_columns - len(row))
-        for row in rows
-    ]
+        self.values = values
+        self.signal_names = list(signal_names)
 
-    raw_df = pd.DataFrame(padded_rows)
+        self.endResetModel()
 
-    def find_row_containing(value: str) -> int:
+    def append_values(
+        self,
+        values: np.ndarray,
+    ) -> None:
         """
-        Return the index of the first row containing value.
+        values holds the old rows followed by the new ones.
         """
 
-        target = value.strip().lower()
+        old_row_count = len(self.values)
 
-        for row_index, row in raw_df.iterrows():
-            cells = (
-                row.astype(str)
-                .str.strip()
-                .str.lower()
-            )
-
-            if cells.eq(target).any():
-                return row_index
+        if len(values) <= old_row_count:
+            self.values = values
+            return
 
-        raise ValueError(
-            f"Could not find a row containing '{value}'."
+        self.beginInsertRows(
+            QModelIndex(),
+            old_row_count,
+            len(values) - 1,
         )
 
-    path_row_index = find_row_containing("path")
-    trace_row_index = find_row_containing("trace_values")
-
-    path_row = raw_df.iloc[path_row_index].tolist()
-    trace_row = raw_df.iloc[trace_row_index].tolist()
-
-    path_column_index = next(
-        index
-        for index, value in enumerate(path_row)
-        if str(value).strip().lower() == "path"
-    )
-
-    trace_column_index = next(
-        index
-        for index, value in enumerate(trace_row)
-        if str(value).strip().lower() == "trace_values"
-    )
+        self.values = values
 
-    # Signal names normally appear after the "path" cell.
-    signal_names = path_row[path_column_index + 1:]
+        self.endInsertRows()
 
-    # Remove empty trailing cells.
-    while signal_names and signal_names[-1] == "":
-        signal_names.pop()
-
-    if not signal_names:
-        raise ValueError(
-            "The 'path' row was found, but no signal names "
-            "were detected."
-        )
-
-    signal_names = make_unique_names(signal_names)
+    def rowCount(
+        self,
+        parent=QModelIndex(),
+    ) -> int:
+        return 0 if parent.isValid() else len(self.values)
 
-    data_start_column = trace_column_index + 1
-    number_of_columns = len(signal_names)
+    def columnCount(
+        self,
+        parent=QModelIndex(),
+    ) -> int:
+        return 0 if parent.isValid() else len(self.signal_names)
 
-    # Start at the trace_values row. Text values will become NaN.
-    data_df = raw_df.iloc[
-        trace_row_index:,
-        data_start_column:
-        data_start_column + number_of_columns,
-    ].copy()
+    def data(
+        self,
+        index: QModelIndex,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ):
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = float(
+                self.values[index.row(), index.column()]
+            )
 
-    data_df.columns = signal_names
+            # NaN cells are shown empty.
+            return "" if value != value else f"{value:.6g}"
 
-    # Convert all signal columns to numeric values.
-    for column_name in data_df.columns:
-        cleaned_column = (
-            data_df[column_name]
-            .astype(str)
-            .str.strip()
-        )
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return (
+                Qt.AlignmentFlag.AlignRight
+                | Qt.AlignmentFlag.AlignVCenter
+            )
 
-        data_df[column_name] = pd.to_numeric(
-            cleaned_column,
-            errors="coerce",
-        )
+        return None
 
-    # Remove rows that do not contain any numerical values.
-    data_df = (
-        data_df
-        .dropna(how="all")
-        .reset_index(drop=True)
-    )
+    def headerData(
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
 
-    if data_df.empty:
-        raise ValueError(
-            "No numerical values were found after "
-            "the 'trace_values' row."
-        )
+        if orientation == Qt.Orientation.Horizontal:
+            return self.signal_names[section]
 
-    return data_df
+        return str(section + 1)
 
 
 # =========================================================
@@ -269,6 +186,21 @@ class MainWindow(QMainWindow):
         self.last_modified_time: float | None = None
         self.is_monitoring = False
 
+        # Remembers the parsed header and how far the file has
+        # been read, so updates only parse appended rows.
+        self.csv_tail = DspaceCsvTail(
+            CSV_FILE
+        )
+
+        self.plot_curves = []
+        self.plot_x_column: int | None = None
+        self.plot_signal_columns: list[int] = []
+
+        # Rows already handed to the plots, reduced for display.
+        self.plot_history: EnvelopeHistory | None = None
+        self.plotted_row_count = 0
+        self.plot_following = True
+
         self.create_interface()
         self.create_toolbar()
         self.create_timer()
@@ -303,12 +235,24 @@ class MainWindow(QMainWindow):
             | Qt.AlignmentFlag.AlignVCenter
         )
 
-        self.table = QTableWidget()
+        self.table_model = SignalTableModel(self)
+
+        self.table = QTableView()
+
+        self.table.setModel(
+            self.table_model
+        )
 
         self.table.setAlternatingRowColors(True)
 
-        self.table.setEditTriggers(
-            QTableWidget.EditTrigger.NoEditTriggers
+        # Fixed row heights and a bounded sample for column sizing
+        # keep the view independent of the number of rows.
+        self.table.verticalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Fixed
+        )
+
+        self.table.horizontalHeader().setResizeContentsPrecision(
+            TABLE_SIZE_SAMPLE_ROWS
         )
 
         table_layout.addWidget(self.info_label)
@@ -335,20 +279,16 @@ class MainWindow(QMainWindow):
             | Qt.AlignmentFlag.AlignVCenter
         )
 
-        self.figure = Figure(
-            figsize=(12, 12)
-        )
+        self.plot_widget = pg.GraphicsLayoutWidget()
 
-        self.canvas = FigureCanvas(
-            self.figure
-        )
+        self.plot_widget.setBackground("w")
 
         plot_layout.addWidget(
             self.plot_info_label
         )
 
         plot_layout.addWidget(
-            self.canvas
+            self.plot_widget
         )
 
         self.tabs.addTab(
@@ -506,10 +446,12 @@ class MainWindow(QMainWindow):
         force: bool = False,
     ) -> None:
         """
-        Reload the CSV when the file modification time changes.
+        Parse the rows appended to the CSV since the last update.
 
-        force=True reloads the file regardless of its
-        modification timestamp.
+        Runs when the file modification time changes. Only the new
+        bytes are parsed, and the table and plots are extended
+        instead of rebuilt. force=True reloads the whole file
+        regardless of its modification timestamp.
         """
 
         if not force and not self.is_monitoring:
@@ -543,30 +485,45 @@ class MainWindow(QMainWindow):
             ):
                 return
 
-            data_df = load_dspace_csv(
-                CSV_FILE
-            )
+            if force:
+                self.csv_tail.reset()
 
-            self.display_dataframe(
-                data_df
-            )
+            previous_row_count = self.csv_tail.row_count
 
-            self.update_plots(
-                data_df
-            )
+            restarted = self.csv_tail.poll()
 
             self.last_modified_time = (
                 current_modified_time
             )
 
+            if self.csv_tail.row_count == 0:
+                raise ValueError(
+                    "No numerical values were found after "
+                    "the 'trace_values' row."
+                )
+
+            if restarted:
+                previous_row_count = 0
+
+            self.update_table(
+                restarted
+            )
+
+            self.update_plots(
+                restarted
+            )
+
             self.info_label.setText(
                 f"File: {CSV_FILE.name} | "
-                f"Rows: {len(data_df)} | "
-                f"Logged columns: {len(data_df.columns)}"
+                f"Rows: {self.csv_tail.row_count} | "
+                f"Logged columns: {len(self.csv_tail.signal_names)}"
             )
 
             self.statusBar().showMessage(
-                "CSV data updated successfully"
+                "CSV reloaded"
+                if restarted
+                else f"{self.csv_tail.row_count - previous_row_count} "
+                f"new rows"
             )
 
         except PermissionError:
@@ -611,128 +568,55 @@ class MainWindow(QMainWindow):
     # CSV table
     # =====================================================
 
-    def display_dataframe(
+    def update_table(
         self,
-        data_df: pd.DataFrame,
+        restarted: bool,
     ) -> None:
         """
-        Display every available row and column in the table.
-        """
-
-        previous_vertical_scroll = (
-            self.table
-            .verticalScrollBar()
-            .value()
-        )
-
-        previous_horizontal_scroll = (
-            self.table
-            .horizontalScrollBar()
-            .value()
-        )
-
-        self.table.setUpdatesEnabled(
-            False
-        )
-
-        try:
-            self.table.clear()
-
-            self.table.setRowCount(
-                len(data_df)
-            )
+        Show the rows parsed so far.
 
-            self.table.setColumnCount(
-                len(data_df.columns)
-            )
+        The model only announces the new rows; cells are formatted
+        when they scroll into view.
+        """
 
-            self.table.setHorizontalHeaderLabels(
-                [
-                    str(column)
-                    for column in data_df.columns
-                ]
+        if restarted:
+            self.table_model.set_values(
+                self.csv_tail.values,
+                self.csv_tail.signal_names,
             )
 
-            for row_index, row in enumerate(
-                data_df.itertuples(
-                    index=False,
-                    name=None,
-                )
-            ):
-                for column_index, value in enumerate(row):
-
-                    if pd.isna(value):
-                        displayed_value = ""
-                    else:
-                        displayed_value = f"{value:.6g}"
-
-                    item = QTableWidgetItem(
-                        displayed_value
-                    )
-
-                    item.setTextAlignment(
-                        Qt.AlignmentFlag.AlignRight
-                        | Qt.AlignmentFlag.AlignVCenter
-                    )
-
-                    self.table.setItem(
-                        row_index,
-                        column_index,
-                        item,
-                    )
-
+            # Measures the first rows only (see create_interface).
             self.table.resizeColumnsToContents()
 
-            self.table.verticalScrollBar().setValue(
-                previous_vertical_scroll
-            )
-
-            self.table.horizontalScrollBar().setValue(
-                previous_horizontal_scroll
-            )
-
-        finally:
-            self.table.setUpdatesEnabled(
-                True
+        else:
+            self.table_model.append_values(
+                self.csv_tail.values
             )
 
     # =====================================================
     # Eight live plots
     # =====================================================
 
-    def update_plots(
+    def create_plot_axes(
         self,
-        data_df: pd.DataFrame,
     ) -> None:
         """
-        Plot exactly eight logged signals.
+        Create the eight plots and their curves.
 
         Behaviour:
         - If the CSV contains a time column plus eight signals,
           the time column is used as the x-axis.
         - If the CSV contains exactly eight columns, all eight
           columns are plotted against sample number.
-        - Only the newest MAX_PLOT_SAMPLES are displayed.
         """
 
-        self.figure.clear()
-
-        if data_df.empty:
-            self.plot_info_label.setText(
-                "No data is available for plotting."
-            )
-
-            self.canvas.draw_idle()
-            return
-
-        plot_df = (
-            data_df
-            .tail(MAX_PLOT_SAMPLES)
-            .reset_index(drop=True)
-        )
+        self.plot_widget.clear()
+        self.plot_curves = []
+        self.plot_history = None
+        self.plotted_row_count = 0
 
         all_columns = list(
-            plot_df.columns
+            self.csv_tail.signal_names
         )
 
         if len(all_columns) < NUMBER_OF_SIGNALS_TO_PLOT:
@@ -741,7 +625,6 @@ class MainWindow(QMainWindow):
                 f"At least {NUMBER_OF_SIGNALS_TO_PLOT} are required."
             )
 
-            self.canvas.draw_idle()
             return
 
         first_column = all_columns[0]
@@ -760,109 +643,491 @@ class MainWindow(QMainWindow):
             len(all_columns) >= NUMBER_OF_SIGNALS_TO_PLOT + 1
             and first_column_lower in time_keywords
         ):
-            x_values = plot_df[first_column]
+            self.plot_x_column = 0
             x_label = str(first_column)
 
-            signal_columns = all_columns[
-                1:
-                NUMBER_OF_SIGNALS_TO_PLOT + 1
-            ]
+            self.plot_signal_columns = list(
+                range(1, NUMBER_OF_SIGNALS_TO_PLOT + 1)
+            )
 
         # Case 2: nine or more columns are present, so assume
         # the first column is the time/sample column.
         elif len(all_columns) >= NUMBER_OF_SIGNALS_TO_PLOT + 1:
-            x_values = plot_df[first_column]
+            self.plot_x_column = 0
             x_label = str(first_column)
 
-            signal_columns = all_columns[
-                1:
-                NUMBER_OF_SIGNALS_TO_PLOT + 1
-            ]
+            self.plot_signal_columns = list(
+                range(1, NUMBER_OF_SIGNALS_TO_PLOT + 1)
+            )
 
         # Case 3: exactly eight columns are available.
         else:
-            x_values = plot_df.index
+            self.plot_x_column = None
             x_label = "Sample"
 
-            signal_columns = all_columns[
-                :NUMBER_OF_SIGNALS_TO_PLOT
-            ]
+            self.plot_signal_columns = list(
+                range(NUMBER_OF_SIGNALS_TO_PLOT)
+            )
 
-        self.plot_info_label.setText(
-            f"Displaying {len(signal_columns)} signals | "
-            f"Samples shown: {len(plot_df)} | "
-            f"Signals: {', '.join(map(str, signal_columns))}"
-        )
+        first_plot = None
 
-        axes = []
+        for index, column_index in enumerate(self.plot_signal_columns):
 
-        for index, signal_name in enumerate(signal_columns):
+            plot = self.plot_widget.addPlot(
+                row=index,
+                col=0,
+            )
 
-            if index == 0:
-                axis = self.figure.add_subplot(
-                    NUMBER_OF_SIGNALS_TO_PLOT,
-                    1,
-                    index + 1,
-                )
+            plot.showGrid(
+                x=SHOW_PLOT_GRID,
+                y=SHOW_PLOT_GRID,
+                alpha=0.3,
+            )
+
+            plot.setLabel(
+                "left",
+                str(all_columns[column_index]),
+            )
+
+            if first_plot is None:
+                first_plot = plot
 
+                # Zooming or panning fetches the newly visible
+                # range at the matching resolution.
+                plot.getViewBox().sigXRangeChanged.connect(
+                    self.on_plot_range_changed
+                )
             else:
-                axis = self.figure.add_subplot(
-                    NUMBER_OF_SIGNALS_TO_PLOT,
-                    1,
-                    index + 1,
-                    sharex=axes[0],
+                plot.setXLink(first_plot)
+
+            # Only show x-axis labels on the final plot.
+            if index < NUMBER_OF_SIGNALS_TO_PLOT - 1:
+                plot.getAxis("bottom").setStyle(
+                    showValues=False
                 )
 
-            axes.append(axis)
+            curve = plot.plot(
+                pen=pg.mkPen(width=1),
+            )
+
+            self.plot_curves.append(curve)
+
+        plot.setLabel(
+            "bottom",
+            x_label,
+        )
+
+        # Only the min/max levels are used: full-resolution rows
+        # come from the CSV tail. The levels cover a little more
+        # than MAX_PLOT_SAMPLES so they reach the oldest shown row.
+        self.plot_history = EnvelopeHistory(
+            len(self.plot_signal_columns),
+            1,
+            MAX_PLOT_SAMPLES + DEFAULT_LOD_FACTOR ** DEFAULT_LOD_LEVELS,
+        )
+
+    def update_plots(
+        self,
+        restarted: bool,
+    ) -> None:
+        """
+        Show the newest MAX_PLOT_SAMPLES rows on the eight plots.
+
+        The plots and curves are created once per loaded file.
+        Later updates reduce only the appended rows and replace
+        the curve data with the visible range.
+        """
 
-            valid_values = (
-                plot_df[signal_name].notna()
+        start = time.perf_counter()
+
+        if restarted or not self.plot_curves:
+            self.create_plot_axes()
+
+        if not self.plot_curves:
+            return
+
+        first_row = max(
+            self.plotted_row_count,
+            self.csv_tail.row_count - MAX_PLOT_SAMPLES,
+        )
+
+        new_values = self.csv_tail.values[first_row:]
+
+        self.plot_history.extend(
+            self.plot_x_values(first_row, self.csv_tail.row_count),
+            [
+                new_values[:, column_index]
+                for column_index in self.plot_signal_columns
+            ],
+        )
+
+        self.plotted_row_count = self.csv_tail.row_count
+
+        # Painting happens on the next event loop pass; the readout
+        # covers the data update only (see the benchmark below).
+        self.draw_plot_range()
+
+        refresh_ms = (
+            time.perf_counter() - start
+        ) * 1e3
+
+        plotted_names = [
+            self.csv_tail.signal_names[column_index]
+            for column_index in self.plot_signal_columns
+        ]
+
+        self.plot_info_label.setText(
+            f"Displaying {len(self.plot_curves)} signals | "
+            f"Samples shown: {min(self.plotted_row_count, MAX_PLOT_SAMPLES)} | "
+            f"Refresh: {refresh_ms:.1f} ms | "
+            f"Signals: {', '.join(plotted_names)}"
+        )
+
+    def draw_plot_range(
+        self,
+    ) -> None:
+        """
+        Give the curves the visible rows, reduced to a min/max
+        envelope of about two points per horizontal pixel.
+
+        While the X axis auto-ranges, every shown row is visible.
+        Narrow ranges are reduced from the parsed rows, wide ones
+        from the precomputed min/max blocks.
+        """
+
+        if self.plot_history is None or not len(self.plot_history):
+            return
+
+        view_box = self.plot_curves[0].getViewBox()
+        self.plot_following = bool(view_box.autoRangeEnabled()[0])
+
+        first_row, last_row = self.visible_plot_rows(
+            view_box.viewRange()[0]
+        )
+
+        max_points = 2 * self.plot_widget.width()
+
+        if last_row - first_row <= max_points * LOD_OVERSAMPLE:
+            x_values = np.ascontiguousarray(
+                self.plot_x_values(first_row, last_row)
             )
 
-            axis.plot(
-                x_values[valid_values],
-                plot_df.loc[
-                    valid_values,
-                    signal_name,
-                ],
-                linewidth=1.0,
+            signal_values = np.ascontiguousarray(
+                self.csv_tail.values[
+                    first_row:last_row,
+                    self.plot_signal_columns,
+                ].T
             )
 
-            axis.set_ylabel(
-                str(signal_name),
-                fontsize=7,
+            if last_row - first_row > max_points:
+                x_values, signal_values = envelope(
+                    x_values,
+                    signal_values,
+                    signal_values,
+                    max_points,
+                )
+
+        else:
+            x_values, signal_values = self.plot_history.window(
+                self.plot_x_values(first_row, first_row + 1)[0],
+                self.plot_x_values(last_row - 1, last_row)[0],
+                max_points,
             )
 
-            axis.grid(
-                True,
-                alpha=0.3,
+        for curve, values in zip(
+            self.plot_curves,
+            signal_values,
+        ):
+            # NaN samples leave gaps instead of breaking the line.
+            curve.setData(
+                x_values,
+                values,
+                connect="finite",
             )
 
-            axis.tick_params(
-                axis="both",
-                labelsize=7,
+    def visible_plot_rows(
+        self,
+        x_range: list[float],
+    ) -> tuple[int, int]:
+        """
+        First and end row of the shown rows inside x_range, plus
+        one row either side so the curves reach the plot edges.
+        """
+
+        oldest_row = max(
+            0,
+            self.plotted_row_count - MAX_PLOT_SAMPLES,
+        )
+
+        if self.plot_following:
+            return oldest_row, self.plotted_row_count
+
+        x_start, x_end = x_range
+
+        if self.plot_x_column is None:
+            first_row = int(np.ceil(x_start))
+            last_row = int(np.floor(x_end)) + 1
+
+        else:
+            x_column = self.csv_tail.values[
+                oldest_row:self.plotted_row_count,
+                self.plot_x_column,
+            ]
+
+            first_row = oldest_row + int(
+                np.searchsorted(x_column, x_start, side="left")
+            )
+            last_row = oldest_row + int(
+                np.searchsorted(x_column, x_end, side="right")
             )
 
-            # Only show x-axis labels on the final plot.
-            if index < NUMBER_OF_SIGNALS_TO_PLOT - 1:
-                axis.tick_params(
-                    labelbottom=False
-                )
+        first_row = min(
+            max(first_row - 1, oldest_row),
+            self.plotted_row_count - 1,
+        )
+        last_row = max(
+            min(last_row + 1, self.plotted_row_count),
+            first_row + 1,
+        )
 
-        axes[-1].set_xlabel(
-            x_label,
-            fontsize=8,
+        return first_row, last_row
+
+    def plot_x_values(
+        self,
+        first_row: int,
+        last_row: int,
+    ) -> np.ndarray:
+        if self.plot_x_column is None:
+            return np.arange(
+                first_row,
+                last_row,
+                dtype=np.float64,
+            )
+
+        return self.csv_tail.values[
+            first_row:last_row,
+            self.plot_x_column,
+        ]
+
+    def on_plot_range_changed(
+        self,
+        view_box,
+        x_range,
+    ) -> None:
+        """
+        Redraw after zooming or panning, and once more when the
+        X axis goes back to auto-ranging.
+        """
+
+        if (
+            not view_box.autoRangeEnabled()[0]
+            or not self.plot_following
+        ):
+            self.draw_plot_range()
+
+
+#-------BENCHMARK MAIN ---------- #
+#
+# `python app.py --bench` (QT_QPA_PLATFORM=offscreen works headless)
+# writes an export of a time column plus eight signals, appends
+# BENCH_APPEND_ROWS rows per refresh and times the refresh of all
+# shown rows, painted synchronously so drawing is included:
+#
+#   Matplotlib rebuild   the original update_plots: figure.clear(),
+#                        eight new subplots and lines, canvas.draw()
+#   pyqtgraph all rows   the first pyqtgraph version: setData() with
+#                        every shown row, peak downsampling, clip to view
+#   update_plots         MainWindow.update_plots as it is now
+#
+# Reported is the median of BENCH_REFRESHES refreshes.
+
+BENCH_FILE = Path("app_bench.csv")
+BENCH_ROW_COUNTS = (10_000, 100_000, 1_000_000)
+BENCH_APPEND_ROWS = 500
+BENCH_REFRESHES = 5
+
+BENCH_HEADER = """trace_names,,{names}
+path,,{paths}
+"""
+
+
+def _bench_rows(
+    first_row: int,
+    row_count: int,
+) -> np.ndarray:
+    time_column = np.arange(first_row, first_row + row_count) * 1e-3
+
+    return np.column_stack(
+        [time_column]
+        + [
+            np.sin(time_column * (k + 1)) * 100
+            for k in range(NUMBER_OF_SIGNALS_TO_PLOT)
+        ]
+    )
+
+
+def _append_bench_rows(
+    first_row: int,
+    row_count: int,
+) -> None:
+    with BENCH_FILE.open("a", newline="") as csv_file:
+        if first_row == 0:
+            csv_file.write("trace_values")
+
+        np.savetxt(
+            csv_file,
+            _bench_rows(first_row, row_count),
+            fmt=",%.9g",
+            delimiter="",
+        )
+
+
+def _matplotlib_rebuild(
+    figure,
+    canvas,
+    values: np.ndarray,
+) -> None:
+    figure.clear()
+
+    axes = []
+
+    for index in range(NUMBER_OF_SIGNALS_TO_PLOT):
+        axis = figure.add_subplot(
+            NUMBER_OF_SIGNALS_TO_PLOT,
+            1,
+            index + 1,
+            sharex=axes[0] if axes else None,
         )
 
-        self.figure.subplots_adjust(
-            left=0.15,
-            right=0.98,
-            top=0.98,
-            bottom=0.07,
-            hspace=0.28,
+        axes.append(axis)
+
+        valid = np.isfinite(values[:, index + 1])
+        axis.plot(values[valid, 0], values[valid, index + 1], linewidth=1.0)
+        axis.grid(True, alpha=0.3)
+        axis.tick_params(axis="both", labelsize=7)
+
+        if index < NUMBER_OF_SIGNALS_TO_PLOT - 1:
+            axis.tick_params(labelbottom=False)
+
+    canvas.draw()
+
+
+def _pyqtgraph_all_rows_plots(
+    plot_widget: pg.GraphicsLayoutWidget,
+) -> list:
+    curves = []
+    first_plot = None
+
+    for index in range(NUMBER_OF_SIGNALS_TO_PLOT):
+        plot = plot_widget.addPlot(row=index, col=0)
+        plot.setDownsampling(auto=True, mode="peak")
+        plot.setClipToView(True)
+
+        if first_plot is None:
+            first_plot = plot
+        else:
+            plot.setXLink(first_plot)
+
+        curves.append(plot.plot(pen=pg.mkPen(width=1)))
+
+    return curves
+
+
+def _pyqtgraph_all_rows(
+    curves: list,
+    values: np.ndarray,
+) -> None:
+    x_values = np.ascontiguousarray(values[:, 0])
+
+    for index, curve in enumerate(curves):
+        curve.setData(
+            x_values,
+            np.ascontiguousarray(values[:, index + 1]),
+            connect="finite",
         )
 
-        self.canvas.draw_idle()
+
+def bench() -> None:
+    global CSV_FILE
+
+    try:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+    except ImportError:  # optional: only the Matplotlib column needs it
+        Figure = None
+
+    app = QApplication(sys.argv)
+    CSV_FILE = BENCH_FILE
+
+    print(
+        f"{'rows':>9} {'Matplotlib rebuild':>20} "
+        f"{'pyqtgraph all rows':>20} {'update_plots':>14}"
+    )
+
+    for row_count in BENCH_ROW_COUNTS:
+        with BENCH_FILE.open("w", newline="") as csv_file:
+            csv_file.write(BENCH_HEADER.format(
+                names=",".join(["Out1"] * NUMBER_OF_SIGNALS_TO_PLOT),
+                paths=",".join(
+                    f"Model Root/Signal{k}"
+                    for k in range(NUMBER_OF_SIGNALS_TO_PLOT)
+                ),
+            ))
+
+        _append_bench_rows(0, row_count)
+
+        window = MainWindow()
+        window.stop_monitoring()
+        window.tabs.setCurrentWidget(window.plot_tab)
+        window.show()
+
+        legacy_widget = pg.GraphicsLayoutWidget()
+        legacy_widget.resize(window.plot_widget.size())
+        legacy_widget.show()
+        legacy_curves = _pyqtgraph_all_rows_plots(legacy_widget)
+
+        if Figure is not None:
+            figure = Figure(figsize=(12, 12))
+            canvas = FigureCanvasAgg(figure)
+
+        app.processEvents()
+
+        timings = {"matplotlib": [], "pyqtgraph": [], "update_plots": []}
+
+        for _ in range(BENCH_REFRESHES):
+            _append_bench_rows(window.csv_tail.row_count, BENCH_APPEND_ROWS)
+            window.csv_tail.poll()
+            values = window.csv_tail.values[-MAX_PLOT_SAMPLES:]
+
+            start = time.perf_counter()
+            window.update_plots(False)
+            window.plot_widget.viewport().repaint()
+            timings["update_plots"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            _pyqtgraph_all_rows(legacy_curves, values)
+            legacy_widget.viewport().repaint()
+            timings["pyqtgraph"].append(time.perf_counter() - start)
+
+            if Figure is not None:
+                start = time.perf_counter()
+                _matplotlib_rebuild(figure, canvas, values)
+                timings["matplotlib"].append(time.perf_counter() - start)
+
+        medians = {
+            name: f"{np.median(seconds) * 1e3:.1f} ms" if seconds else "-"
+            for name, seconds in timings.items()
+        }
+
+        print(
+            f"{window.csv_tail.row_count:>9} {medians['matplotlib']:>20} "
+            f"{medians['pyqtgraph']:>20} {medians['update_plots']:>14}"
+        )
+
+        legacy_widget.close()
+        window.close()
+
+    BENCH_FILE.unlink()
 
 
 # =========================================================
@@ -870,6 +1135,13 @@ class MainWindow(QMainWindow):
 # =========================================================
 
 def main() -> None:
+    if "--bench" in sys.argv[1:]:
+        # Exit here: the old script below the entry point must
+        # not run after the benchmark.
+        sys.exit(
+            bench()
+        )
+
     app = QApplication(sys.argv)
 
     window = MainWindow()
@@ -28,6 +28,8 @@ from PyQt6.QtWidgets import (
     QFrame,
 )
 
+from telemetry_protocol import CAPT_SCHEMA, SignalSchema, TelemetryFrame, decode_datagram
+
 # ---------------------------------------------------------------------------
 # UDP Configuration
 # ---------------------------------------------------------------------------
@@ -139,29 +141,27 @@ QStatusBar {
 # ---------------------------------------------------------------------------
 
 class UdpReceiver:
-    """Non-blocking UDP receiver for dSPACE JSON packets."""
+    """Non-blocking UDP receiver for dSPACE binary telemetry frames (legacy JSON accepted)."""
 
-    def __init__(self, ip: str, port: int):
+    def __init__(self, ip: str, port: int, json_schema: SignalSchema = CAPT_SCHEMA):
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.socket.bind((ip, port))
         self.socket.setblocking(False)
+        self.json_schema = json_schema
 
-    def read_latest_packet(self) -> Optional[dict]:
-        latest_packet = None
+    def read_latest_packet(self) -> Optional[TelemetryFrame]:
+        latest_frame = None
         while True:
             try:
                 raw_data, _sender = self.socket.recvfrom(65535)
             except (BlockingIOError, OSError):
                 break
 
-            try:
-                packet = json.loads(raw_data.decode("utf-8"))
-                if isinstance(packet, dict):
-                    latest_packet = packet
-            except (UnicodeDecodeError, json.JSONDecodeError):
-                pass
-        return latest_packet
+            frame = decode_datagram(raw_data, self.json_schema)
+            if frame is not None:
+                latest_frame = frame
+        return latest_frame
 
     def close(self) -> None:
         try:
@@ -202,7 +202,7 @@ class UdpWorkerThread(QThread):
         self.sender = sender
         self._is_running = True
         self.buffer_lock = Lock()
-        self.latest_packet: Optional[dict] = None
+        self.latest_packet: Optional[TelemetryFrame] = None
 
     def run(self) -> None:
         while self._is_running:
@@ -210,19 +210,14 @@ class UdpWorkerThread(QThread):
             if packet is not None:
                 angle_val = packet.get(ANGLE_SIGNAL_NAME)
                 if angle_val is not None:
-                    try:
-                        numeric_angle = float(angle_val)
-                        if math.isfinite(numeric_angle):
-                            self.sender.send_angle(numeric_angle)
-                    except (TypeError, ValueError):
-                        pass
+                    self.sender.send_angle(angle_val)
 
                 with self.buffer_lock:
                     self.latest_packet = packet
             else:
                 QThread.msleep(1)
 
-    def get_latest_packet(self) -> Optional[dict]:
+    def get_latest_packet(self) -> Optional[TelemetryFrame]:
         with self.buffer_lock:
             pkt = self.latest_packet
             self.latest_packet = None  
@@ -838,13 +833,13 @@ class MainWindow(QMainWindow):
             self.packet_count += 1
             self.last_packet_time = time.monotonic()
 
-            if (val := self._read_number(packet, ANGLE_SIGNAL_NAME)) is not None:
+            if (val := packet.get(ANGLE_SIGNAL_NAME)) is not None:
                 self.latest_angle_rad = val
-            if (val := self._read_number(packet, TORQUE_SIGNAL_NAME)) is not None:
+            if (val := packet.get(TORQUE_SIGNAL_NAME)) is not None:
                 self.latest_torque = val
-            if (val := self._read_number(packet, CURRENT_PHASE_1_NAME)) is not None:
+            if (val := packet.get(CURRENT_PHASE_1_NAME)) is not None:
                 self.latest_current_1 = val
-            if (val := self._read_number(packet, CURRENT_PHASE_2_NAME)) is not None:
+            if (val := packet.get(CURRENT_PHASE_2_NAME)) is not None:
                 self.latest_current_2 = val
 
         if self.wheel is not None:
@@ -866,14 +861,6 @@ class MainWindow(QMainWindow):
         self.transparency_page.add_sample(self.latest_torque, self.latest_angle_rad)
         self._update_connection_status()
 
-    @staticmethod
-    def _read_number(packet: dict, signal_name: str) -> Optional[float]:
-        try:
-            val = float(packet.get(signal_name))
-            return val if math.isfinite(val) else None
-        except (TypeError, ValueError):
-            return None
-
     def _update_connection_status(self) -> None:
         if self.last_packet_time is None:
             self.status_label.setText(f"Waiting for dSPACE on {UDP_IP}:{UDP_PORT}")
@@ -1,10 +1,12 @@
 import socket
-import struct
 import time
 
+from packet_codec import SEQUENCED_F32
+
 DESTINATION_IP = "127.0.0.1"   # GUI on the same computer
 DESTINATION_PORT = 50000
 SEND_PERIOD = 0.01             # 100 Hz
+TAG_PACKETS = False            # Prefix the packet_codec layout id; the receiver must decode with packet_codec
 
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
@@ -35,17 +37,17 @@ while True:
         ao_ch16 = float(wanted_vars["AO_ch16"].ValueConverted)
         torque = float(wanted_vars["Torque"].ValueConverted)
 
-        # Packet:
+        # Packet (packet_codec.SEQUENCED_F32, "<Ifff"):
         # uint32 sequence number
         # float32 AO_ch8
         # float32 AO_ch16
         # float32 Torque
-        packet = struct.pack(
-            "<Ifff",
+        packet = SEQUENCED_F32.pack(
             sequence,
             ao_ch8,
             ao_ch16,
-            torque
+            torque,
+            tagged=TAG_PACKETS
         )
 
         sock.sendto(packet, (DESTINATION_IP, DESTINATION_PORT))
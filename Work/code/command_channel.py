@@ -0,0 +1,239 @@
+import mmap
+import os
+import struct
+import time
+
+from periodic import PeriodicScheduler
+
+# ---------------------------------------------------------------------------
+# Memory-Mapped Command Channel (shared_data.bin)
+# ---------------------------------------------------------------------------
+#
+# Same 24-byte layout the MATLAB memmapfile readers already use:
+#
+#   offset  size  field
+#   0       8     sequence   uint64, odd while a command is being written
+#   8       8     delta      float64 steering angle delta [rad]
+#   16      8     theta      float64 heading command [rad]
+#
+# The file is mapped once, so publishing a sample is three stores into the
+# page cache instead of seek/write/flush syscalls. All mappings of the same
+# file see the same pages, so MATLAB reads the new value without any flush.
+
+FILE_PATH = r"C:\Users\javot\Desktop\sofia_code\shared_data.bin"
+
+FILE_SIZE = 24
+SEQUENCE_STRUCT = struct.Struct("<Q")
+COMMAND_STRUCT = struct.Struct("<dd")
+COMMAND_OFFSET = SEQUENCE_STRUCT.size
+
+READ_RETRY_LIMIT = 1000
+
+
+def ensure_command_file(file_path=FILE_PATH):
+    """Create the zero-filled 24-byte file if it is missing or has the wrong size."""
+    folder = os.path.dirname(file_path)
+
+    if folder and not os.path.isdir(folder):
+        raise FileNotFoundError(
+            "Folder does not exist: {}".format(folder)
+        )
+
+    if not os.path.exists(file_path) or os.path.getsize(file_path) != FILE_SIZE:
+        with open(file_path, "wb") as file:
+            file.write(b"\x00" * FILE_SIZE)
+            file.flush()
+            os.fsync(file.fileno())
+
+
+class CommandPublisher:
+    """Single writer of (delta, theta) commands into the mapped file."""
+
+    def __init__(self, file_path=FILE_PATH):
+        ensure_command_file(file_path)
+
+        self.file_path = file_path
+        self._file = open(file_path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), FILE_SIZE)
+
+        # Continue from the stored counter so readers never see it go backwards.
+        stored = SEQUENCE_STRUCT.unpack_from(self._map, 0)[0]
+        self.sequence = stored + (stored & 1)
+
+    def publish(self, delta, theta):
+        # Odd sequence: writing has started
+        self.sequence += 1
+        SEQUENCE_STRUCT.pack_into(self._map, 0, self.sequence)
+
+        COMMAND_STRUCT.pack_into(self._map, COMMAND_OFFSET, float(delta), float(theta))
+
+        # Even sequence: writing has finished
+        self.sequence += 1
+        SEQUENCE_STRUCT.pack_into(self._map, 0, self.sequence)
+
+    def close(self):
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+
+class CommandSubscriber:
+    """Read-only view of the command file with seqlock-consistent reads."""
+
+    def __init__(self, file_path=FILE_PATH):
+        self._file = open(file_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), FILE_SIZE, access=mmap.ACCESS_READ)
+        self.retries = 0
+
+    def read(self):
+        """Return (sequence, delta, theta), or None if no consistent copy could be taken."""
+        for _ in range(READ_RETRY_LIMIT):
+            before = SEQUENCE_STRUCT.unpack_from(self._map, 0)[0]
+
+            if before & 1:
+                self.retries += 1
+                time.sleep(0)
+                continue
+
+            delta, theta = COMMAND_STRUCT.unpack_from(self._map, COMMAND_OFFSET)
+
+            if SEQUENCE_STRUCT.unpack_from(self._map, 0)[0] == before:
+                return before, delta, theta
+
+            self.retries += 1
+
+        return None
+
+    def wait_for_update(self, last_sequence, timeout):
+        """Poll until a sequence newer than `last_sequence` appears; None on timeout."""
+        deadline = time.perf_counter() + timeout
+
+        while time.perf_counter() < deadline:
+            sample = self.read()
+
+            if sample is not None and sample[0] > last_sequence:
+                return sample
+
+            time.sleep(0)
+
+        return None
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def run_publisher(publisher, command_function, sample_period, duration, print_every=1):
+    """Publish command_function(elapsed_time) -> (delta, theta) every sample_period seconds.
+
+    Returns the PeriodicScheduler so callers can print its timing report.
+    """
+    scheduler = PeriodicScheduler(1.0 / sample_period)
+    sample_count = 0
+
+    for elapsed_time in scheduler.ticks(duration):
+        delta, theta = command_function(elapsed_time)
+        publisher.publish(delta, theta)
+        sample_count += 1
+
+        if print_every and sample_count % print_every == 0:
+            print(
+                "sequence={}, delta={:.6f}, theta={:.6f}".format(
+                    publisher.sequence,
+                    delta,
+                    theta
+                )
+            )
+
+    return scheduler
+
+
+#-------TEST MAIN ---------- #
+#
+# Publishes delta = k, theta = -k at 1 kHz from a child process while this
+# process reads as fast as it can. A read is torn if theta != -delta, and
+# the sequence must never go backwards. Also times one publish against the
+# old seek/write/flush pattern.
+
+TEST_FILE_PATH = "shared_data_test.bin"
+TEST_RATE_HZ = 1000
+TEST_SECONDS = 2.0
+TEST_TIMING_SAMPLES = 20000
+
+
+def _test_publisher():
+    publisher = CommandPublisher(TEST_FILE_PATH)
+    counter = [0]
+
+    def command(_elapsed_time):
+        counter[0] += 1
+        return counter[0], -counter[0]
+
+    run_publisher(publisher, command, 1.0 / TEST_RATE_HZ, TEST_SECONDS, print_every=0)
+    publisher.close()
+
+
+def main():
+    import multiprocessing
+
+    ensure_command_file(TEST_FILE_PATH)
+
+    publisher = CommandPublisher(TEST_FILE_PATH)
+    start = time.perf_counter()
+    for index in range(TEST_TIMING_SAMPLES):
+        publisher.publish(index, -index)
+    mmap_us = (time.perf_counter() - start) / TEST_TIMING_SAMPLES * 1e6
+    publisher.close()
+
+    with open(TEST_FILE_PATH, "r+b", buffering=0) as file:
+        start = time.perf_counter()
+        for index in range(TEST_TIMING_SAMPLES):
+            file.seek(0)
+            file.write(SEQUENCE_STRUCT.pack(2 * index + 1))
+            file.seek(8)
+            file.write(COMMAND_STRUCT.pack(index, -index))
+            file.seek(0)
+            file.write(SEQUENCE_STRUCT.pack(2 * index + 2))
+            file.flush()
+        file_us = (time.perf_counter() - start) / TEST_TIMING_SAMPLES * 1e6
+
+    print("publish cost: mmap {:.2f} us | seek/write/flush {:.2f} us".format(mmap_us, file_us))
+
+    # Fresh file so the counter restarts for the consistency check.
+    os.remove(TEST_FILE_PATH)
+    ensure_command_file(TEST_FILE_PATH)
+
+    subscriber = CommandSubscriber(TEST_FILE_PATH)
+    writer = multiprocessing.Process(target=_test_publisher)
+    writer.start()
+
+    reads = torn = backwards = updates = 0
+    last_sequence = 0
+    while writer.is_alive():
+        sample = subscriber.read()
+        if sample is None:
+            continue
+        sequence, delta, theta = sample
+        reads += 1
+        if theta != -delta:
+            torn += 1
+        if sequence < last_sequence:
+            backwards += 1
+        if sequence > last_sequence:
+            updates += 1
+        last_sequence = sequence
+
+    writer.join()
+    subscriber.close()
+    os.remove(TEST_FILE_PATH)
+
+    print(
+        "{} reads, {} distinct commands seen, {} torn, {} sequence regressions, {} retries".format(
+            reads, updates, torn, backwards, subscriber.retries
+        )
+    )
+    print("PASS" if torn == 0 and backwards == 0 else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
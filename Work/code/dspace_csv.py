@@ -0,0 +1,618 @@
+import csv
+import io
+import time
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+# =========================================================
+# dSPACE CSV layout
+# =========================================================
+#
+# A ControlDesk export is a block of metadata rows of varying length
+# (some with quoted multi-line cells), a 'path' row holding the signal
+# names, and a 'trace_values' row that starts the numeric block:
+#
+#   trace_names,,Out1,Out1,...
+#   path,,Model Root/Divide,Model Root/Subsystem2/curr2torque,...
+#   ...
+#   trace_values,0,286.43,1.30,...
+#   ,0.00099,286.43,1.30,...
+#
+# Loading happens in two phases. The metadata rows are scanned in
+# Python until both marker rows are found, which also gives the byte
+# offset of the numeric block. That block is then handed to the pandas
+# C parser with fixed float64 columns, so the per-sample cost is C code
+# only.
+
+# Bytes used to detect the delimiter.
+DELIMITER_SAMPLE_BYTES = 4096
+
+
+def make_unique_names(names: list[str]) -> list[str]:
+    """
+    Make every signal name unique.
+
+    For example:
+        Torque, Torque, Angle
+
+    becomes:
+        Torque, Torque_2, Angle
+    """
+
+    counts: dict[str, int] = {}
+    unique_names: list[str] = []
+
+    for index, raw_name in enumerate(names):
+        name = str(raw_name).strip()
+
+        if not name:
+            name = f"Signal_{index + 1}"
+
+        count = counts.get(name, 0)
+
+        if count == 0:
+            unique_name = name
+        else:
+            unique_name = f"{name}_{count + 1}"
+
+        counts[name] = count + 1
+        unique_names.append(unique_name)
+
+    return unique_names
+
+
+def resolve_csv_path(
+    file_path: Union[str, Path],
+) -> Path:
+    """
+    Expand the path and add ".csv" when it was omitted.
+    """
+
+    file_path = Path(file_path).expanduser()
+
+    if not file_path.exists() and file_path.suffix == "":
+        possible_csv_path = file_path.with_suffix(".csv")
+
+        if possible_csv_path.exists():
+            file_path = possible_csv_path
+
+    if not file_path.exists():
+        raise FileNotFoundError(
+            f"CSV file not found: {file_path.resolve()}"
+        )
+
+    return file_path
+
+
+class DspaceCsvLayout:
+    """
+    Where the signals of a dSPACE export are.
+
+    data_offset is the byte offset of the 'trace_values' row.
+    The signal values of every data row are in the columns
+    data_start_column .. data_start_column + len(signal_names) - 1.
+    """
+
+    def __init__(
+        self,
+        delimiter: str,
+        signal_names: list[str],
+        data_start_column: int,
+        data_offset: int,
+    ) -> None:
+        self.delimiter = delimiter
+        self.signal_names = signal_names
+        self.data_start_column = data_start_column
+        self.data_offset = data_offset
+
+    @property
+    def column_count(self) -> int:
+        return self.data_start_column + len(self.signal_names)
+
+
+def detect_delimiter(
+    sample: str,
+) -> str:
+    try:
+        return csv.Sniffer().sniff(
+            sample,
+            delimiters=",;\t",
+        ).delimiter
+
+    except csv.Error:
+        return ","
+
+
+def scan_dspace_header(
+    file_path: Union[str, Path],
+) -> DspaceCsvLayout:
+    """
+    Read only the metadata rows of a dSPACE export.
+
+    Stops at the first row that contains 'trace_values' once the
+    'path' row has been seen, so the cost does not depend on the
+    number of samples.
+    """
+
+    with Path(file_path).open("rb") as csv_file:
+        sample = csv_file.read(DELIMITER_SAMPLE_BYTES)
+
+        if not sample.strip():
+            raise ValueError("The CSV file is empty.")
+
+        delimiter = detect_delimiter(
+            sample.decode("utf-8-sig", errors="replace")
+        )
+
+        csv_file.seek(0)
+
+        path_cells: Optional[list[str]] = None
+        path_column_index = 0
+        trace_column_index = 0
+        data_offset: Optional[int] = None
+
+        offset = 0
+        record_start = 0
+        record_lines: list[bytes] = []
+
+        for line in csv_file:
+            if not record_lines:
+                record_start = offset
+
+            offset += len(line)
+            record_lines.append(line)
+
+            record = b"".join(record_lines)
+
+            # An odd number of quotes means a quoted cell continues
+            # on the next line.
+            if record.count(b'"') % 2:
+                continue
+
+            record_lines = []
+
+            text = record.decode(
+                "utf-8-sig" if record_start == 0 else "utf-8",
+                errors="replace",
+            )
+
+            cells = [
+                cell.strip()
+                for row in csv.reader(
+                    text.splitlines(keepends=True),
+                    delimiter=delimiter,
+                )
+                for cell in row
+            ]
+
+            lowered = [
+                cell.lower()
+                for cell in cells
+            ]
+
+            if path_cells is None and "path" in lowered:
+                path_cells = cells
+                path_column_index = lowered.index("path")
+
+            if data_offset is None and "trace_values" in lowered:
+                data_offset = record_start
+                trace_column_index = lowered.index("trace_values")
+
+            if path_cells is not None and data_offset is not None:
+                break
+
+    if path_cells is None:
+        raise ValueError(
+            "Could not find a row containing 'path'."
+        )
+
+    if data_offset is None:
+        raise ValueError(
+            "Could not find a row containing 'trace_values'."
+        )
+
+    # Signal names normally appear after the "path" cell.
+    signal_names = path_cells[path_column_index + 1:]
+
+    # Remove empty trailing cells.
+    while signal_names and signal_names[-1] == "":
+        signal_names.pop()
+
+    if not signal_names:
+        raise ValueError(
+            "The 'path' row was found, but no signal names "
+            "were detected."
+        )
+
+    return DspaceCsvLayout(
+        delimiter,
+        make_unique_names(signal_names),
+        trace_column_index + 1,
+        data_offset,
+    )
+
+
+def widest_row(
+    data: bytes,
+    delimiter: str,
+) -> int:
+    """
+    Upper bound on the number of cells in any line of data.
+
+    Delimiters inside quoted cells are counted too, which only
+    overestimates.
+    """
+
+    raw = np.frombuffer(data, dtype=np.uint8)
+    delimiters = np.flatnonzero(raw == ord(delimiter))
+
+    if not len(delimiters):
+        return 1
+
+    # Delimiters before each line end; the differences are per line.
+    line_ends = np.flatnonzero(raw == ord("\n"))
+    boundaries = np.concatenate((
+        [0],
+        np.searchsorted(delimiters, line_ends),
+        [len(delimiters)],
+    ))
+
+    return int(np.diff(boundaries).max()) + 1
+
+
+def read_dspace_values(
+    csv_file: BinaryIO,
+    layout: DspaceCsvLayout,
+) -> pd.DataFrame:
+    """
+    Parse numeric rows from the current position of csv_file.
+
+    Text cells become NaN and rows without any number are dropped.
+    Cells beyond the last signal (e.g. a trailing delimiter) are
+    ignored.
+    """
+
+    data = csv_file.read()
+    signal_columns = list(
+        range(
+            layout.data_start_column,
+            layout.column_count,
+        )
+    )
+
+    # The C reader rejects rows with more cells than names, so the
+    # names cover the widest row; short rows are padded with NaN.
+    column_count = max(
+        layout.column_count,
+        widest_row(data, layout.delimiter),
+    )
+
+    read_options = dict(
+        sep=layout.delimiter,
+        header=None,
+        # Fixed names so short or long rows cannot shift columns.
+        names=range(column_count),
+        usecols=signal_columns,
+        skip_blank_lines=True,
+        encoding="utf-8",
+        encoding_errors="replace",
+    )
+
+    try:
+        data_df = pd.read_csv(
+            io.BytesIO(data),
+            dtype=np.float64,
+            **read_options,
+        )
+
+    except pd.errors.EmptyDataError:
+        data_df = pd.DataFrame(
+            columns=signal_columns,
+            dtype=np.float64,
+        )
+
+    except ValueError:
+        # Some cell is not a number (for example a decimal comma
+        # or a text marker). Parse as text and coerce those cells
+        # to NaN.
+        data_df = pd.read_csv(
+            io.BytesIO(data),
+            dtype=str,
+            **read_options,
+        )
+
+        data_df = data_df.apply(
+            pd.to_numeric,
+            errors="coerce",
+        )
+
+    data_df.columns = layout.signal_names
+
+    # Remove rows that do not contain any numerical values.
+    return (
+        data_df
+        .dropna(how="all")
+        .reset_index(drop=True)
+    )
+
+
+def load_dspace_csv(
+    file_path: Union[str, Path],
+) -> pd.DataFrame:
+    """
+    Load a dSPACE CSV export.
+
+    This parser:
+    - detects comma, semicolon or tab delimiters
+    - handles metadata rows with different lengths
+    - finds the row containing 'path'
+    - finds the row containing 'trace_values'
+    - extracts all logged signal names
+    - converts all logged values to float64 numbers
+    """
+
+    file_path = resolve_csv_path(file_path)
+    layout = scan_dspace_header(file_path)
+
+    with file_path.open("rb") as csv_file:
+        csv_file.seek(layout.data_offset)
+
+        data_df = read_dspace_values(
+            csv_file,
+            layout,
+        )
+
+    if data_df.empty:
+        raise ValueError(
+            "No numerical values were found after "
+            "the 'trace_values' row."
+        )
+
+    return data_df
+
+
+# =========================================================
+# Tail-following
+# =========================================================
+#
+# While ControlDesk is logging, the export only grows at the end. The
+# tail remembers the parsed header and the byte offset up to which rows
+# have been parsed, so each poll reads and parses only the appended
+# bytes. A trailing line without its newline yet is left for the next
+# poll; ControlDesk terminates every row, including the last one. If
+# the metadata bytes change or the file shrinks, it was replaced by a
+# new export and everything is parsed again.
+
+# Starting number of rows in the growing buffer.
+TAIL_INITIAL_CAPACITY = 16384
+
+
+class DspaceCsvTail:
+    """
+    Incrementally parsed dSPACE export that is still being written.
+
+    values is a (rows, signals) float64 view of every row parsed so
+    far. It stays valid until the next poll().
+    """
+
+    def __init__(
+        self,
+        file_path: Union[str, Path],
+    ) -> None:
+        self.file_path = Path(file_path)
+        self.layout: Optional[DspaceCsvLayout] = None
+        self.read_offset = 0
+        self.row_count = 0
+
+        self._header_bytes = b""
+        self._buffer = np.empty((0, 0))
+
+    @property
+    def signal_names(self) -> list[str]:
+        return self.layout.signal_names if self.layout else []
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._buffer[:self.row_count]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            self.values,
+            columns=self.signal_names,
+            copy=False,
+        )
+
+    def reset(self) -> None:
+        """
+        Forget everything; the next poll() parses the whole file.
+        """
+
+        self.layout = None
+        self.read_offset = 0
+        self.row_count = 0
+        self._header_bytes = b""
+
+    def poll(self) -> bool:
+        """
+        Parse the rows appended since the last call.
+
+        Returns True when the file was (re)loaded from the start,
+        meaning that every earlier row and the signal names may have
+        changed, and False when rows were only appended.
+        """
+
+        file_path = resolve_csv_path(self.file_path)
+        restarted = self.layout is None
+
+        with file_path.open("rb") as csv_file:
+            size = csv_file.seek(0, 2)
+
+            if not restarted:
+                csv_file.seek(0)
+
+                if (
+                    size < self.read_offset
+                    or csv_file.read(len(self._header_bytes))
+                    != self._header_bytes
+                ):
+                    self.reset()
+                    restarted = True
+
+            if restarted:
+                self.layout = scan_dspace_header(file_path)
+                self.read_offset = self.layout.data_offset
+
+                csv_file.seek(0)
+                self._header_bytes = csv_file.read(
+                    self.layout.data_offset
+                )
+
+                self._buffer = np.empty(
+                    (TAIL_INITIAL_CAPACITY, len(self.layout.signal_names))
+                )
+
+            csv_file.seek(self.read_offset)
+            new_bytes = csv_file.read(size - self.read_offset)
+
+        # Only whole lines; the rest is still being written.
+        complete = new_bytes.rfind(b"\n") + 1
+
+        if complete:
+            block = read_dspace_values(
+                io.BytesIO(new_bytes[:complete]),
+                self.layout,
+            ).to_numpy()
+
+            self._append(block)
+            self.read_offset += complete
+
+        return restarted
+
+    def _append(
+        self,
+        block: np.ndarray,
+    ) -> None:
+        required = self.row_count + len(block)
+
+        if required > len(self._buffer):
+            grown = np.empty(
+                (max(required, 2 * len(self._buffer)), self._buffer.shape[1])
+            )
+
+            grown[:self.row_count] = self.values
+            self._buffer = grown
+
+        self._buffer[self.row_count:required] = block
+        self.row_count = required
+
+
+#-------BENCHMARK MAIN ---------- #
+#
+# Writes a synthetic 1M-row export with the metadata block of a real
+# ControlDesk recording and compares load_dspace_csv against the old
+# whole-file csv.reader + object DataFrame + pd.to_numeric parser.
+
+BENCH_FILE = Path("dspace_bench.csv")
+BENCH_ROWS = 1_000_000
+BENCH_SIGNALS = 5
+
+BENCH_METADATA = """descriptions,General,User,javot
+,General,DateTime,7/17/2026 10:46:33 AM
+,General,Origin,"Software revision: outputs_asymmetricspring.sdf
+    Platform / Device: Platform [DS1202 MicroLabBox, assigned to 'ds1202']
+ControlDesk version: 7.5"
+,Measurement,Length,1000
+
+trace_size,{rows}
+trace_names,,{names}
+path,,{paths}
+min,,{infinities}
+"""
+
+
+def _legacy_load(
+    file_path: Path,
+) -> pd.DataFrame:
+    with file_path.open("r", encoding="utf-8-sig", errors="replace", newline="") as csv_file:
+        rows = [[cell.strip() for cell in row] for row in csv.reader(csv_file)]
+
+    width = max(len(row) for row in rows)
+    raw_df = pd.DataFrame([row + [""] * (width - len(row)) for row in rows])
+
+    def find(value: str) -> int:
+        for row_index, row in raw_df.iterrows():
+            if row.astype(str).str.strip().str.lower().eq(value).any():
+                return row_index
+        raise ValueError(value)
+
+    path_row = raw_df.iloc[find("path")].tolist()
+    trace_index = find("trace_values")
+    names = path_row[1:]
+    while names and names[-1] == "":
+        names.pop()
+    data_df = raw_df.iloc[trace_index:, 1:1 + len(names)].copy()
+    data_df.columns = make_unique_names(names)
+
+    for column_name in data_df.columns:
+        data_df[column_name] = pd.to_numeric(data_df[column_name].astype(str).str.strip(), errors="coerce")
+
+    return data_df.dropna(how="all").reset_index(drop=True)
+
+
+def _write_bench_file() -> np.ndarray:
+    time_column = np.arange(BENCH_ROWS) * 1e-3
+    values = np.column_stack(
+        [time_column] + [np.sin(time_column * (k + 1)) * 100 for k in range(BENCH_SIGNALS)]
+    )
+
+    with BENCH_FILE.open("w", newline="") as csv_file:
+        csv_file.write(BENCH_METADATA.format(
+            rows=BENCH_ROWS,
+            names=",".join(["Out1"] * BENCH_SIGNALS),
+            paths=",".join(f"Model Root/Subsystem/Signal{k}" for k in range(BENCH_SIGNALS)),
+            infinities=",".join(["-Infinity"] * BENCH_SIGNALS),
+        ))
+        lines = np.char.add(",", [",".join(map(repr, row)) for row in values.tolist()])
+        lines[0] = "trace_values" + lines[0]
+        csv_file.write("\n".join(lines) + "\n")
+
+    return values
+
+
+def main() -> None:
+    values = _write_bench_file()
+    size_mb = BENCH_FILE.stat().st_size / 1e6
+
+    start = time.perf_counter()
+    layout = scan_dspace_header(BENCH_FILE)
+    scan_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    data_df = load_dspace_csv(BENCH_FILE)
+    new_seconds = time.perf_counter() - start
+
+    assert list(data_df.columns) == layout.signal_names
+    # The C parser's default "high" precision mode may be off by an ulp.
+    assert np.allclose(data_df.to_numpy(), values, rtol=1e-12, atol=1e-12)
+
+    print(f"{BENCH_ROWS} rows x {BENCH_SIGNALS + 1} columns, {size_mb:.0f} MB")
+    print(f"  header scan:      {scan_ms:.2f} ms")
+    print(f"  load_dspace_csv:  {new_seconds:.2f} s, "
+          f"{data_df.memory_usage(deep=True).sum() / 1e6:.0f} MB DataFrame")
+
+    start = time.perf_counter()
+    legacy_df = _legacy_load(BENCH_FILE)
+    legacy_seconds = time.perf_counter() - start
+
+    assert np.allclose(legacy_df.to_numpy(), values, rtol=1e-12, atol=1e-12)
+    print(f"  old parser:       {legacy_seconds:.2f} s ({legacy_seconds / new_seconds:.0f}x slower)")
+
+    BENCH_FILE.unlink()
+
+
+if __name__ == "__main__":
+    main()
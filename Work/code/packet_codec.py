@@ -0,0 +1,272 @@
+import struct
+import time
+from typing import Iterable, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # ControlDesk's interpreter: only pack/unpack are usable there
+    np = None
+
+# ---------------------------------------------------------------------------
+# Raw Struct Packet Layouts
+# ---------------------------------------------------------------------------
+#
+# The UDP bridges and GUIs exchange bare little-endian structs with dSPACE and
+# Simulink. Each layout is registered once with a one-byte id and gets a
+# precompiled struct.Struct plus a matching NumPy dtype:
+#
+#   id  name            format  bytes  used by
+#   1   angle_f32       <f      4      Simulink angle block
+#   2   angle_f64       <d      8      forwarded angle (udp_final.py -> Simulink)
+#   3   signals_f32     <4f     16     dSPACE UDP block: angle, torque, phase currents
+#   4   signals_f64     <4d     32     same, double precision
+#   5   sequenced_f32   <Ifff   16     com_dspace.py: sequence, AO_ch8, AO_ch16, Torque
+#   6   gui_signals_f32 <6f     24     gui_arch.py
+#
+# Untagged packets are resolved by size, so a PacketCodec only accepts
+# layouts of distinct sizes (signals_f32 and sequenced_f32 are both 16 bytes).
+# A sender can remove the ambiguity by tagging: one leading byte with the
+# layout id. A codec only resolves the ids of the layouts it was built with,
+# so a tagged packet of any other layout is rejected like an unknown size.
+# Tagged packets are 1 + 4k bytes long, so they never collide with the
+# untagged sizes.
+
+_NUMPY_CODES = {"b": "i1", "B": "u1", "h": "<i2", "H": "<u2", "i": "<i4", "I": "<u4",
+                "q": "<i8", "Q": "<u8", "f": "<f4", "d": "<f8"}
+
+
+class PacketLayout:
+    """One fixed packet layout: named fields with struct codes, compiled once."""
+
+    def __init__(self, layout_id: int, name: str, fields: Sequence[tuple[str, str]]):
+        self.layout_id = layout_id
+        self.name = name
+        self.field_names = tuple(field_name for field_name, _code in fields)
+        self.codes = "".join(code for _field_name, code in fields)
+        self.struct = struct.Struct("<" + self.codes)
+        self.size = self.struct.size
+        self.tag = bytes([layout_id])
+        self.dtype = None
+        if np is not None:
+            self.dtype = np.dtype([(field_name, _NUMPY_CODES[code]) for field_name, code in fields])
+            self.tagged_dtype = np.dtype([("layout_id", "u1")] + [(n, self.dtype[n]) for n in self.field_names])
+
+    def __len__(self) -> int:
+        return len(self.field_names)
+
+    def index_of(self, field_name: str) -> int:
+        return self.field_names.index(field_name)
+
+    def pack(self, *values, tagged: bool = False) -> bytes:
+        packet = self.struct.pack(*values)
+        return self.tag + packet if tagged else packet
+
+    def unpack(self, packet, offset: int = 0) -> tuple:
+        return self.struct.unpack_from(packet, offset)
+
+
+LAYOUT_REGISTRY: dict[int, PacketLayout] = {}
+
+
+def register_layout(layout_id: int, name: str, fields: Sequence[tuple[str, str]]) -> PacketLayout:
+    """Register a packet layout so tagged packets can be resolved by their id byte."""
+    if not 0 <= layout_id <= 0xFF:
+        raise ValueError(f"Layout id must fit in one byte, got {layout_id}")
+
+    layout = PacketLayout(layout_id, name, fields)
+    existing = LAYOUT_REGISTRY.get(layout_id)
+    if existing is not None and (existing.field_names, existing.codes) != (layout.field_names, layout.codes):
+        raise ValueError(f"Layout id {layout_id} is already registered as {existing.name}")
+
+    LAYOUT_REGISTRY[layout_id] = layout
+    return layout
+
+
+SIGNAL_FIELDS = ("angle", "torque", "phase1", "phase2")
+
+ANGLE_F32 = register_layout(1, "angle_f32", [("angle", "f")])
+ANGLE_F64 = register_layout(2, "angle_f64", [("angle", "d")])
+SIGNALS_F32 = register_layout(3, "signals_f32", [(name, "f") for name in SIGNAL_FIELDS])
+SIGNALS_F64 = register_layout(4, "signals_f64", [(name, "d") for name in SIGNAL_FIELDS])
+SEQUENCED_F32 = register_layout(5, "sequenced_f32", [("sequence", "I"), ("AO_ch8", "f"), ("AO_ch16", "f"), ("Torque", "f")])
+GUI_SIGNALS_F32 = register_layout(6, "gui_signals_f32", [
+    ("angle", "f"),
+    ("torque", "f"),
+    ("angular_velocity", "f"),
+    ("phase1", "f"),
+    ("phase2", "f"),
+    ("controller_output", "f"),
+])
+
+# What the bridges accepted before by dispatching on len(packet).
+BRIDGE_LAYOUTS = (ANGLE_F32, ANGLE_F64, SIGNALS_F32, SIGNALS_F64)
+
+
+# ---------------------------------------------------------------------------
+# Decoding
+# ---------------------------------------------------------------------------
+
+class PacketCodec:
+    """Resolves packets to its layouts: tagged ones by their id byte, untagged ones by size."""
+
+    def __init__(self, layouts: Iterable[PacketLayout]):
+        self.layouts_by_size: dict[int, PacketLayout] = {}
+        self.layouts_by_id: dict[int, PacketLayout] = {}
+        for layout in layouts:
+            self.layouts_by_id[layout.layout_id] = layout
+            other = self.layouts_by_size.get(layout.size)
+            if other is not None and other is not layout:
+                raise ValueError(f"{layout.name} and {other.name} are both {layout.size} bytes; "
+                                 f"tag one of them instead")
+            self.layouts_by_size[layout.size] = layout
+        self.rejected_count = 0
+
+    @property
+    def sizes(self) -> tuple[int, ...]:
+        return tuple(sorted(self.layouts_by_size))
+
+    def resolve(self, packet) -> tuple[Optional[PacketLayout], int]:
+        """(layout, payload offset) of a packet, or (None, 0) if it matches no layout."""
+        size = len(packet)
+        layout = self.layouts_by_size.get(size)
+        if layout is not None:
+            return layout, 0
+        if size:
+            layout = self.layouts_by_id.get(packet[0])
+            if layout is not None and layout.size + 1 == size:
+                return layout, 1
+        return None, 0
+
+    def decode(self, packet) -> tuple[Optional[PacketLayout], Optional[tuple]]:
+        """(layout, values) of one packet, or (None, None) when it matches no layout."""
+        layout = self.layouts_by_size.get(len(packet))
+        if layout is not None:
+            return layout, layout.struct.unpack(packet)
+
+        layout, offset = self.resolve(packet)
+        if layout is None:
+            self.rejected_count += 1
+            return None, None
+        return layout, layout.struct.unpack_from(packet, offset)
+
+    def decode_many(self, packets: Iterable[bytes], layout: Optional[PacketLayout] = None):
+        """Decode a batch into one NumPy structured array of `layout`'s dtype.
+
+        `layout` defaults to that of the first recognised packet. Packets of any
+        other layout are skipped and counted in rejected_count.
+        """
+        packets = list(packets)
+        sizes = set(map(len, packets))
+        if len(sizes) == 1:
+            # Usual burst: one untagged layout throughout, no per-packet work.
+            burst_layout = self.layouts_by_size.get(sizes.pop())
+            if burst_layout is not None and layout in (None, burst_layout):
+                return np.frombuffer(b"".join(packets), dtype=burst_layout.dtype)
+
+        accepted = []
+        tagged_count = 0
+        for packet in packets:
+            packet_layout, offset = self.resolve(packet)
+            if packet_layout is None or (layout is not None and packet_layout is not layout):
+                self.rejected_count += 1
+                continue
+            layout = packet_layout
+            accepted.append(packet)
+            tagged_count += offset
+
+        if layout is None:
+            return np.empty(0, dtype=ANGLE_F32.dtype)
+        if tagged_count == 0:
+            return np.frombuffer(b"".join(accepted), dtype=layout.dtype)
+        if tagged_count == len(accepted):
+            # Drop the id byte column by copying the value fields across.
+            with_tag = np.frombuffer(b"".join(accepted), dtype=layout.tagged_dtype)
+            values = np.empty(len(with_tag), dtype=layout.dtype)
+            for field_name in layout.field_names:
+                values[field_name] = with_tag[field_name]
+            return values
+
+        # Tagged and untagged packets in one batch: unpack each, in arrival order.
+        unpack_from = layout.struct.unpack_from
+        size = layout.size
+        return np.array([unpack_from(packet, len(packet) - size) for packet in accepted], dtype=layout.dtype)
+
+
+#-------BENCHMARK MAIN ---------- #
+#
+# Checks every registered layout round-trips tagged and untagged, then times
+# decoding a burst of 4-float packets: the bridges' old len() dispatch to
+# struct.unpack with a format string, PacketCodec.decode per packet, and
+# decode_many for the whole burst.
+
+BENCH_PACKETS = 1000
+BENCH_REPEATS = 200
+
+
+def _legacy_decode(packet: bytes):
+    if len(packet) == 16:
+        return struct.unpack("<4f", packet)
+    elif len(packet) == 32:
+        return struct.unpack("<4d", packet)
+    elif len(packet) == 4:
+        return struct.unpack("<f", packet)
+    elif len(packet) == 8:
+        return struct.unpack("<d", packet)
+    return None
+
+
+def _check_layouts() -> None:
+    codec = PacketCodec(BRIDGE_LAYOUTS)
+    for layout in LAYOUT_REGISTRY.values():
+        values = tuple(range(1, len(layout) + 1))
+        for tagged in (False, True):
+            packet = layout.pack(*values, tagged=tagged)
+            if layout not in BRIDGE_LAYOUTS:
+                # Only the codec's own layouts are accepted, tagged or not.
+                if tagged:
+                    assert codec.decode(packet) == (None, None), layout.name
+                continue
+            decoded_layout, decoded = codec.decode(packet)
+            assert decoded_layout is layout and decoded == values, (layout.name, tagged)
+            batch = codec.decode_many([packet, packet])
+            assert batch.dtype == layout.dtype and tuple(batch[1]) == values, (layout.name, tagged)
+
+    mixed = codec.decode_many([SIGNALS_F32.pack(1, 2, 3, 4), SIGNALS_F32.pack(5, 6, 7, 8, tagged=True),
+                               ANGLE_F32.pack(9), b"\x00" * 5])
+    assert mixed["angle"].tolist() == [1, 5] and codec.rejected_count == 4
+    sequenced_codec = PacketCodec((SIGNALS_F32, SIGNALS_F64))
+    assert sequenced_codec.decode(SEQUENCED_F32.pack(7, 1, 2, 3, tagged=True)) == (None, None)
+    assert sequenced_codec.decode_many([SEQUENCED_F32.pack(7, 1, 2, 3, tagged=True)]).size == 0
+    assert sequenced_codec.rejected_count == 2
+    sequenced_codec = PacketCodec((SIGNALS_F64, SEQUENCED_F32))
+    assert sequenced_codec.decode(SEQUENCED_F32.pack(7, 1, 2, 3, tagged=True))[1] == (7, 1, 2, 3)
+
+    try:
+        PacketCodec((SIGNALS_F32, SEQUENCED_F32))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("16-byte layouts must collide when untagged")
+    print(f"{len(LAYOUT_REGISTRY)} layouts round-trip tagged and untagged")
+
+
+def main() -> None:
+    _check_layouts()
+
+    codec = PacketCodec(BRIDGE_LAYOUTS)
+    packets = [SIGNALS_F32.pack(i * 0.1, 0.5, -1.0, 1.0) for i in range(BENCH_PACKETS)]
+
+    def bench(label: str, decode_burst) -> None:
+        start = time.perf_counter()
+        for _ in range(BENCH_REPEATS):
+            decode_burst()
+        seconds = time.perf_counter() - start
+        print(f"{label:<32} {seconds / (BENCH_REPEATS * BENCH_PACKETS) * 1e9:7.1f} ns/packet")
+
+    bench("len() dispatch + struct.unpack", lambda: [_legacy_decode(packet) for packet in packets])
+    bench("PacketCodec.decode", lambda: [codec.decode(packet) for packet in packets])
+    bench("PacketCodec.decode_many", lambda: codec.decode_many(packets))
+
+
+if __name__ == "__main__":
+    main()
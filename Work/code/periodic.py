@@ -0,0 +1,234 @@
+import asyncio
+import sys
+import time
+
+# ---------------------------------------------------------------------------
+# Drift-Free Periodic Scheduler
+# ---------------------------------------------------------------------------
+#
+# Deadlines are start + k * period, so errors never accumulate. Each wait
+# sleeps until `spin_seconds` before the deadline (sleep resolution is ~1 ms
+# at best, ~15 ms on old Windows timers) and busy-waits the rest on
+# perf_counter for sub-millisecond jitter. If a cycle overruns past one or
+# more following deadlines those ticks are skipped, not bunched together,
+# and the phase is kept.
+#
+# at_offsets() waits for an irregular timeline instead (session_replay.py):
+# it yields each offset from the start once it is reached. Late offsets are
+# yielded at once rather than skipped, so every recorded sample is replayed.
+#
+# An `idle(timeout)` callable can replace the sleep and the spin, so a loop
+# can service sockets while it waits (udp_bridge.py): it is called with the
+# time left before the spin window (again after returning early), then
+# with 0 while spinning, and must return within the timeout it is given.
+#
+# Pure Python on purpose: udp_send.py and to_dspace.py run inside the
+# ControlDesk interpreter, which has no NumPy.
+
+DEFAULT_SPIN_SECONDS = 0.002
+
+# Upper edges of the lateness histogram [us]; the last bin is everything above.
+LATENESS_BINS_US = (10, 50, 100, 250, 500, 1000, 2000, 5000)
+
+
+class CycleStats:
+    """Lateness histogram and overrun counters of one scheduler run."""
+
+    def __init__(self):
+        self.cycles = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.lateness_sum = 0.0
+        self.lateness_max = 0.0
+        self.histogram = [0] * (len(LATENESS_BINS_US) + 1)
+
+    def record(self, lateness):
+        self.cycles += 1
+        self.lateness_sum += lateness
+        self.lateness_max = max(self.lateness_max, lateness)
+
+        lateness_us = lateness * 1e6
+        for index, edge in enumerate(LATENESS_BINS_US):
+            if lateness_us <= edge:
+                self.histogram[index] += 1
+                return
+        self.histogram[-1] += 1
+
+    def report(self):
+        if not self.cycles:
+            return "No cycles run."
+
+        lines = [
+            "{} cycles | jitter mean {:.1f} us, max {:.1f} us | {} overruns, {} skipped ticks".format(
+                self.cycles,
+                self.lateness_sum / self.cycles * 1e6,
+                self.lateness_max * 1e6,
+                self.overruns,
+                self.skipped,
+            )
+        ]
+
+        lower = 0
+        for edge, count in zip(LATENESS_BINS_US + (None,), self.histogram):
+            label = "{:>5}-{:<5} us".format(lower, edge) if edge is not None else "   > {:<5} us".format(lower)
+            lines.append("  {} {:8d}  {:5.1f} %".format(label, count, 100.0 * count / self.cycles))
+            lower = edge
+
+        return "\n".join(lines)
+
+
+class PeriodicScheduler:
+    """Runs a loop body at a fixed rate with hybrid sleep/spin waits."""
+
+    def __init__(self, rate_hz, spin_seconds=DEFAULT_SPIN_SECONDS, idle=None):
+        self.period = 1.0 / rate_hz
+        self.spin_seconds = spin_seconds
+        self.idle = idle
+        self.stats = CycleStats()
+        self._start_time = None
+        self._next_deadline = None
+
+    def ticks(self, duration=None):
+        """Yield the elapsed time at each deadline until `duration` seconds (forever if None)."""
+        _raise_timer_resolution()
+        try:
+            self._start()
+            while duration is None or self._next_deadline - self._start_time < duration:
+                self._wait_until(self._next_deadline)
+                yield self._on_deadline()
+        finally:
+            _restore_timer_resolution()
+
+    def at_offsets(self, offsets):
+        """Yield each of the non-decreasing `offsets` [s] once start + offset is reached.
+
+        A late offset is yielded at once; it counts as an overrun when it is
+        more than one period late.
+        """
+        _raise_timer_resolution()
+        try:
+            self._start()
+            start = self._start_time
+            for offset in offsets:
+                deadline = start + offset
+                self._wait_until(deadline)
+                lateness = time.perf_counter() - deadline
+                self.stats.record(lateness)
+                if lateness > self.period:
+                    self.stats.overruns += 1
+                yield offset
+        finally:
+            _restore_timer_resolution()
+
+    async def async_ticks(self, duration=None):
+        """asyncio version of ticks(): other tasks run while waiting, only the final spin blocks."""
+        self._start()
+        while duration is None or self._next_deadline - self._start_time < duration:
+            remaining = self._next_deadline - time.perf_counter() - self.spin_seconds
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            while time.perf_counter() < self._next_deadline:
+                pass
+            yield self._on_deadline()
+
+    def _start(self):
+        self.stats = CycleStats()
+        self._start_time = time.perf_counter()
+        self._next_deadline = self._start_time
+
+    def _wait_until(self, deadline):
+        remaining = deadline - time.perf_counter() - self.spin_seconds
+        if self.idle is None:
+            if remaining > 0:
+                time.sleep(remaining)
+            while time.perf_counter() < deadline:
+                pass
+            return
+
+        # idle() may return early (a packet arrived): wait again for what's left.
+        while remaining > 0:
+            self.idle(remaining)
+            remaining = deadline - time.perf_counter() - self.spin_seconds
+        while time.perf_counter() < deadline:
+            self.idle(0.0)
+
+    def _on_deadline(self):
+        now = time.perf_counter()
+        deadline = self._next_deadline
+        self.stats.record(now - deadline)
+
+        # The previous cycle ran past this deadline and into later ones: skip
+        # the missed ticks but keep the phase.
+        next_deadline = deadline + self.period
+        if now >= next_deadline:
+            self.stats.overruns += 1
+            missed = int((now - deadline) / self.period)
+            self.stats.skipped += missed
+            next_deadline = deadline + (missed + 1) * self.period
+        self._next_deadline = next_deadline
+
+        return deadline - self._start_time
+
+
+# ---------------------------------------------------------------------------
+# Windows Timer Resolution
+# ---------------------------------------------------------------------------
+
+_timer_users = 0
+
+
+def _raise_timer_resolution():
+    """Ask Windows for 1 ms sleeps while a scheduler runs (no-op elsewhere)."""
+    global _timer_users
+    if sys.platform == "win32":
+        import ctypes
+        if _timer_users == 0:
+            ctypes.windll.winmm.timeBeginPeriod(1)
+    _timer_users += 1
+
+
+def _restore_timer_resolution():
+    global _timer_users
+    _timer_users -= 1
+    if sys.platform == "win32" and _timer_users == 0:
+        import ctypes
+        ctypes.windll.winmm.timeEndPeriod(1)
+
+
+#-------TEST MAIN ---------- #
+
+TEST_RATES_HZ = (100, 500, 1000)
+TEST_SECONDS = 2.0
+
+
+async def _async_test(rate_hz):
+    scheduler = PeriodicScheduler(rate_hz)
+    async for _elapsed in scheduler.async_ticks(TEST_SECONDS):
+        pass
+    return scheduler.stats
+
+
+def main():
+    for rate_hz in TEST_RATES_HZ:
+        scheduler = PeriodicScheduler(rate_hz)
+        for _elapsed in scheduler.ticks(TEST_SECONDS):
+            pass
+        print("ticks() at {} Hz:".format(rate_hz))
+        print(scheduler.stats.report())
+
+        # Plain time.sleep(period), as the senders used to do.
+        start = time.perf_counter()
+        cycles = 0
+        while time.perf_counter() - start < TEST_SECONDS:
+            time.sleep(1.0 / rate_hz)
+            cycles += 1
+        print("time.sleep({:.4f}) loop: {} cycles in {:.0f} s (expected {})\n".format(
+            1.0 / rate_hz, cycles, TEST_SECONDS, int(rate_hz * TEST_SECONDS)))
+
+    stats = asyncio.run(_async_test(1000))
+    print("async_ticks() at 1000 Hz:")
+    print(stats.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+function [angle, ok] = read_held_angle(filename)
+    % Reads the hold value written by angle_store.py (HoldValueStore).
+    % The file is mapped once and kept mapped; each call is a seqlock read:
+    % the angle is only accepted when the sequence number is even (no write in
+    % progress) and unchanged across the read. ok is false if the file doesn't
+    % exist yet or the writer kept interrupting.
+    persistent map mapped_name
+
+    angle = 0.0;
+    ok = false;
+
+    if isempty(map) || ~strcmp(mapped_name, filename)
+        if exist(filename, 'file') ~= 2
+            return;
+        end
+        map = memmapfile(filename, ...
+            'Format', {'uint32', [1 1], 'sequence'; ...
+                       'uint32', [1 1], 'version'; ...
+                       'double', [1 1], 'angle'; ...
+                       'double', [1 1], 'time'}, ...
+            'Repeat', 1, 'Writable', false);
+        mapped_name = filename;
+    end
+
+    for attempt = 1:100
+        before = map.Data.sequence;
+        if mod(before, 2) == 0 && map.Data.version == 1
+            value = map.Data.angle;
+            if map.Data.sequence == before
+                angle = value;
+                ok = true;
+                return;
+            end
+        end
+    end
+end
@@ -1,9 +1,9 @@
 function angle = read_angle_from_file()
     % Declare MATLAB functions as extrinsic so C-code generator ignores file I/O
-    coder.extrinsic('fopen', 'fclose', 'fgetl', 'exist', 'str2double');
+    coder.extrinsic('read_held_angle');
 
-    % Define file name
-    filename = 'latest_angle.txt';
+    % Memory-mapped hold value written by udp_mat.py (angle_store.py)
+    filename = 'latest_angle.bin';
 
     % Persistent variable holds the previous valid angle across simulation steps
     persistent last_angle;
@@ -13,27 +13,19 @@ function angle = read_angle_from_file()
 
     current_angle = last_angle;
 
-    % Check if file exists
-    if exist(filename, 'file') == 2
-        try
-            fileID = fopen(filename, 'r');
-            if fileID ~= -1
-                angle_str = fgetl(fileID);
-                fclose(fileID);
-                
-                % Process text line
-                if ischar(angle_str) && ~isempty(angle_str)
-                    parsed_val = str2double(angle_str);
-                    if ~isnan(parsed_val)
-                        current_angle = parsed_val;
-                        last_angle = current_angle; % Update stored state
-                    end
-                end
-            end
-        catch
-            % If file access conflicts occur during a step, keep the last read angle
-            current_angle = last_angle;
-        end
+    % Extrinsic outputs need their types declared up front
+    held_angle = 0.0;
+    held_ok = false;
+    try
+        [held_angle, held_ok] = read_held_angle(filename);
+    catch
+        % If the file can't be mapped during a step, keep the last read angle
+        held_ok = false;
+    end
+
+    if held_ok && ~isnan(held_angle)
+        current_angle = held_angle;
+        last_angle = current_angle; % Update stored state
     end
 
     % Output signal to Simulink
@@ -1,8 +1,9 @@
 import socket
 import struct
-import time
 import math
 
+from periodic import PeriodicScheduler
+
 # --- Network Settings ---
 UDP_IP = "127.0.0.1"
 UDP_PORT = 5005
@@ -10,7 +11,9 @@ UDP_PORT = 5005
 # --- Vehicle Parameters ---
 u = 30.0       # Speed [m/s]
 L = 1.0        # Wheelbase [m]
-dt = 0.01      # Time step [s] (100 Hz)
+RATE_HZ = 100  # Send rate; 500 Hz - 1 kHz work with the shared scheduler
+dt = 1.0 / RATE_HZ  # Time step [s]
+PRINT_EVERY = max(1, RATE_HZ // 100)  # Keep console output at ~100 lines/s
 
 Y_max = 1.8    # Wobble lateral offset [m]
 omega = 2.5    # Wobble frequency [rad/s]
@@ -18,14 +21,12 @@ omega = 2.5    # Wobble frequency [rad/s]
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 print(f"Streaming live UDP data to {UDP_IP}:{UDP_PORT}...")
 
-start_time = time.perf_counter()
-next_step = start_time
+scheduler = PeriodicScheduler(RATE_HZ)
 x = 0.0
+sample_count = 0
 
 try:
-    while True:
-        elapsed = time.perf_counter() - start_time
-
+    for elapsed in scheduler.ticks():
         # Calculate wobble steering (delta) and heading (theta)
         heading_tan = (Y_max * omega / u) * math.cos(omega * elapsed)
         theta = math.atan(heading_tan)
@@ -43,15 +44,12 @@ try:
         payload = struct.pack('<ddd', float(x), float(delta), float(theta_wrapped))
         sock.sendto(payload, (UDP_IP, UDP_PORT))
 
-        print(f"Sent -> X: {x:.2f} m | Delta: {math.degrees(delta):.2f}° | Theta: {math.degrees(theta_wrapped):.2f}°")
-
-        # Keep 100 Hz timing
-        next_step += dt
-        sleep_time = next_step - time.perf_counter()
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+        sample_count += 1
+        if sample_count % PRINT_EVERY == 0:
+            print(f"Sent -> X: {x:.2f} m | Delta: {math.degrees(delta):.2f}° | Theta: {math.degrees(theta_wrapped):.2f}°")
 
 except KeyboardInterrupt:
     print("\nSender stopped.")
 finally:
     sock.close()
+    print(scheduler.stats.report())
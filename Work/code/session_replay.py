@@ -0,0 +1,443 @@
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import os
+import socket
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+from packet_codec import LAYOUT_REGISTRY, PacketLayout
+from periodic import PeriodicScheduler
+from recording_format import RECORDING_SUFFIX, RecordingReader
+from telemetry_protocol import FRAME_HEADER, FRAME_MAGIC, FRAME_VERSION, SCHEMA_REGISTRY, SignalSchema
+
+# ---------------------------------------------------------------------------
+# Recorded Session Replay
+# ---------------------------------------------------------------------------
+#
+# Sends a recorded session back over UDP so the dashboards and bridges can be
+# exercised without dSPACE. Works with any header-plus-rows recording:
+#
+#   dspace_live_recording.csv   gui_arch.py        Time_s, Angle, Torque, ...
+#   live_signals.csv            SignalPlotPage     Time(s), Torque, ..., AngleRad
+#   capt_live.csv / .capt       write_from_dSpace  pc_time, angle_rad, ...
+#
+# The first time column found (TIME_COLUMNS) is the timeline; recordings
+# without one are replayed at a fixed --rate (or the .capt sample rate).
+# Each row is sent as one packet in one of these formats:
+#
+#   json          udp_send.py's packet: packet, timestamp, elapsed_time and
+#                 one key per signal (NaN as null)
+#   frame         telemetry_protocol's binary frame; the selected names must
+#                 match a registered schema (CAPT_SCHEMA: Out1 Torque AO_ch8
+#                 AO_ch16)
+#   <layout>      a packet_codec layout, e.g. gui_signals_f32 for gui_arch.py
+#                 or signals_f32 for the bridges, optionally tagged
+#
+# --select picks the signals in output order; "Out1=AngleRad" renames a column.
+# Packets are encoded before the replay starts. Only the sequence number and
+# the send timestamp of json/frame packets are filled in per packet, with the
+# wall clock at send time, so receiver latency statistics stay meaningful.
+#
+# At --speed N the timeline is compressed N times and each packet waits for
+# its deadline with PeriodicScheduler's sleep/spin (jitter in the tens of us,
+# late packets are sent at once, never dropped). --speed max sends back to
+# back.
+
+DEFAULT_ADDRESS = "127.0.0.1:5005"
+TIME_COLUMNS = ("Time_s", "Time(s)", "elapsed_time", "pc_time", "time")
+PACKET_FORMATS = ("json", "frame")
+
+
+class Recording:
+    """A recorded session: (signals, rows) float64 columns and their time axis [s]."""
+
+    def __init__(self, signal_names: Sequence[str], columns: np.ndarray, times: np.ndarray):
+        self.signal_names = list(signal_names)
+        self.columns = columns
+        self.times = times
+        self._index = {name: index for index, name in enumerate(self.signal_names)}
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def duration(self) -> float:
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    @property
+    def sample_period(self) -> float:
+        return self.duration / (len(self) - 1) if len(self) > 1 else 0.0
+
+    def column(self, name: str) -> np.ndarray:
+        try:
+            return self.columns[self._index[name]]
+        except KeyError:
+            raise ValueError(f"No column {name!r}; the recording has {self.signal_names}") from None
+
+    @classmethod
+    def from_file(cls, path, rate_hz: Optional[float] = None) -> "Recording":
+        """Load a CSV or .capt recording. `rate_hz` is used only if it has no time column."""
+        if os.fspath(path).endswith(RECORDING_SUFFIX):
+            with RecordingReader(path) as reader:
+                names = list(reader.signal_names)
+                block = np.array(reader.block(), dtype=np.float64)
+                if rate_hz is None:
+                    rate_hz = reader.sample_rate_hz
+        else:
+            names, block = _load_csv(path)
+
+        time_name = next((name for name in TIME_COLUMNS if name in names), None)
+        if time_name is not None:
+            time_index = names.index(time_name)
+            times = block[time_index] - block[time_index, 0] if block.shape[1] else block[time_index]
+            del names[time_index]
+            block = np.delete(block, time_index, axis=0)
+        elif rate_hz:
+            times = np.arange(block.shape[1]) / rate_hz
+        else:
+            raise ValueError(f"{path} has no time column ({', '.join(TIME_COLUMNS)}); pass a sample rate")
+        return cls(names, block, times)
+
+
+def _load_csv(path) -> tuple[list[str], np.ndarray]:
+    """Header row plus numeric rows, as in recording_format.csv_to_recording; bad cells are NaN."""
+    def to_float(cell: str) -> float:
+        try:
+            return float(cell)
+        except ValueError:
+            return math.nan
+
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        reader = csv.reader(csv_file)
+        names = [name.strip() for name in next(reader)]
+        width = len(names)
+        rows = []
+        for row in reader:
+            if not row:
+                continue
+            values = [to_float(cell) for cell in row[:width]]
+            values.extend([math.nan] * (width - len(values)))
+            rows.append(values)
+    return names, np.array(rows, dtype=np.float64).reshape(-1, width).T
+
+
+def parse_selection(recording: Recording, select: Optional[Sequence[str]]) -> tuple[list[str], np.ndarray]:
+    """(output names, (signals, rows) columns) for "NAME" or "OUT=COLUMN" entries; all signals if None."""
+    if not select:
+        return list(recording.signal_names), recording.columns
+    names = []
+    columns = []
+    for entry in select:
+        name, _, column = entry.partition("=")
+        names.append(name.strip())
+        columns.append(recording.column((column or name).strip()))
+    return names, np.array(columns)
+
+
+# ---------------------------------------------------------------------------
+# Packet Encoders
+# ---------------------------------------------------------------------------
+#
+# packet(row, sequence, send_time) returns the datagram of one row.
+
+class JsonPackets:
+    """udp_send.py JSON packets; the row part is serialized once up front."""
+
+    def __init__(self, names: Sequence[str], columns: np.ndarray, times: np.ndarray):
+        self._bodies = []
+        for elapsed, row in zip(times.tolist(), columns.T.tolist()):
+            values = {"elapsed_time": elapsed}
+            values.update((name, value if math.isfinite(value) else None) for name, value in zip(names, row))
+            # '"elapsed_time": ..., "Out1": ...}' completes the packet/timestamp prefix.
+            self._bodies.append(json.dumps(values)[1:].encode("utf-8"))
+
+    def packet(self, row: int, sequence: int, send_time: float) -> bytes:
+        return b'{"packet": %d, "timestamp": %.6f, %s' % (sequence, send_time, self._bodies[row])
+
+
+class FramePackets:
+    """telemetry_protocol binary frames; only the 24-byte header is packed per packet."""
+
+    def __init__(self, schema: SignalSchema, columns: np.ndarray):
+        payload = np.ascontiguousarray(columns.T, dtype="<f8")
+        self._payloads = [row.tobytes() for row in payload]
+        self._header = (FRAME_MAGIC, FRAME_VERSION, schema.schema_id, len(schema))
+
+    def packet(self, row: int, sequence: int, send_time: float) -> bytes:
+        return FRAME_HEADER.pack(*self._header, sequence, send_time) + self._payloads[row]
+
+
+class LayoutPackets:
+    """Raw packet_codec layouts; no header, so every packet is fully prebuilt."""
+
+    def __init__(self, layout: PacketLayout, columns: np.ndarray, tagged: bool = False):
+        dtype = layout.tagged_dtype if tagged else layout.dtype
+        records = np.zeros(columns.shape[1], dtype=dtype)
+        if tagged:
+            records["layout_id"] = layout.layout_id
+        for field, column in zip(layout.field_names, columns):
+            records[field] = column
+        data = records.tobytes()
+        size = dtype.itemsize
+        self._payloads = [data[offset:offset + size] for offset in range(0, len(data), size)]
+
+    def packet(self, row: int, sequence: int, send_time: float) -> bytes:
+        return self._payloads[row]
+
+
+def _schema_for(names: Sequence[str]) -> SignalSchema:
+    for schema in SCHEMA_REGISTRY.values():
+        if list(schema.signal_names) == list(names):
+            return schema
+    registered = "; ".join(f"{schema_id}: {' '.join(schema.signal_names)}" for schema_id, schema in SCHEMA_REGISTRY.items())
+    raise ValueError(f"No registered frame schema has the signals {list(names)} (registered: {registered})")
+
+
+def _layout_by_name(name: str) -> PacketLayout:
+    for layout in LAYOUT_REGISTRY.values():
+        if layout.name == name:
+            return layout
+    formats = ", ".join(PACKET_FORMATS + tuple(layout.name for layout in LAYOUT_REGISTRY.values()))
+    raise ValueError(f"Unknown packet format {name!r}; use one of {formats}")
+
+
+def make_packets(packet_format: str, recording: Recording, select: Optional[Sequence[str]] = None,
+                 tagged: bool = False):
+    names, columns = parse_selection(recording, select)
+    if packet_format == "json":
+        return JsonPackets(names, columns, recording.times)
+    if packet_format == "frame":
+        return FramePackets(_schema_for(names), columns)
+
+    layout = _layout_by_name(packet_format)
+    if len(names) != len(layout):
+        raise ValueError(f"{layout.name} packets carry {len(layout)} values ({', '.join(layout.field_names)}), "
+                         f"{len(names)} signals selected: {names}")
+    return LayoutPackets(layout, columns, tagged)
+
+
+# ---------------------------------------------------------------------------
+# Replayer
+# ---------------------------------------------------------------------------
+
+class SessionReplayer:
+    """Sends a recording's packets to one UDP address on its own timeline."""
+
+    def __init__(self, recording: Recording, packets, address: tuple[str, int],
+                 speed: Optional[float] = 1.0, repeat: int = 1):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive (None sends as fast as possible)")
+        self.recording = recording
+        self.packets = packets
+        self.address = address
+        self.speed = speed
+        self.repeat = repeat
+        self.sent_count = 0
+        self.send_errors = 0
+        self.elapsed_seconds = 0.0
+        self.scheduler = None
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._running = False
+
+    def _offsets(self):
+        """Replay timeline: the recording's times / speed, repeated back to back."""
+        times = self.recording.times / self.speed
+        # One sample period between the last row of a pass and the first of the next.
+        lap = (self.recording.duration + self.recording.sample_period) / self.speed
+        for lap_index in range(self.repeat):
+            start = lap_index * lap
+            for offset in times.tolist():
+                yield start + offset
+
+    def run(self) -> None:
+        rows = len(self.recording)
+        packet = self.packets.packet
+        sendto = self.sock.sendto
+        address = self.address
+        wall_clock = time.time
+        self._running = True
+
+        if self.speed is None:
+            timeline = range(rows * self.repeat)
+        else:
+            period = self.recording.sample_period / self.speed
+            self.scheduler = PeriodicScheduler(1.0 / period if period > 0 else 1000.0)
+            timeline = self.scheduler.at_offsets(self._offsets())
+
+        start = time.perf_counter()
+        try:
+            for sequence, _offset in enumerate(timeline):
+                if not self._running:
+                    break
+                try:
+                    sendto(packet(sequence % rows, sequence, wall_clock()), address)
+                except OSError:
+                    # Nothing listening yet (ICMP port unreachable) or the buffer is full.
+                    self.send_errors += 1
+                self.sent_count += 1
+        finally:
+            self.elapsed_seconds = time.perf_counter() - start
+            self._running = False
+
+    def stop(self) -> None:
+        self._running = False
+
+    def report(self) -> str:
+        rate = self.sent_count / self.elapsed_seconds if self.elapsed_seconds else 0.0
+        lines = [f"{self.sent_count} packets in {self.elapsed_seconds:.2f} s ({rate:.0f} packets/s), "
+                 f"{self.send_errors} send errors"]
+        if self.scheduler is not None:
+            lines.append("Send time after deadline:")
+            lines.append(self.scheduler.stats.report())
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+def parse_address(text: str) -> tuple[str, int]:
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def parse_speed(text: str) -> Optional[float]:
+    return None if text.lower() == "max" else float(text.rstrip("xX"))
+
+
+#-------BENCHMARK MAIN ---------- #
+#
+# A synthetic 1 kHz gui_arch-style recording replayed to a receiver process
+# at 1x and 10x, against the time.sleep(period) loop send_data.py used to
+# run, plus --speed max. Lateness is measured on the sender (each packet's
+# send time after its deadline); the receiver counts what arrived.
+
+BENCH_RATE_HZ = 1000
+BENCH_SECONDS = 2.0
+BENCH_PORT = 50730
+BENCH_SIGNALS = ["Angle", "Torque", "Angular velocity", "Phase current 1", "Phase current 2", "Controller output"]
+
+
+def _bench_receiver(ready, results) -> None:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    sock.bind(("127.0.0.1", BENCH_PORT))
+    sock.settimeout(0.5)
+    ready.set()
+    while True:
+        count = 0
+        while True:
+            try:
+                packet = sock.recv(4096)
+            except socket.timeout:
+                if count:
+                    break
+                continue
+            if packet == b"stop":
+                sock.close()
+                return
+            count += 1
+        results.put(count)
+
+
+def _bench_recording() -> Recording:
+    times = np.arange(int(BENCH_RATE_HZ * BENCH_SECONDS)) / BENCH_RATE_HZ
+    columns = np.array([np.sin(2 * np.pi * (index + 1) * times) for index in range(len(BENCH_SIGNALS))])
+    return Recording(BENCH_SIGNALS, columns, times)
+
+
+def _sleep_loop(recording: Recording, packets, speed: float) -> tuple[int, float, float]:
+    """The old sender loop: send, then time.sleep(period). Returns (sent, seconds, mean lateness)."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    address = ("127.0.0.1", BENCH_PORT)
+    period = recording.sample_period / speed
+    lateness_sum = 0.0
+    start = time.perf_counter()
+    for row, offset in enumerate((recording.times / speed).tolist()):
+        lateness_sum += time.perf_counter() - start - offset
+        sock.sendto(packets.packet(row, row, time.time()), address)
+        time.sleep(period)
+    seconds = time.perf_counter() - start
+    sock.close()
+    return len(recording), seconds, lateness_sum / len(recording)
+
+
+def bench() -> None:
+    recording = _bench_recording()
+    packets = make_packets("gui_signals_f32", recording)
+
+    ready = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    receiver = multiprocessing.Process(target=_bench_receiver, args=(ready, results))
+    receiver.start()
+    ready.wait()
+
+    print(f"{len(recording)} rows at {BENCH_RATE_HZ} Hz ({recording.duration:.1f} s recorded)")
+    for speed in (1.0, 10.0):
+        sent, seconds, lateness = _sleep_loop(recording, packets, speed)
+        print(f"\ntime.sleep loop at {speed:.0f}x: {sent} packets in {seconds:.2f} s "
+              f"(expected {recording.duration / speed:.2f} s), mean lateness {lateness * 1e3:.2f} ms, "
+              f"{results.get()} received")
+
+        replayer = SessionReplayer(recording, packets, ("127.0.0.1", BENCH_PORT), speed)
+        replayer.run()
+        print(f"SessionReplayer at {speed:.0f}x: {replayer.report()}\n{results.get()} received")
+        replayer.close()
+
+    replayer = SessionReplayer(recording, packets, ("127.0.0.1", BENCH_PORT), None, repeat=25)
+    replayer.run()
+    print(f"\nSessionReplayer at max speed: {replayer.report()}\n{results.get()} received")
+    replayer.close()
+
+    stop = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    stop.sendto(b"stop", ("127.0.0.1", BENCH_PORT))
+    stop.close()
+    receiver.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded session over UDP.")
+    parser.add_argument("recording", nargs="?", help="CSV or .capt recording")
+    parser.add_argument("--to", default=DEFAULT_ADDRESS, help=f"host:port to send to (default {DEFAULT_ADDRESS})")
+    parser.add_argument("--format", default="json",
+                        help="json, frame or a packet_codec layout name such as gui_signals_f32")
+    parser.add_argument("--select", nargs="+", default=None,
+                        help="signals in output order; NAME=COLUMN renames (default: all but the time column)")
+    parser.add_argument("--tagged", action="store_true", help="prefix layout packets with their layout id")
+    parser.add_argument("--speed", type=parse_speed, default=1.0, help="1 (real time), N (N times faster) or max")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the recording this many times")
+    parser.add_argument("--rate", type=float, default=None, help="sample rate [Hz] of recordings without a time column")
+    parser.add_argument("--bench", action="store_true", help="compare replay timing with a time.sleep loop")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench()
+        return
+    if args.recording is None:
+        parser.error("a recording is required")
+
+    recording = Recording.from_file(args.recording, args.rate)
+    packets = make_packets(args.format, recording, args.select, args.tagged)
+    replayer = SessionReplayer(recording, packets, parse_address(args.to), args.speed, args.repeat)
+
+    speed = "max speed" if args.speed is None else f"{args.speed:g}x"
+    print("=" * 60)
+    print(f"Replaying {args.recording}: {len(recording)} rows, {recording.duration:.1f} s, "
+          f"signals {', '.join(recording.signal_names)}")
+    print(f"Sending {args.format} packets to {args.to} at {speed}")
+    print("=" * 60)
+    try:
+        replayer.run()
+    except KeyboardInterrupt:
+        print("\nReplay stopped.")
+    finally:
+        print(replayer.report())
+        replayer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -307,7 +307,6 @@
 #     main()
 
 ```python
-import json
 import math
 import socket
 import sys
@@ -332,6 +331,13 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from telemetry_protocol import (
+    SignalSchema,
+    TelemetryFrame,
+    decode_datagram,
+    register_schema,
+)
+
 
 # ---------------------------------------------------------------------------
 # UDP configuration
@@ -350,11 +356,27 @@ CURRENT_PHASE_2_NAME = "AO_ch16"
 PLOT_WINDOW_SECONDS = 10.0
 GUI_UPDATE_PERIOD_MS = 20
 
+# Legacy JSON keys resolved to payload offsets; binary frames carry their own schema id.
+SPRING_SIM_SCHEMA = register_schema(
+    2,
+    (
+        ANGLE_SIGNAL_NAME,
+        TORQUE_SIGNAL_NAME,
+        CURRENT_PHASE_1_NAME,
+        CURRENT_PHASE_2_NAME,
+    ),
+)
+
 
 class UdpReceiver:
-    """Non-blocking UDP receiver for dSPACE JSON packets."""
+    """Non-blocking UDP receiver for dSPACE binary telemetry frames (legacy JSON accepted)."""
 
-    def __init__(self, ip: str, port: int):
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        json_schema: SignalSchema = SPRING_SIM_SCHEMA,
+    ):
         self.socket = socket.socket(
             socket.AF_INET,
             socket.SOCK_DGRAM,
@@ -369,14 +391,16 @@ class UdpReceiver:
         self.socket.bind((ip, port))
         self.socket.setblocking(False)
 
-    def read_latest_packet(self) -> dict | None:
+        self.json_schema = json_schema
+
+    def read_latest_packet(self) -> TelemetryFrame | None:
         """
         Read every currently waiting packet and return only the latest one.
 
         Discarding older queued packets prevents the GUI from slowly falling
         behind when packets arrive faster than the plots are refreshed.
         """
-        latest_packet = None
+        latest_frame = None
 
         while True:
             try:
@@ -387,17 +411,15 @@ class UdpReceiver:
                 print(f"UDP receive error: {error}")
                 break
 
-            try:
-                decoded_data = raw_data.decode("utf-8")
-                packet = json.loads(decoded_data)
+            frame = decode_datagram(raw_data, self.json_schema)
 
-                if isinstance(packet, dict):
-                    latest_packet = packet
+            if frame is None:
+                print(f"Invalid UDP packet ({len(raw_data)} bytes)")
+                continue
 
-            except (UnicodeDecodeError, json.JSONDecodeError) as error:
-                print(f"Invalid UDP packet: {error}")
+            latest_frame = frame
 
-        return latest_packet
+        return latest_frame
 
     def close(self) -> None:
         self.socket.close()
@@ -976,25 +998,13 @@ class MainWindow(QMainWindow):
             self._update_connection_status()
             return
 
-        angle_value = self._read_number(
-            packet,
-            ANGLE_SIGNAL_NAME,
-        )
+        angle_value = packet.get(ANGLE_SIGNAL_NAME)
 
-        torque_value = self._read_number(
-            packet,
-            TORQUE_SIGNAL_NAME,
-        )
+        torque_value = packet.get(TORQUE_SIGNAL_NAME)
 
-        current_1_value = self._read_number(
-            packet,
-            CURRENT_PHASE_1_NAME,
-        )
+        current_1_value = packet.get(CURRENT_PHASE_1_NAME)
 
-        current_2_value = self._read_number(
-            packet,
-            CURRENT_PHASE_2_NAME,
-        )
+        current_2_value = packet.get(CURRENT_PHASE_2_NAME)
 
         if angle_value is not None:
             # Assumes dSPACE sends angle in radians.
@@ -1026,26 +1036,6 @@ class MainWindow(QMainWindow):
 
         self._update_connection_status()
 
-    @staticmethod
-    def _read_number(
-        packet: dict,
-        signal_name: str,
-    ) -> float | None:
-        value = packet.get(signal_name)
-
-        if value is None:
-            return None
-
-        try:
-            numeric_value = float(value)
-        except (TypeError, ValueError):
-            return None
-
-        if not math.isfinite(numeric_value):
-            return None
-
-        return numeric_value
-
     def _update_connection_status(self) -> None:
         if self.last_packet_time is None:
             self.status_label.setText(
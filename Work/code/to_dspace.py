@@ -8,9 +8,12 @@ while True:
             my_vars.append({var.Name, var.ValueConverted})   
 
 import win32com.client
-import time
 import sys
 
+from periodic import PeriodicScheduler
+
+SAMPLE_RATE_HZ = 100
+
 try:
     cd = win32com.client.Dispatch("ControlDeskNG.Application")
     print("Connected to ControlDesk 7.5!")
@@ -57,10 +60,13 @@ try:
         sys.exit()
 
     print("\nStreaming real-time data... Press Ctrl+C to stop.\n")
-    while True:
-        live_value = my_signal.Value
-        print(f"Live Variable Value: {live_value}")
-        time.sleep(0.01)
+    scheduler = PeriodicScheduler(SAMPLE_RATE_HZ)
+    try:
+        for _elapsed in scheduler.ticks():
+            live_value = my_signal.Value
+            print(f"Live Variable Value: {live_value}")
+    finally:
+        print(scheduler.stats.report())
 
 except Exception as e:
     print(f"\nExecution Error: {e}")
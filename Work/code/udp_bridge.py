@@ -0,0 +1,346 @@
+import io
+import multiprocessing
+import select
+import socket
+import time
+from collections import deque
+from contextlib import redirect_stdout
+from typing import Callable, Optional
+
+from packet_codec import ANGLE_F64, SIGNALS_F32, SIGNALS_F64, PacketCodec, PacketLayout
+from periodic import PeriodicScheduler
+
+# ---------------------------------------------------------------------------
+# Event-Driven Angle Bridge (dSPACE -> Simulink)
+# ---------------------------------------------------------------------------
+#
+# The old bridges blocked in recvfrom() with a 50 ms timeout and forwarded
+# once per loop iteration, so Simulink received the angle whenever dSPACE
+# happened to send, or at 20 Hz from the timeout path when it didn't.
+#
+# Here the two sides are decoupled:
+#
+#   input    drained with select() + non-blocking recvfrom while the forward
+#            tick waits, so every datagram is decoded as soon as it arrives
+#            and only the newest angle is held
+#   output   the held angle is sent to FORWARD_PORT from a PeriodicScheduler
+#            at a fixed rate, whether the input is fast, slow or silent
+#   logging  one status line per log interval and at most one copy of each
+#            warning per interval, instead of a print() per packet
+#
+# stats counts the throughput on both sides, the forward tick jitter and how
+# old the forwarded sample was (arrival -> send) when it went out.
+
+DEFAULT_FORWARD_RATE_HZ = 1000
+DEFAULT_LOG_INTERVAL_SECONDS = 1.0
+BRIDGE_SPIN_SECONDS = 0.0005  # select() returns within ~0.1 ms on Linux, ~1 ms on Windows
+RECEIVE_BUFFER_BYTES = 1 << 20
+FORWARD_AGE_WINDOW = 4096  # Recent arrival -> send delays kept for percentiles
+
+
+class RateLimitedLog:
+    """print() that lets each message key through at most once per interval."""
+
+    def __init__(self, interval_seconds: float = DEFAULT_LOG_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._last_printed: dict[str, float] = {}
+        self._suppressed: dict[str, int] = {}
+
+    def __call__(self, key: str, message: str) -> None:
+        now = time.perf_counter()
+        last = self._last_printed.get(key)
+        if last is not None and now - last < self.interval_seconds:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return
+
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            message += f" (+{suppressed} suppressed)"
+        self._last_printed[key] = now
+        print(message)
+
+
+class BridgeStats:
+    """Throughput and latency counters of one bridge run."""
+
+    def __init__(self):
+        self.received = 0
+        self.rejected = 0
+        self.forwarded = 0
+        self.fresh_forwards = 0
+        self.send_errors = 0
+        self.forward_age = deque(maxlen=FORWARD_AGE_WINDOW)
+        self.start_time = time.perf_counter()
+
+    def record_forward(self, sample_age: Optional[float]) -> None:
+        self.forwarded += 1
+        if sample_age is not None:
+            self.fresh_forwards += 1
+            self.forward_age.append(sample_age)
+
+    def summary(self) -> dict:
+        elapsed = max(time.perf_counter() - self.start_time, 1e-9)
+        summary = {
+            "received": self.received,
+            "rejected": self.rejected,
+            "forwarded": self.forwarded,
+            "held": self.forwarded - self.fresh_forwards,
+            "send_errors": self.send_errors,
+            "input_rate_hz": self.received / elapsed,
+            "forward_rate_hz": self.forwarded / elapsed,
+        }
+        if self.forward_age:
+            ages = sorted(self.forward_age)
+            summary["forward_age_ms"] = {
+                "mean": sum(ages) / len(ages) * 1e3,
+                "p50": ages[len(ages) // 2] * 1e3,
+                "p99": ages[min(len(ages) - 1, int(len(ages) * 0.99))] * 1e3,
+                "max": ages[-1] * 1e3,
+            }
+        return summary
+
+
+class UdpBridge:
+    """Receives dSPACE packets and forwards the newest angle to Simulink at a fixed rate.
+
+    `on_sample(layout, values)` is called for every decoded packet, e.g. to
+    update shared memory. run() blocks until `duration` seconds have passed
+    (forever if None) or stop() is called from another thread.
+    """
+
+    def __init__(self, listen_address: tuple[str, int], forward_address: tuple[str, int],
+                 codec: Optional[PacketCodec] = None, forward_rate_hz: float = DEFAULT_FORWARD_RATE_HZ,
+                 initial_angle: float = 0.0,
+                 on_sample: Optional[Callable[[PacketLayout, tuple], None]] = None,
+                 log_interval_seconds: float = DEFAULT_LOG_INTERVAL_SECONDS):
+        self.forward_address = forward_address
+        self.codec = codec if codec is not None else PacketCodec((SIGNALS_F32, SIGNALS_F64))
+        self.on_sample = on_sample
+        self.log = RateLimitedLog(log_interval_seconds)
+        self.log_interval_seconds = log_interval_seconds
+
+        self.recv_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_BYTES)
+        self.recv_sock.bind(listen_address)
+        self.recv_sock.setblocking(False)
+
+        self.send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.send_sock.setblocking(False)
+
+        self.scheduler = PeriodicScheduler(forward_rate_hz, spin_seconds=BRIDGE_SPIN_SECONDS,
+                                           idle=self._service_input)
+        self.stats = BridgeStats()
+        self.angle = float(initial_angle)
+        self.angle_received_time: Optional[float] = None
+        self._received_at_status = 0
+        self._running = False
+
+    # ---- input ---------------------------------------------------------------
+
+    def _service_input(self, timeout: float) -> None:
+        """Wait up to `timeout` for datagrams and decode everything queued."""
+        readable, _, _ = select.select((self.recv_sock,), (), (), timeout)
+        if not readable:
+            return
+
+        recvfrom = self.recv_sock.recvfrom
+        decode = self.codec.decode
+        while True:
+            try:
+                packet, sender = recvfrom(1024)
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionResetError:
+                # Windows reports an unreachable earlier send on the next receive.
+                continue
+
+            received_time = time.perf_counter()
+            layout, values = decode(packet)
+            if layout is None:
+                self.stats.rejected += 1
+                self.log("size", f"Unexpected packet size: {len(packet)} bytes from {sender[0]}")
+                continue
+
+            self.stats.received += 1
+            self.angle = float(values[0])
+            self.angle_received_time = received_time
+            if self.on_sample is not None:
+                self.on_sample(layout, values)
+
+    # ---- output --------------------------------------------------------------
+
+    def run(self, duration: Optional[float] = None) -> BridgeStats:
+        self._running = True
+        self.stats = BridgeStats()
+        self._received_at_status = 0
+        next_status = time.perf_counter() + self.log_interval_seconds
+        pack_angle = ANGLE_F64.pack
+        try:
+            for _elapsed in self.scheduler.ticks(duration):
+                now = time.perf_counter()
+                try:
+                    self.send_sock.sendto(pack_angle(self.angle), self.forward_address)
+                except OSError as error:
+                    self.stats.send_errors += 1
+                    self.log("send", f"Send error: {error}")
+
+                if self.angle_received_time is not None:
+                    self.stats.record_forward(now - self.angle_received_time)
+                    self.angle_received_time = None
+                else:
+                    self.stats.record_forward(None)
+
+                if now >= next_status:
+                    next_status = now + self.log_interval_seconds
+                    self._print_status()
+
+                if not self._running:
+                    break
+        finally:
+            self._running = False
+        return self.stats
+
+    def _print_status(self) -> None:
+        summary = self.stats.summary()
+        age = summary.get("forward_age_ms")
+        age_text = f"age p50 {age['p50']:.2f} ms, p99 {age['p99']:.2f} ms" if age else "no input yet"
+        mode = "REAL" if self.stats.received > self._received_at_status else "HOLD"
+        self._received_at_status = self.stats.received
+        print(f"[{mode}] Angle = {self.angle:.3f}° | in {summary['input_rate_hz']:.0f} Hz, "
+              f"out {summary['forward_rate_hz']:.0f} Hz, held {summary['held']}, "
+              f"rejected {summary['rejected']} | {age_text} | "
+              f"tick jitter max {self.scheduler.stats.lateness_max * 1e6:.0f} us")
+
+    def stop(self) -> None:
+        self._running = False
+
+    def close(self) -> None:
+        self.recv_sock.close()
+        self.send_sock.close()
+
+
+#-------BENCHMARK MAIN ---------- #
+#
+# A sender process plays dSPACE: 4-double packets at ~1 kHz (sleep-paced, so
+# it doesn't spin against the bridge) with a 300 ms outage in the middle; a
+# receiver process plays Simulink and timestamps every forwarded datagram. The same traffic goes through UDP.py's old loop
+# (settimeout(0.05), forward + print per iteration, stdout discarded) and
+# through UdpBridge at 1 kHz. Reported: forward rate, the largest gap
+# Simulink saw, and how old the forwarded angle was.
+
+BENCH_SECONDS = 3.0
+BENCH_INPUT_RATE_HZ = 1000
+BENCH_OUTAGE = (1.0, 1.3)  # Seconds into the run when dSPACE stops sending
+BENCH_LISTEN = ("127.0.0.1", 50705)
+BENCH_FORWARD = ("127.0.0.1", 50706)
+
+
+def _bench_sender() -> None:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    scheduler = PeriodicScheduler(BENCH_INPUT_RATE_HZ, spin_seconds=0.0)
+    for elapsed in scheduler.ticks(BENCH_SECONDS):
+        if BENCH_OUTAGE[0] <= elapsed < BENCH_OUTAGE[1]:
+            continue
+        # The angle carries its send time so the Simulink side can measure its age.
+        sock.sendto(SIGNALS_F64.pack(time.perf_counter(), 0.0, 0.0, 0.0), BENCH_LISTEN)
+    sock.close()
+
+
+def _bench_simulink(stop, results) -> None:
+    arrivals = []
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_BYTES)
+    sock.bind(BENCH_FORWARD)
+    sock.settimeout(0.1)
+    while not stop.is_set():
+        try:
+            packet, _sender = sock.recvfrom(64)
+        except socket.timeout:
+            continue
+        arrivals.append((time.perf_counter(), ANGLE_F64.unpack(packet)[0]))
+    sock.close()
+    results.send(arrivals)
+
+
+def _legacy_loop(duration: float) -> None:
+    """UDP.py's loop before this module, minus shared memory."""
+    recv_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    recv_sock.bind(BENCH_LISTEN)
+    recv_sock.settimeout(0.05)
+    send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    codec = PacketCodec((SIGNALS_F32, SIGNALS_F64))
+    packet_count = 0
+    last_angle = 0.0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        data_received = False
+        angle = last_angle
+        try:
+            packet, addr = recv_sock.recvfrom(1024)
+            layout, values = codec.decode(packet)
+            if layout is None:
+                continue
+            last_angle = angle = float(values[0])
+            data_received = True
+        except socket.timeout:
+            angle = last_angle
+        send_sock.sendto(ANGLE_F64.pack(angle), BENCH_FORWARD)
+        packet_count += 1
+        print(f"[{packet_count:06d}] {'REAL' if data_received else 'HOLD'} Angle = {angle:.3f}°")
+    recv_sock.close()
+    send_sock.close()
+
+
+def _bench(label: str, run_bridge: Callable[[], None]) -> None:
+    # perf_counter is system-wide on Linux and Windows, so the processes share a clock.
+    stop = multiprocessing.Event()
+    results, simulink_results = multiprocessing.Pipe()
+    simulink = multiprocessing.Process(target=_bench_simulink, args=(stop, simulink_results))
+    sender = multiprocessing.Process(target=_bench_sender)
+    simulink.start()
+    time.sleep(0.5)
+    start = time.perf_counter()
+    sender.start()
+    run_bridge()
+    stop.set()
+    arrivals = results.recv()
+    sender.join()
+    simulink.join()
+
+    times = [arrival for arrival, _angle in arrivals]
+    gaps = sorted(later - earlier for earlier, later in zip(times, times[1:]))
+    outage_start, outage_end = start + BENCH_OUTAGE[0] + 0.02, start + BENCH_OUTAGE[1] - 0.02
+    outage_rate = sum(outage_start <= arrival < outage_end for arrival in times) / (outage_end - outage_start)
+    # Age of each distinct angle when it first reached Simulink.
+    ages = []
+    last_angle = None
+    for arrival, angle in arrivals:
+        if angle != last_angle and angle > 0.0:
+            ages.append(arrival - angle)
+            last_angle = angle
+    ages.sort()
+    print(f"{label:<22} {len(arrivals) / BENCH_SECONDS:7.0f} Hz out | "
+          f"gap p99 {gaps[int(len(gaps) * 0.99)] * 1e3:6.2f} ms, max {gaps[-1] * 1e3:6.2f} ms | "
+          f"{outage_rate:5.0f} Hz during outage | "
+          f"angle age p50 {ages[len(ages) // 2] * 1e3:.3f} ms, p99 {ages[int(len(ages) * 0.99)] * 1e3:.3f} ms")
+
+
+def main() -> None:
+    def legacy() -> None:
+        with redirect_stdout(io.StringIO()):
+            _legacy_loop(BENCH_SECONDS)
+
+    def bridged() -> None:
+        bridge = UdpBridge(BENCH_LISTEN, BENCH_FORWARD, log_interval_seconds=BENCH_SECONDS + 1.0)
+        bridge.run(BENCH_SECONDS)
+        bridge.close()
+        print(bridge.stats.summary())
+
+    _bench("settimeout(0.05) loop", legacy)
+    _bench("UdpBridge @ 1 kHz", bridged)
+
+
+if __name__ == "__main__":
+    main()
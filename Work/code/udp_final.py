@@ -1,7 +1,8 @@
 import socket
-import struct
 import time
 import math
+from angle_store import HoldValueStore
+from packet_codec import ANGLE_F64, SIGNALS_F32, SIGNALS_F64, PacketCodec
 from shared_mem_manager import SManager
 
 # --- Network Configuration ---
@@ -13,7 +14,13 @@ FORWARD_PORT = 5006
 
 MEM_NAME = "shared_mem"
 
-FILE_PATH = "angle_logs.txt"
+FILE_PATH = "angle_logs.txt"     # Text checkpoint of the held angle (~1 Hz)
+HOLD_FILE = "angle_logs.bin"     # Memory-mapped held angle (angle_store.py)
+
+# dSPACE sends angle, torque and both phase currents as 4 floats or 4 doubles.
+codec = PacketCodec((SIGNALS_F32, SIGNALS_F64))
+
+store = HoldValueStore(HOLD_FILE, checkpoint_path=FILE_PATH)
 
 # --- 1. Set Up Receiver Socket ---
 recv_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -54,14 +61,12 @@ def main():
 
             try:
                 packet, addr = recv_sock.recvfrom(1024)
-                raw_size = len(packet)
 
-                if raw_size == 16:
-                    angle_val, torque_val, phase1_val, phase2_val = struct.unpack("<4f", packet)
-                elif raw_size == 32:
-                    angle_val, torque_val, phase1_val, phase2_val = struct.unpack("<4d", packet)
+                layout, values = codec.decode(packet)
+                if layout is None:
+                    print(f"Unexpected packet size: {len(packet)}")
                 else:
-                    print(f"Unexpected packet size: {raw_size}")
+                    angle_val, torque_val, phase1_val, phase2_val = values
                 continue
 
                 # Store in shared memory
@@ -75,21 +80,13 @@ def main():
 
             except socket.timeout:
                 # No packet received -> use previous value
-                try:
-                    with open(FILE_PATH, "r") as f:
-                        angle_to_send = float(f.readline().strip())
-                except (FileNotFoundError, ValueError):
-                    angle_to_send = 0.0
+                angle_to_send = store.read_value()
 
         # Save latest valid angle
-        try:
-            with open(FILE_PATH, "w") as f:
-                f.write(str(angle_to_send))
-        except OSError:
-            pass
+        store.write(angle_to_send)
 
         # Forward to Simulink
-        payload = struct.pack("<d", angle_to_send)
+        payload = ANGLE_F64.pack(angle_to_send)
         fwd_sock.sendto(payload, (FORWARD_IP, FORWARD_PORT))
 
         packet_count += 1
@@ -107,6 +104,7 @@ def main():
         print("\nCleaning up resources...")
         recv_sock.close()
         fwd_sock.close()
+        store.close()
         print("Sockets closed cleanly.")
 
 
@@ -205,11 +203,10 @@ if __name__ == "__main__":
 
 # if __name__ == "__main__":
 #     main()
-import socket
-import struct
-import time
-import math
+from angle_store import HoldValueStore
+from packet_codec import SIGNALS_F32, SIGNALS_F64, PacketCodec
 from shared_mem_manager import SManager
+from udp_bridge import UdpBridge
 
 # --- Network Configuration ---
 ANY_IP = "127.0.0.1"          # Listen on ALL network interfaces
@@ -217,108 +214,73 @@ UDP_PORT_LISTEN = 5005      # Fetch incoming dSPACE/Simulink info here
 
 FORWARD_IP = "127.0.0.1"    # Destination port for Simulink
 FORWARD_PORT = 5006       
+FORWARD_RATE_HZ = 1000      # Fixed forward rate, independent of the input rate
 
-MEM_NAME = "shared_mem"
-
-FILE_PATH = "angle_logs.txt"
-
-# --- 1. Set Up Receiver Socket ---
-recv_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-recv_sock.bind((ANY_IP, UDP_PORT_LISTEN))
+RUN_SECONDS = 30
 
-# CRITICAL FIX: Set a 50ms timeout instead of non-blocking mode.
-# This lets Python wait for real incoming packets instead of instantly skipping to fallback!
-recv_sock.settimeout(0.05) 
+MEM_NAME = "shared_mem"
 
-# --- 2. Set Up Forwarder Socket ---
-fwd_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-fwd_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+FILE_PATH = "angle_logs.txt"     # Text checkpoint of the held angle (~1 Hz)
+HOLD_FILE = "angle_logs.bin"     # Memory-mapped held angle (angle_store.py)
 
-print("=" * 60)
-print(f"Listening on ALL interfaces -> Port: {UDP_PORT_LISTEN} (50ms timeout)")
-print(f"Forwarding Angle info to     -> {FORWARD_IP}:{FORWARD_PORT}")
-print("=" * 60 + "\n")
+# dSPACE sends angle, torque and both phase currents as 4 floats or 4 doubles.
+codec = PacketCodec((SIGNALS_F32, SIGNALS_F64))
 
-# --- 3. Initialize Shared Memory ---
+# --- Initialize Shared Memory ---
 manager = SManager()
 # Allocating 32 bytes to handle up to 4 doubles safely
 sm, mem_data = manager.create_mem(mem_name=MEM_NAME, size=32) 
 
 
-def main():
-    print("Shared memory allocated. Relaying data (Press Ctrl+C to stop)...\n")
+def read_checkpoint_angle():
+    """Angle of the last text checkpoint; seeds a new hold file."""
+    try:
+        with open(FILE_PATH, "r") as fread:
+            return float(fread.readline().strip())
+    except (FileNotFoundError, ValueError):
+        return 0.0
 
-    start_time = time.time()
-    packet_count = 0
-    t = 0.0
 
-    try:
-        # Run loop for 30 seconds
-        while time.time() - start_time < 30:
-            angle_to_send = 0.0
-            data_received = False
+# The held angle survives restarts, so Simulink doesn't jump to 0.
+store = HoldValueStore(HOLD_FILE, initial_value=read_checkpoint_angle(), checkpoint_path=FILE_PATH)
 
-            # --- Step A: Wait up to 50ms for real packet from port 5005 ---
-            try:
-                packet, addr = recv_sock.recvfrom(1024)
-                raw_size = len(packet)
-
-                angle_val = None
-                torque_val = None
-                phase1_val = None
-                phase2_val = None
-
-                # Support 16-byte payload (4 floats)
-                if raw_size == 16:
-                    angle_val, torque_val, phase1_val, phase2_val = struct.unpack('<4f', packet)
-                # Support 32-byte payload (4 doubles)
-                elif raw_size == 32:
-                    angle_val, torque_val, phase1_val, phase2_val = struct.unpack('<4d', packet)
-                else:
-                    print(f"Warning: Unexpected packet size ({raw_size} bytes) from {addr}")
 
-                if angle_val is not None:
-                    # Write to Shared Memory
-                    with open(FILE_PATH, "w") as f:
-                        f.write(str(angle_val))
-                    mem_data[0] = angle_val
-                    mem_data[1] = torque_val
-                    mem_data[2] = phase1_val
-                    mem_data[3] = phase2_val
+def store_sample(layout, values):
+    # Write to Shared Memory and keep the angle for the next run
+    mem_data[:4] = values
+    store.write(values[0])
 
-                    angle_to_send = float(angle_val)
-                    data_received = True
 
-            except socket.timeout:
-                # Triggered ONLY when no packet arrives within 50ms
-                data_received = False
-
-            # --- Step B: Fallback test signal ONLY if port 5005 timed out ---
-            if not data_received:
-                # angle_to_send = 45.0 * math.sin(t)  # Generates test sine wave [-45°, +45°]
-                # t += 0.05
-                # time.sleep(0.05)  # Pace fallback rate to ~20Hz
-                with open(FILE_PATH, "r") as fread:
-                    angle_data = fread.readline().strip()
-                    angle_send  = float(angle_data)
-    
-            # --- Step C: Forward angle to Simulink on port 5006 ---
-            angle_payload = struct.pack('<d', angle_send)
-            fwd_sock.sendto(angle_payload, (FORWARD_IP, FORWARD_PORT))
-
-            packet_count += 1
-            mode_tag = "REAL DATA (5005)" if data_received else "FALLBACK SINE"
-
-            print(f"[{packet_count:04d}] [{mode_tag}] Sent Angle: {angle_to_send:6.2f}° --> Port {FORWARD_PORT}")
+def main():
+    # The bridge drains port 5005 as packets arrive and forwards the newest
+    # angle to port 5006 at FORWARD_RATE_HZ; with no input it keeps sending
+    # the held one.
+    bridge = UdpBridge(
+        (ANY_IP, UDP_PORT_LISTEN),
+        (FORWARD_IP, FORWARD_PORT),
+        codec=codec,
+        forward_rate_hz=FORWARD_RATE_HZ,
+        initial_angle=store.read_value(),
+        on_sample=store_sample,
+    )
+
+    print("=" * 60)
+    print(f"Listening on ALL interfaces -> Port: {UDP_PORT_LISTEN}")
+    print(f"Forwarding Angle info to     -> {FORWARD_IP}:{FORWARD_PORT} at {FORWARD_RATE_HZ} Hz")
+    print("=" * 60 + "\n")
+    print("Shared memory allocated. Relaying data (Press Ctrl+C to stop)...\n")
+
+    try:
+        bridge.run(RUN_SECONDS)
 
     except KeyboardInterrupt:
         print("\nManual stop triggered by user.")
 
     finally:
         print("\nCleaning up resources...")
-        recv_sock.close()
-        fwd_sock.close()
+        bridge.close()
+        store.close()
+        print(bridge.stats.summary())
         print("Sockets closed cleanly.")
 
 
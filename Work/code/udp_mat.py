@@ -1,7 +1,8 @@
 import os
 import socket
-import struct
 import time
+from angle_store import HoldValueStore
+from packet_codec import BRIDGE_LAYOUTS, PacketCodec
 from shared_mem_manager import SManager
 
 # --- Configuration ---
@@ -9,8 +10,12 @@ LISTEN_IP = "0.0.0.0"
 UDP_PORT_LISTEN = 5005
 MEM_NAME = "shared_mem"
 
-ANGLE_FILE = "latest_angle.txt"
-TEMP_FILE = "latest_angle.tmp"
+HOLD_FILE = "latest_angle.bin"      # Memory-mapped hold value, read by send_angle.m
+ANGLE_FILE = "latest_angle.txt"     # Text checkpoint (~1 Hz) for readers of the old format
+TEMP_FILE = ANGLE_FILE + ".tmp"
+
+# Angle alone (float / double) or angle, torque and phase currents (4 floats / 4 doubles).
+codec = PacketCodec(BRIDGE_LAYOUTS)
 
 # --- Socket Setup ---
 recv_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -21,80 +26,52 @@ recv_sock.bind((LISTEN_IP, UDP_PORT_LISTEN))
 manager = SManager()
 sm, mem_data = manager.create_mem(mem_name=MEM_NAME, size=32)
 
+# --- Hold Value for MATLAB ---
+store = HoldValueStore(HOLD_FILE, checkpoint_path=ANGLE_FILE)
+
 print("=" * 60)
 print(f"Listening on port {UDP_PORT_LISTEN}")
-print(f"Writing incoming angle to file: '{ANGLE_FILE}'")
+print(f"Holding incoming angle in: '{HOLD_FILE}' (checkpoint '{ANGLE_FILE}')")
 print("=" * 60 + "\n")
 
 
-def write_angle_atomically(angle_value):
-    """Writes the angle to a temp file first, then safely replaces the target file."""
-    try:
-        with open(TEMP_FILE, "w") as f:
-            f.write(f"{angle_value:.4f}")
-        # Atomic replace prevents MATLAB from reading a half-written file
-        os.replace(TEMP_FILE, ANGLE_FILE)
-    except Exception as e:
-        pass
-
-
 def main():
     packet_count = 0
     try:
         while True:
             packet, addr = recv_sock.recvfrom(1024)
-            raw_size = len(packet)
-
-            angle_val = None
-            torque_val = None
-            phase1_val = None
-            phase2_val = None
-
-            # Unpack payload based on byte size
-            if raw_size == 16:
-                angle_val, torque_val, phase1_val, phase2_val = struct.unpack(
-                    "<4f", packet
-                )
-            elif raw_size == 32:
-                angle_val, torque_val, phase1_val, phase2_val = struct.unpack(
-                    "<4d", packet
-                )
-            elif raw_size == 4:
-                angle_val = struct.unpack("<f", packet)[0]
-            elif raw_size == 8:
-                angle_val = struct.unpack("<d", packet)[0]
-            else:
+            layout, values = codec.decode(packet)
+            if layout is None:
                 continue
+            angle_val = values[0]
 
             # Update Shared Memory
-            if torque_val is not None:
-                mem_data[0] = angle_val
-                mem_data[1] = torque_val
-                mem_data[2] = phase1_val
-                mem_data[3] = phase2_val
+            if len(values) == 4:
+                mem_data[:4] = values
 
-            # Write angle to file for MATLAB
-            write_angle_atomically(angle_val)
+            # Publish angle for MATLAB
+            store.write(angle_val)
 
             packet_count += 1
             if packet_count % 100 == 0:
                 print(
-                    f"[{packet_count:06d}] Written Angle to File: {angle_val:6.2f}°"
+                    f"[{packet_count:06d}] Held Angle: {angle_val:6.2f}°"
                 )
 
     except KeyboardInterrupt:
         print("\nStopping script...")
     finally:
         recv_sock.close()
+        store.close()
         if hasattr(manager, "close"):
             manager.close()
-        # Clean up temporary files
-        for fname in [TEMP_FILE, ANGLE_FILE]:
-            if os.path.exists(fname):
-                try:
-                    os.remove(fname)
-                except OSError:
-                    pass
+        # store.close() wrote the final checkpoint; keep it and the hold file
+        # for the next run, only remove a temp file left by an interrupted write
+        if os.path.exists(TEMP_FILE):
+            try:
+                os.remove(TEMP_FILE)
+            except OSError:
+                pass
         print("Cleanup complete.")
 
 
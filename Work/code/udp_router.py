@@ -0,0 +1,592 @@
+import json
+import math
+import os
+import select
+import socket
+import struct
+import sys
+import time
+from operator import itemgetter
+from typing import Callable, Optional
+
+from angle_store import HoldValueStore
+from packet_codec import BRIDGE_LAYOUTS, LAYOUT_REGISTRY, PacketCodec, PacketLayout
+from periodic import PeriodicScheduler
+from udp_bridge import BRIDGE_SPIN_SECONDS, RECEIVE_BUFFER_BYTES, RateLimitedLog
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: use a .json config with the same structure
+    tomllib = None
+
+try:
+    import pygame
+except ImportError:  # Only needed for joystick (Moza wheel) inputs
+    pygame = None
+
+# ---------------------------------------------------------------------------
+# Declarative UDP Router (dSPACE / Simulink / Moza)
+# ---------------------------------------------------------------------------
+#
+# One process replaces UDP.py, udp_mat.py and from_moza.py. router.toml lists
+# the inputs and the routes out of them:
+#
+#   [inputs.<name>]   kind = "udp" (listen = "host:port", layouts = packet_codec
+#                     layout names accepted by size) or kind = "joystick" (the
+#                     Moza wheel via pygame, polled at rate_hz; field "angle"
+#                     in degrees)
+#   [[routes]]        input, select (field names, in output order), optional
+#                     scale (per field: a number, "rad_to_deg" or
+#                     "deg_to_rad"), format ("f32" / "f64" repacking), rate_hz
+#                     (hold and forward at a fixed rate instead of per packet)
+#                     and the sinks: destinations ["host:port", ...],
+#                     hold_file (+ checkpoint_file) for MATLAB, shared_memory
+#
+# Each datagram is received and decoded once. Routes with the same select,
+# scale and format share one transform, so its payload is packed once and
+# fanned out to all of their sinks. Routes whose fields a packet's layout
+# doesn't have (e.g. torque from an angle-only packet) skip that packet.
+#
+# Fixed-rate routes and joystick polls run off one PeriodicScheduler ticking
+# at the highest configured rate; inputs are drained with select() while it
+# waits, as in udp_bridge.py. Lower rates are rounded to whole ticks.
+
+DEFAULT_CONFIG_PATH = "router.toml"
+IDLE_TICK_HZ = 100  # Tick rate when nothing is fixed-rate; inputs are still served immediately
+DEFAULT_LOG_INTERVAL_SECONDS = 5.0
+
+UNIT_CONVERSIONS = {
+    "rad_to_deg": 180.0 / math.pi,
+    "deg_to_rad": math.pi / 180.0,
+}
+FORMAT_CODES = {"f32": "f", "f64": "d"}
+
+
+def load_config(path: str) -> dict:
+    """Read a router config from TOML (or JSON with the same structure)."""
+    if path.endswith(".json"):
+        with open(path, "r") as f:
+            return json.load(f)
+    if tomllib is None:
+        raise RuntimeError(f"Reading {path} needs Python 3.11+ (tomllib); use a .json config instead")
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Expected 'host:port', got {address!r}")
+    return host, int(port)
+
+
+# ---------------------------------------------------------------------------
+# Transforms and Sinks
+# ---------------------------------------------------------------------------
+
+class RouteTransform:
+    """Selects, scales and repacks fields of a decoded packet."""
+
+    def __init__(self, fields: tuple[str, ...], scales: tuple[float, ...], format_name: str):
+        if format_name not in FORMAT_CODES:
+            raise ValueError(f"Unknown format {format_name!r}, expected one of {sorted(FORMAT_CODES)}")
+        self.fields = fields
+        self.scales = scales if any(scale != 1.0 for scale in scales) else None
+        self.packer = struct_for(format_name, len(fields))
+        self.pack_payload = False  # Only UDP destinations need the packed bytes
+        self._getters: dict[int, Optional[Callable]] = {}
+
+    def apply(self, layout: PacketLayout, values: tuple) -> Optional[tuple[tuple, Optional[bytes]]]:
+        """(selected values, packed payload), or None if the layout lacks a field."""
+        getter = self._getters.get(layout.layout_id, False)
+        if getter is False:
+            getter = self._getters[layout.layout_id] = self._compile(layout)
+        if getter is None:
+            return None
+
+        selected = getter(values)
+        if self.scales is not None:
+            selected = tuple(value * scale for value, scale in zip(selected, self.scales))
+        return selected, self.packer.pack(*selected) if self.pack_payload else None
+
+    def _compile(self, layout: PacketLayout) -> Optional[Callable]:
+        if not set(self.fields) <= set(layout.field_names):
+            return None
+        indices = [layout.index_of(field) for field in self.fields]
+        if len(indices) == 1:
+            index = indices[0]
+            return lambda values: (values[index],)
+        return itemgetter(*indices)
+
+
+def struct_for(format_name: str, count: int):
+    # Reuse the registered layout objects' precompiled Structs where one matches.
+    code = FORMAT_CODES[format_name] * count
+    for layout in LAYOUT_REGISTRY.values():
+        if layout.codes == code:
+            return layout.struct
+    return struct.Struct("<" + code)
+
+
+class UdpSink:
+    def __init__(self, sock: socket.socket, address: tuple[str, int]):
+        self.sock = sock
+        self.address = address
+        self.errors = 0
+
+    def emit(self, values: tuple, payload: bytes) -> None:
+        try:
+            self.sock.sendto(payload, self.address)
+        except OSError:
+            self.errors += 1
+
+    def close(self) -> None:
+        pass
+
+
+class HoldFileSink:
+    """First selected value into an angle_store hold file (MATLAB hand-off)."""
+
+    def __init__(self, path: str, checkpoint_path: Optional[str]):
+        self.store = HoldValueStore(path, checkpoint_path=checkpoint_path)
+
+    def emit(self, values: tuple, payload: bytes) -> None:
+        self.store.write(values[0])
+
+    def close(self) -> None:
+        self.store.close()
+
+
+class SharedMemorySink:
+    """Selected values into the float32 shared memory block the GUIs read."""
+
+    def __init__(self, name: str):
+        from shared_mem_manager import SManager
+
+        self.manager = SManager()
+        _sm, self.data = self.manager.create_mem(mem_name=name)
+
+    def emit(self, values: tuple, payload: bytes) -> None:
+        self.data[:len(values)] = values
+
+    def close(self) -> None:
+        self.data = None
+        self.manager.close()
+        self.manager.deallocate()
+
+
+# ---------------------------------------------------------------------------
+# Inputs and Routes
+# ---------------------------------------------------------------------------
+
+class Route:
+    def __init__(self, name: str, transform: RouteTransform, sinks: list, rate_hz: Optional[float]):
+        self.name = name
+        self.transform = transform
+        self.sinks = sinks
+        self.period = 1.0 / rate_hz if rate_hz else None
+        self.next_due = 0.0
+        self.held: Optional[tuple[tuple, bytes]] = None
+        self.forwarded = 0
+        self.skipped = 0
+
+    def emit(self, values: tuple, payload: bytes) -> None:
+        for sink in self.sinks:
+            sink.emit(values, payload)
+        self.forwarded += 1
+
+
+class UdpInput:
+    def __init__(self, name: str, address: tuple[str, int], codec: PacketCodec):
+        self.name = name
+        self.codec = codec
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_BYTES)
+        self.sock.bind(address)
+        self.sock.setblocking(False)
+        self.transforms: list[tuple[RouteTransform, list[Route]]] = []
+        self.received = 0
+        self.period = None
+
+    def drain(self, dispatch: Callable[["UdpInput", PacketLayout, tuple], None], log: RateLimitedLog) -> None:
+        """Handle one datagram. The scheduler's idle loop selects again right
+        away, so a backlog costs a select per packet instead of an exception."""
+        try:
+            packet, sender = self.sock.recvfrom(1024)
+        except (BlockingIOError, InterruptedError, ConnectionResetError):
+            return
+        layout, values = self.codec.decode(packet)
+        if layout is None:
+            log(self.name, f"[{self.name}] Unexpected packet size: {len(packet)} bytes from {sender[0]}")
+            return
+        self.received += 1
+        dispatch(self, layout, values)
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+JOYSTICK_LAYOUT = LAYOUT_REGISTRY[2]  # angle_f64: one "angle" field
+
+
+class JoystickInput:
+    """Moza wheel axis as an angle in degrees, polled like from_moza.py."""
+
+    def __init__(self, name: str, axis: int, range_deg: float, rate_hz: float, device: int = 0):
+        if pygame is None:
+            raise RuntimeError(f"Input {name!r} needs pygame for the joystick")
+        pygame.init()
+        pygame.joystick.init()
+        if pygame.joystick.get_count() <= device:
+            raise RuntimeError(f"Input {name!r}: Moza R5 is not detected")
+        self.name = name
+        self.wheel = pygame.joystick.Joystick(device)
+        self.wheel.init()
+        self.axis = axis
+        self.half_range_deg = range_deg / 2.0
+        self.period = 1.0 / rate_hz
+        self.next_due = 0.0
+        self.transforms: list[tuple[RouteTransform, list[Route]]] = []
+        self.received = 0
+
+    def poll(self) -> tuple:
+        pygame.event.pump()
+        self.received += 1
+        return (self.wheel.get_axis(self.axis) * self.half_range_deg,)
+
+    def close(self) -> None:
+        pygame.quit()
+
+
+# ---------------------------------------------------------------------------
+# Router
+# ---------------------------------------------------------------------------
+
+class UdpRouter:
+    """Runs the inputs and routes of a router config in one loop."""
+
+    def __init__(self, config: dict, log_interval_seconds: float = DEFAULT_LOG_INTERVAL_SECONDS):
+        self.log = RateLimitedLog(log_interval_seconds)
+        self.log_interval_seconds = log_interval_seconds
+        self.send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.send_sock.setblocking(False)
+        self.inputs: dict[str, object] = {}
+        self.routes: list[Route] = []
+        self._transforms: dict[tuple, tuple[RouteTransform, list[Route]]] = {}
+        self.sinks = []
+        self._running = False
+        try:
+            for name, input_config in config.get("inputs", {}).items():
+                self.inputs[name] = self._build_input(name, input_config)
+            for index, route_config in enumerate(config.get("routes", [])):
+                self._add_route(route_config.get("name", f"route_{index}"), route_config)
+        except Exception:
+            self.close()
+            raise
+
+        rates = [1.0 / item.period for item in (*self.inputs.values(), *self.routes) if item.period]
+        self.scheduler = PeriodicScheduler(
+            max(rates, default=IDLE_TICK_HZ),
+            spin_seconds=BRIDGE_SPIN_SECONDS if rates else 0.0,
+            idle=self._service_inputs,
+        )
+        self._sockets = {item.sock: item for item in self.inputs.values() if isinstance(item, UdpInput)}
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "UdpRouter":
+        return cls(load_config(path), **kwargs)
+
+    def _build_input(self, name: str, config: dict):
+        kind = config.get("kind", "udp")
+        if kind == "udp":
+            layouts = [self._layout_by_name(layout_name) for layout_name in config["layouts"]] \
+                if "layouts" in config else BRIDGE_LAYOUTS
+            return UdpInput(name, parse_address(config["listen"]), PacketCodec(layouts))
+        if kind == "joystick":
+            return JoystickInput(name, config.get("axis", 0), config.get("range_deg", 900.0),
+                                 config.get("rate_hz", 100), config.get("device", 0))
+        raise ValueError(f"Input {name!r}: unknown kind {kind!r}")
+
+    @staticmethod
+    def _layout_by_name(name: str) -> PacketLayout:
+        for layout in LAYOUT_REGISTRY.values():
+            if layout.name == name:
+                return layout
+        raise ValueError(f"Unknown packet layout {name!r}")
+
+    def _add_route(self, name: str, config: dict) -> None:
+        input_name = config["input"]
+        if input_name not in self.inputs:
+            raise ValueError(f"Route {name!r}: unknown input {input_name!r}")
+
+        fields = tuple(config["select"])
+        scale_config = config.get("scale", {})
+        unknown = set(scale_config) - set(fields)
+        if unknown:
+            raise ValueError(f"Route {name!r}: scale for unselected fields {sorted(unknown)}")
+        scales = tuple(self._scale_factor(name, scale_config.get(field, 1.0)) for field in fields)
+        format_name = config.get("format", "f64")
+
+        sinks = []
+        for address in config.get("destinations", []):
+            sinks.append(UdpSink(self.send_sock, parse_address(address)))
+        if "hold_file" in config:
+            sinks.append(HoldFileSink(config["hold_file"], config.get("checkpoint_file")))
+        if "shared_memory" in config:
+            sinks.append(SharedMemorySink(config["shared_memory"]))
+        self.sinks.extend(sinks)
+        if not sinks:
+            raise ValueError(f"Route {name!r} has no destinations, hold_file or shared_memory")
+
+        # Routes that transform identically share one transform (and one pack per packet).
+        key = (input_name, fields, scales, format_name)
+        group = self._transforms.get(key)
+        if group is None:
+            group = self._transforms[key] = (RouteTransform(fields, scales, format_name), [])
+            self.inputs[input_name].transforms.append(group)
+        transform, routes = group
+        if config.get("destinations"):
+            transform.pack_payload = True
+
+        route = Route(name, transform, sinks, config.get("rate_hz"))
+        routes.append(route)
+        self.routes.append(route)
+
+    @staticmethod
+    def _scale_factor(route_name: str, scale) -> float:
+        if isinstance(scale, str):
+            if scale not in UNIT_CONVERSIONS:
+                raise ValueError(f"Route {route_name!r}: unknown conversion {scale!r}")
+            return UNIT_CONVERSIONS[scale]
+        return float(scale)
+
+    # ---- packet path ---------------------------------------------------------
+
+    def _dispatch(self, source, layout: PacketLayout, values: tuple) -> None:
+        for transform, routes in source.transforms:
+            result = transform.apply(layout, values)
+            for route in routes:
+                if result is None:
+                    route.skipped += 1
+                elif route.period is None:
+                    route.emit(*result)
+                else:
+                    route.held = result
+
+    def _service_inputs(self, timeout: float) -> None:
+        if not self._sockets:
+            if timeout > 0:
+                time.sleep(timeout)
+            return
+        readable, _, _ = select.select(tuple(self._sockets), (), (), timeout)
+        for sock in readable:
+            self._sockets[sock].drain(self._dispatch, self.log)
+
+    # ---- fixed-rate path -----------------------------------------------------
+
+    def run(self, duration: Optional[float] = None) -> None:
+        self._running = True
+        timed_inputs = [item for item in self.inputs.values() if isinstance(item, JoystickInput)]
+        timed_routes = [route for route in self.routes if route.period is not None]
+        next_status = self.log_interval_seconds
+        try:
+            for elapsed in self.scheduler.ticks(duration):
+                for joystick in timed_inputs:
+                    if elapsed >= joystick.next_due:
+                        joystick.next_due = _next_due(joystick.next_due, joystick.period, elapsed)
+                        self._dispatch(joystick, JOYSTICK_LAYOUT, joystick.poll())
+                for route in timed_routes:
+                    if elapsed >= route.next_due:
+                        route.next_due = _next_due(route.next_due, route.period, elapsed)
+                        if route.held is not None:
+                            route.emit(*route.held)
+
+                if elapsed >= next_status:
+                    next_status = elapsed + self.log_interval_seconds
+                    print(self.status())
+                if not self._running:
+                    break
+        finally:
+            self._running = False
+
+    def status(self) -> str:
+        inputs = ", ".join(f"{name} {item.received}" for name, item in self.inputs.items())
+        routes = ", ".join(f"{route.name} {route.forwarded}"
+                           + (f" ({route.skipped} skipped)" if route.skipped else "") for route in self.routes)
+        send_errors = sum(getattr(sink, "errors", 0) for sink in self.sinks)
+        return (f"in: {inputs} | out: {routes} | send errors {send_errors} | "
+                f"tick jitter max {self.scheduler.stats.lateness_max * 1e6:.0f} us")
+
+    def stop(self) -> None:
+        self._running = False
+
+    def close(self) -> None:
+        for item in self.inputs.values():
+            item.close()
+        for sink in self.sinks:
+            sink.close()
+        self.send_sock.close()
+
+
+def _next_due(due: float, period: float, elapsed: float) -> float:
+    # Keep the phase; skip periods missed entirely instead of bunching them.
+    due += period
+    if due <= elapsed:
+        due += math.floor((elapsed - due) / period + 1.0) * period
+    return due
+
+
+#-------BENCHMARK MAIN ---------- #
+#
+# `python udp_router.py [config]` runs the router from router.toml.
+# `python udp_router.py --bench` sends 4-float packets at 2 kHz to what runs
+# today, UDP.py and udp_mat.py as two processes that each receive and
+# decode their own copy, and then to one router process with the same three
+# routes (angle to Simulink, four signals to shared memory, angle to a
+# MATLAB hold file). Reported is the CPU time of the receiving processes
+# (user + system, including their wake-ups) per packet.
+
+BENCH_PACKETS = 10_000
+BENCH_RATE_HZ = 2000
+BENCH_REPEATS = 5
+BENCH_SIMULINK = ("127.0.0.1", 50716)
+BENCH_CONFIG = {
+    "inputs": {"dspace": {"listen": "127.0.0.1:50715"}},
+    "routes": [
+        {"name": "simulink", "input": "dspace", "select": ["angle"], "format": "f64",
+         "destinations": ["127.0.0.1:50716"]},
+        {"name": "shared_memory", "input": "dspace", "select": ["angle", "torque", "phase1", "phase2"],
+         "shared_memory": "router_bench_mem"},
+        {"name": "matlab", "input": "dspace", "select": ["angle"], "hold_file": "router_bench.bin"},
+    ],
+}
+
+
+def _bench_socket(port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_BYTES)
+    sock.bind(("127.0.0.1", port))
+    sock.settimeout(2.0)
+    return sock
+
+
+def _bench_udp_py(ready, results) -> None:
+    """UDP.py's per-packet work: decode, shared memory, angle to Simulink."""
+    from packet_codec import ANGLE_F64, SIGNALS_F32, SIGNALS_F64
+    from shared_mem_manager import SManager
+
+    manager = SManager()
+    _sm, mem_data = manager.create_mem(mem_name="router_bench_mem")
+    codec = PacketCodec((SIGNALS_F32, SIGNALS_F64))
+    sock = _bench_socket(50717)
+    send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    ready.set()
+    start = time.process_time()
+    for _ in range(BENCH_PACKETS):
+        layout, values = codec.decode(sock.recvfrom(1024)[0])
+        mem_data[:4] = values
+        send_sock.sendto(ANGLE_F64.pack(values[0]), BENCH_SIMULINK)
+    results.send(time.process_time() - start)
+    mem_data = None
+    manager.close()
+    manager.deallocate()
+
+
+def _bench_udp_mat(ready, results) -> None:
+    """udp_mat.py's per-packet work: decode, angle into the hold file."""
+    codec = PacketCodec(BRIDGE_LAYOUTS)
+    store = HoldValueStore("router_bench_mat.bin")
+    sock = _bench_socket(50718)
+    ready.set()
+    start = time.process_time()
+    for _ in range(BENCH_PACKETS):
+        layout, values = codec.decode(sock.recvfrom(1024)[0])
+        store.write(values[0])
+    results.send(time.process_time() - start)
+    store.close()
+    os.remove("router_bench_mat.bin")
+
+
+def _bench_router(ready, results) -> None:
+    router = UdpRouter(BENCH_CONFIG)
+    received = router.inputs["dspace"]
+    ready.set()
+    start = time.process_time()
+    while received.received < BENCH_PACKETS:
+        router._service_inputs(2.0)
+    results.send(time.process_time() - start)
+    router.close()
+    os.remove("router_bench.bin")
+
+
+def _bench_run(targets: list, ports: list) -> float:
+    import multiprocessing
+
+    processes = []
+    pipes = []
+    for target in targets:
+        ready = multiprocessing.Event()
+        results, child_results = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=target, args=(ready, child_results))
+        process.start()
+        ready.wait()
+        processes.append(process)
+        pipes.append(results)
+
+    from packet_codec import SIGNALS_F32
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    scheduler = PeriodicScheduler(BENCH_RATE_HZ, spin_seconds=0.0)
+    index = 0
+    for _elapsed in scheduler.ticks():
+        packet = SIGNALS_F32.pack(index * 1e-3, 0.5, -1.0, 1.0)
+        for port in ports:
+            sock.sendto(packet, ("127.0.0.1", port))
+        index += 1
+        if index == BENCH_PACKETS:
+            break
+    sock.close()
+
+    seconds = sum(results.recv() for results in pipes)
+    for process in processes:
+        process.join()
+    return seconds
+
+
+def bench() -> None:
+    separate = []
+    routed = []
+    for _ in range(BENCH_REPEATS):
+        separate.append(_bench_run([_bench_udp_py, _bench_udp_mat], [50717, 50718]) / BENCH_PACKETS)
+        routed.append(_bench_run([_bench_router], [50715]) / BENCH_PACKETS)
+    for label, seconds in (("UDP.py + udp_mat.py processes", separate), ("one UdpRouter process", routed)):
+        seconds.sort()
+        print(f"{label:<30} median {seconds[len(seconds) // 2] * 1e6:6.2f} us CPU/packet "
+              f"(range {seconds[0] * 1e6:.2f}-{seconds[-1] * 1e6:.2f})")
+
+
+def main() -> None:
+    if "--bench" in sys.argv[1:]:
+        bench()
+        return
+
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CONFIG_PATH
+    router = UdpRouter.from_file(path)
+    print("=" * 60)
+    print(f"Routing from {path}:")
+    for route in router.routes:
+        mode = f"{1.0 / route.period:.0f} Hz hold" if route.period else "per packet"
+        print(f"  {route.name}: {', '.join(route.transform.fields)} ({mode})")
+    print("=" * 60)
+    try:
+        router.run()
+    except KeyboardInterrupt:
+        print("\nStopping router...")
+    finally:
+        print(router.status())
+        router.close()
+
+
+if __name__ == "__main__":
+    main()
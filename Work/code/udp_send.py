@@ -2,10 +2,12 @@ import socket
 import time
 import json
 
+from periodic import PeriodicScheduler
+
 UDP_IP = "127.0.0.1"
 UDP_PORT = 50000
 
-SAMPLE_TIME = 0.01       # 100 Hz
+SAMPLE_RATE_HZ = 100     # 500 Hz - 1 kHz work with the shared scheduler
 MAX_RUNTIME = 80.0      # Automatically stop after 0.5 minutes
 
 TARGET_VARIABLES = (
@@ -29,6 +31,8 @@ sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
 running = True
 variable_handles = {}
+packet_counter = 0
+scheduler = PeriodicScheduler(SAMPLE_RATE_HZ)
 
 def find_target_variables():
     """Find the required dSPACE variables once."""
@@ -79,18 +83,13 @@ try:
     print("Press Ctrl+C to stop.")
     print("Maximum runtime:", MAX_RUNTIME, "seconds")
 
-    start_time = time.time()
-    packet_counter = 0
+    # ticks() stops by itself after MAX_RUNTIME seconds
+    for elapsed_time in scheduler.ticks(MAX_RUNTIME):
 
-    while running:
+        if not running:
+            break
 
         current_time = time.time()
-        elapsed_time = current_time - start_time
-
-        # Fallback termination condition
-        if elapsed_time >= MAX_RUNTIME:
-            print("Maximum runtime reached.")
-            break
 
         values = {
             "packet": packet_counter,
@@ -124,13 +123,14 @@ try:
             (UDP_IP, UDP_PORT)
         )
 
-        # Do not print every packet at 100 Hz
-        if packet_counter % 100 == 0:
+        # Do not print every packet; about once per second
+        if packet_counter % SAMPLE_RATE_HZ == 0:
             print("Sent:", packet)
 
         packet_counter += 1
 
-        time.sleep(SAMPLE_TIME)
+    else:
+        print("Maximum runtime reached.")
 
 except KeyboardInterrupt:
     print("\nCtrl+C detected. Stopping sender.")
@@ -144,4 +144,5 @@ finally:
 
     print("UDP socket closed.")
     print("Packets sent:", packet_counter)
+    print(scheduler.stats.report())
     print("Sender terminated cleanly.")
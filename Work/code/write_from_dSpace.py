@@ -2,47 +2,80 @@ import csv
 import time
 import os
 
+from recording_format import RecordingWriter
+
 OUTPUT_FILE = r"C:\dspace_live\capt_live.csv"
 SAMPLE_PERIOD = 0.02  # 50 Hz
 
+# "csv" keeps the row-per-line file that app.py tails live.
+# "capt" writes the columnar format of recording_format.py (next to
+# OUTPUT_FILE, with a .capt suffix) for long runs; convert with
+#   python recording_format.py to-csv capt_live.capt capt_live.csv
+OUTPUT_FORMAT = "csv"
+
+# .capt rows are handed to the OS in chunks of this many rows (1 s at 50 Hz).
+CAPT_FLUSH_ROWS = 50
+
+SIGNAL_NAMES = [
+    "pc_time",
+    "angle_rad",
+    "torque_nm",
+    "current_a",
+    "current_b",
+    "current_c"
+]
+
 os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
 
-file_exists = os.path.exists(OUTPUT_FILE)
-
-with open(OUTPUT_FILE, "a", newline="", buffering=1) as csv_file:
-    writer = csv.writer(csv_file)
-
-    if not file_exists:
-        writer.writerow([
-            "pc_time",
-            "angle_rad",
-            "torque_nm",
-            "current_a",
-            "current_b",
-            "current_c"
-        ])
-        csv_file.flush()
-
-    while True:
-        # Replace these expressions with the actual ControlDesk
-        # variable-access expressions.
-        angle = angle_variable.Value
-        torque = torque_variable.Value
-        current_a = current_a_variable.Value
-        current_b = current_b_variable.Value
-        current_c = current_c_variable.Value
-
-        writer.writerow([
-            time.time(),
-            angle,
-            torque,
-            current_a,
-            current_b,
-            current_c
-        ])
-
-        # Make the row visible to your external Python process immediately.
-        csv_file.flush()
-
-        time.sleep(SAMPLE_PERIOD)
-      
+
+def read_row():
+    # Replace these expressions with the actual ControlDesk
+    # variable-access expressions.
+    angle = angle_variable.Value
+    torque = torque_variable.Value
+    current_a = current_a_variable.Value
+    current_b = current_b_variable.Value
+    current_c = current_c_variable.Value
+
+    return [
+        time.time(),
+        angle,
+        torque,
+        current_a,
+        current_b,
+        current_c
+    ]
+
+
+if OUTPUT_FORMAT == "capt":
+    capt_file = os.path.splitext(OUTPUT_FILE)[0] + ".capt"
+
+    with RecordingWriter(
+        capt_file,
+        SIGNAL_NAMES,
+        units=["s", "rad", "Nm", "A", "A", "A"],
+        sample_rate_hz=1.0 / SAMPLE_PERIOD,
+        chunk_rows=CAPT_FLUSH_ROWS
+    ) as writer:
+        # A full chunk is written as soon as it has CAPT_FLUSH_ROWS rows.
+        while True:
+            writer.append(read_row())
+            time.sleep(SAMPLE_PERIOD)
+
+else:
+    file_exists = os.path.exists(OUTPUT_FILE)
+
+    with open(OUTPUT_FILE, "a", newline="", buffering=1) as csv_file:
+        writer = csv.writer(csv_file)
+
+        if not file_exists:
+            writer.writerow(SIGNAL_NAMES)
+            csv_file.flush()
+
+        while True:
+            writer.writerow(read_row())
+
+            # Make the row visible to your external Python process immediately.
+            csv_file.flush()
+
+            time.sleep(SAMPLE_PERIOD)